@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from probate.address.geocode import (
+    GeocodeCache,
+    Geocoder,
+    GeoPoint,
+    geocode_fields,
+    get_geocoder,
+    lookup,
+    normalize_fields,
+)
+from probate.address.normalize import NormalizedAddress, normalize_address
+
+__all__ = [
+    "GeoPoint",
+    "GeocodeCache",
+    "Geocoder",
+    "NormalizedAddress",
+    "geocode_fields",
+    "get_geocoder",
+    "lookup",
+    "normalize_address",
+    "normalize_fields",
+]
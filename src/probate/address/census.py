@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import csv
+import io
+from typing import Dict, Sequence
+
+from probate.address.geocode import Geocoder, GeoPoint
+from probate.address.normalize import NormalizedAddress
+
+BATCH_URL = "https://geocoding.geo.census.gov/geocoder/locations/addressbatch"
+
+
+class Backend(Geocoder):
+    # US Census Bureau batch geocoder: free, no key, US addresses only. The
+    # URL's location picks the benchmark (address vintage).
+    name = "census"
+    # The service takes up to 10,000 rows; smaller uploads keep a failed
+    # request cheap to lose.
+    max_batch = 1000
+    timeout = 300.0
+
+    def __init__(self, location: str = "") -> None:
+        self.benchmark = location or "Public_AR_Current"
+
+    def geocode_batch(
+        self, addresses: Sequence[NormalizedAddress]
+    ) -> Dict[str, GeoPoint | None]:
+        import requests
+
+        upload = io.StringIO()
+        writer = csv.writer(upload)
+        for position, address in enumerate(addresses):
+            writer.writerow(
+                [
+                    position,
+                    address.street_line,
+                    address.city or "",
+                    address.state or "",
+                    address.zip5 or "",
+                ]
+            )
+        response = requests.post(
+            BATCH_URL,
+            data={"benchmark": self.benchmark},
+            files={"addressFile": ("addresses.csv", upload.getvalue(), "text/csv")},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        # Rows: id, input, Match|No_Match|Tie, Exact|Non_Exact, matched address,
+        # "lon,lat", TIGER line id, side.
+        points: Dict[str, GeoPoint | None] = {}
+        for row in csv.reader(io.StringIO(response.text)):
+            if len(row) < 6 or row[2] != "Match" or not row[0].isdigit():
+                continue
+            longitude, latitude = (float(value) for value in row[5].split(","))
+            points[addresses[int(row[0])].key] = GeoPoint(latitude, longitude, row[4])
+        return points
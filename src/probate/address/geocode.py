@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import importlib
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Sequence
+
+from probate.address.normalize import NormalizedAddress, normalize_address
+from probate.cancel import CancelToken, checkpoint
+from probate.models import ExtractedFields
+
+if TYPE_CHECKING:
+    from probate.config import AppConfig
+
+logger = logging.getLogger("probate.address")
+
+# SQLite caps bound parameters per statement; cache reads go in chunks.
+CACHE_READ_CHUNK = 500
+
+
+@dataclass
+class GeoPoint:
+    latitude: float
+    longitude: float
+    # The geocoder's own form of the address it matched, when it reports one.
+    matched: str | None = None
+
+
+class Geocoder(ABC):
+    # Resolves batches of normalized addresses. A missing or None entry means
+    # no match; that answer is cached too, so it is not asked again.
+    name = ""
+    max_batch = 100
+
+    @abstractmethod
+    def geocode_batch(
+        self, addresses: Sequence[NormalizedAddress]
+    ) -> Dict[str, GeoPoint | None]:
+        raise NotImplementedError
+
+
+def get_geocoder(url: str) -> Geocoder:
+    # "census", "census://Public_AR_Current" or "offline://points.json": the
+    # scheme names a module in probate.address with a `Backend` class, which
+    # gets the rest of the URL.
+    scheme, _sep, location = url.partition("://")
+    module = importlib.import_module(f"probate.address.{scheme}")
+    return getattr(module, "Backend")(location)
+
+
+class GeocodeCache:
+    # Answers keyed by NormalizedAddress.key. Rows remember which geocoder
+    # produced them; switching geocoders resolves each address once more.
+    def __init__(self, db_path: Path) -> None:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocodes ("
+            "key TEXT PRIMARY KEY, geocoder TEXT NOT NULL, latitude REAL, "
+            "longitude REAL, matched TEXT, resolved_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(
+        self, geocoder: str, keys: Sequence[str]
+    ) -> Dict[str, GeoPoint | None]:
+        found: Dict[str, GeoPoint | None] = {}
+        with self._lock:
+            for start in range(0, len(keys), CACHE_READ_CHUNK):
+                chunk = keys[start : start + CACHE_READ_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT key, latitude, longitude, matched FROM geocodes "
+                    f"WHERE geocoder = ? AND key IN ({marks})",
+                    (geocoder, *chunk),
+                )
+                for key, latitude, longitude, matched in rows:
+                    found[key] = (
+                        None
+                        if latitude is None
+                        else GeoPoint(latitude, longitude, matched)
+                    )
+        return found
+
+    def put_many(self, geocoder: str, points: Dict[str, GeoPoint | None]) -> None:
+        now = time.time()
+        rows = [
+            (
+                key,
+                geocoder,
+                point.latitude if point else None,
+                point.longitude if point else None,
+                point.matched if point else None,
+                now,
+            )
+            for key, point in points.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO geocodes "
+                "(key, geocoder, latitude, longitude, matched, resolved_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "GeocodeCache":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+
+@dataclass
+class GeocodeStats:
+    addresses: int = 0
+    cached: int = 0
+    resolved: int = 0
+    unmatched: int = 0
+    failed: int = 0
+
+
+def lookup(
+    addresses: Iterable[NormalizedAddress],
+    geocoder: Geocoder,
+    cache: GeocodeCache,
+    cancel_token: CancelToken | None = None,
+    resolve: bool = True,
+    stats: GeocodeStats | None = None,
+) -> Dict[str, GeoPoint | None]:
+    # Each distinct key is read from the cache or, if new, sent to the
+    # geocoder in batches of `max_batch` and cached before the next batch.
+    # With resolve=False only cached answers are returned. A failing batch
+    # stops resolution; its addresses stay uncached and are retried next time.
+    stats = stats if stats is not None else GeocodeStats()
+    unique = {address.key: address for address in addresses}
+    stats.addresses += len(unique)
+    points = cache.get_many(geocoder.name, list(unique))
+    stats.cached += len(points)
+    missing = [address for key, address in unique.items() if key not in points]
+    if not resolve:
+        return points
+    for start in range(0, len(missing), geocoder.max_batch):
+        checkpoint(cancel_token)
+        batch = missing[start : start + geocoder.max_batch]
+        try:
+            answers = geocoder.geocode_batch(batch)
+        except Exception as exc:
+            stats.failed += len(missing) - start
+            logger.error(
+                "%s geocoder failed; %s addresses left unresolved: %s",
+                geocoder.name,
+                len(missing) - start,
+                exc,
+            )
+            break
+        resolved = {address.key: answers.get(address.key) for address in batch}
+        cache.put_many(geocoder.name, resolved)
+        points.update(resolved)
+        stats.resolved += len(resolved)
+        stats.unmatched += sum(point is None for point in resolved.values())
+    return points
+
+
+def normalize_fields(fields: ExtractedFields) -> ExtractedFields:
+    # Fills normalized_address from property_address and notes ZIP problems.
+    address = normalize_address(fields.property_address)
+    fields.normalized_address = address.key if address else None
+    if address is not None:
+        for problem in address.problems:
+            fields.notes = f"{fields.notes}; property_address: {problem}".strip("; ")
+    return fields
+
+
+def geocode_fields(
+    config: AppConfig,
+    all_fields: Iterable[ExtractedFields],
+    cancel_token: CancelToken | None = None,
+    geocoder: Geocoder | None = None,
+    resolve: bool = True,
+) -> GeocodeStats | None:
+    # Sets latitude/longitude on every entry with a normalized address, one
+    # lookup per distinct address. Does nothing unless run.geocoder is set
+    # (or a geocoder is passed in).
+    if geocoder is None:
+        if not config.run.geocoder:
+            return None
+        geocoder = get_geocoder(config.run.geocoder)
+    pending: List[ExtractedFields] = []
+    addresses: List[NormalizedAddress] = []
+    for fields in all_fields:
+        address = normalize_address(fields.normalized_address)
+        if address is None:
+            fields.latitude = fields.longitude = None
+            continue
+        pending.append(fields)
+        addresses.append(address)
+    stats = GeocodeStats()
+    if not addresses:
+        return stats
+    with GeocodeCache(Path(config.run.geocode_cache)) as cache:
+        points = lookup(addresses, geocoder, cache, cancel_token, resolve, stats)
+    for fields, address in zip(pending, addresses):
+        point = points.get(address.key)
+        fields.latitude = point.latitude if point else None
+        fields.longitude = point.longitude if point else None
+    logger.info(
+        "Geocoded %s addresses: %s cached, %s resolved (%s unmatched), %s failed",
+        stats.addresses,
+        stats.cached,
+        stats.resolved,
+        stats.unmatched,
+        stats.failed,
+    )
+    return stats
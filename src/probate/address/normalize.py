@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+# USPS Publication 28 forms: street suffixes (Appendix C1), directionals and
+# secondary unit designators (Appendix C2). Keys are the spellings seen on
+# filings, values the standard abbreviation.
+SUFFIXES: Dict[str, str] = {
+    "ALLEY": "ALY",
+    "ALY": "ALY",
+    "AVENUE": "AVE",
+    "AVE": "AVE",
+    "AV": "AVE",
+    "AVEN": "AVE",
+    "AVN": "AVE",
+    "BEND": "BND",
+    "BND": "BND",
+    "BOULEVARD": "BLVD",
+    "BLVD": "BLVD",
+    "BOUL": "BLVD",
+    "BRANCH": "BR",
+    "BR": "BR",
+    "BYPASS": "BYP",
+    "BYP": "BYP",
+    "CIRCLE": "CIR",
+    "CIR": "CIR",
+    "CIRC": "CIR",
+    "COURT": "CT",
+    "CT": "CT",
+    "COVE": "CV",
+    "CV": "CV",
+    "CREEK": "CRK",
+    "CRK": "CRK",
+    "CROSSING": "XING",
+    "XING": "XING",
+    "DRIVE": "DR",
+    "DR": "DR",
+    "DRV": "DR",
+    "EXPRESSWAY": "EXPY",
+    "EXPY": "EXPY",
+    "FREEWAY": "FWY",
+    "FWY": "FWY",
+    "GLEN": "GLN",
+    "GLN": "GLN",
+    "GROVE": "GRV",
+    "GRV": "GRV",
+    "HEIGHTS": "HTS",
+    "HTS": "HTS",
+    "HIGHWAY": "HWY",
+    "HWY": "HWY",
+    "HOLLOW": "HOLW",
+    "HOLW": "HOLW",
+    "LANE": "LN",
+    "LN": "LN",
+    "LOOP": "LOOP",
+    "MEADOWS": "MDWS",
+    "MDWS": "MDWS",
+    "PARK": "PARK",
+    "PARKWAY": "PKWY",
+    "PKWY": "PKWY",
+    "PKY": "PKWY",
+    "PASS": "PASS",
+    "PATH": "PATH",
+    "PIKE": "PIKE",
+    "PLACE": "PL",
+    "PL": "PL",
+    "PLAZA": "PLZ",
+    "PLZ": "PLZ",
+    "POINT": "PT",
+    "PT": "PT",
+    "RIDGE": "RDG",
+    "RDG": "RDG",
+    "ROAD": "RD",
+    "RD": "RD",
+    "RUN": "RUN",
+    "SQUARE": "SQ",
+    "SQ": "SQ",
+    "STREET": "ST",
+    "ST": "ST",
+    "STR": "ST",
+    "TERRACE": "TER",
+    "TER": "TER",
+    "TRACE": "TRCE",
+    "TRCE": "TRCE",
+    "TRAIL": "TRL",
+    "TRL": "TRL",
+    "TURNPIKE": "TPKE",
+    "TPKE": "TPKE",
+    "VIEW": "VW",
+    "VW": "VW",
+    "VILLAGE": "VLG",
+    "VLG": "VLG",
+    "WALK": "WALK",
+    "WAY": "WAY",
+    "WY": "WAY",
+}
+DIRECTIONS: Dict[str, str] = {
+    "NORTH": "N",
+    "N": "N",
+    "SOUTH": "S",
+    "S": "S",
+    "EAST": "E",
+    "E": "E",
+    "WEST": "W",
+    "W": "W",
+    "NORTHEAST": "NE",
+    "NE": "NE",
+    "NORTHWEST": "NW",
+    "NW": "NW",
+    "SOUTHEAST": "SE",
+    "SE": "SE",
+    "SOUTHWEST": "SW",
+    "SW": "SW",
+}
+UNITS: Dict[str, str] = {
+    "APARTMENT": "APT",
+    "APT": "APT",
+    "BUILDING": "BLDG",
+    "BLDG": "BLDG",
+    "FLOOR": "FL",
+    "FL": "FL",
+    "LOT": "LOT",
+    "ROOM": "RM",
+    "RM": "RM",
+    "SPACE": "SPC",
+    "SPC": "SPC",
+    "SUITE": "STE",
+    "STE": "STE",
+    "TRAILER": "TRLR",
+    "TRLR": "TRLR",
+    "UNIT": "UNIT",
+    "#": "#",
+}
+STATES: Dict[str, str] = {
+    "ALABAMA": "AL",
+    "ALASKA": "AK",
+    "ARIZONA": "AZ",
+    "ARKANSAS": "AR",
+    "CALIFORNIA": "CA",
+    "COLORADO": "CO",
+    "CONNECTICUT": "CT",
+    "DELAWARE": "DE",
+    "DISTRICT OF COLUMBIA": "DC",
+    "FLORIDA": "FL",
+    "GEORGIA": "GA",
+    "HAWAII": "HI",
+    "IDAHO": "ID",
+    "ILLINOIS": "IL",
+    "INDIANA": "IN",
+    "IOWA": "IA",
+    "KANSAS": "KS",
+    "KENTUCKY": "KY",
+    "LOUISIANA": "LA",
+    "MAINE": "ME",
+    "MARYLAND": "MD",
+    "MASSACHUSETTS": "MA",
+    "MICHIGAN": "MI",
+    "MINNESOTA": "MN",
+    "MISSISSIPPI": "MS",
+    "MISSOURI": "MO",
+    "MONTANA": "MT",
+    "NEBRASKA": "NE",
+    "NEVADA": "NV",
+    "NEW HAMPSHIRE": "NH",
+    "NEW JERSEY": "NJ",
+    "NEW MEXICO": "NM",
+    "NEW YORK": "NY",
+    "NORTH CAROLINA": "NC",
+    "NORTH DAKOTA": "ND",
+    "OHIO": "OH",
+    "OKLAHOMA": "OK",
+    "OREGON": "OR",
+    "PENNSYLVANIA": "PA",
+    "PUERTO RICO": "PR",
+    "RHODE ISLAND": "RI",
+    "SOUTH CAROLINA": "SC",
+    "SOUTH DAKOTA": "SD",
+    "TENNESSEE": "TN",
+    "TEXAS": "TX",
+    "UTAH": "UT",
+    "VERMONT": "VT",
+    "VIRGINIA": "VA",
+    "WASHINGTON": "WA",
+    "WEST VIRGINIA": "WV",
+    "WISCONSIN": "WI",
+    "WYOMING": "WY",
+}
+# First three ZIP digits assigned to each state, as inclusive ranges.
+ZIP_PREFIXES: Dict[str, Sequence[Tuple[int, int]]] = {
+    "AL": [(350, 369)],
+    "AK": [(995, 999)],
+    "AZ": [(850, 865)],
+    "AR": [(716, 729), (755, 755)],
+    "CA": [(900, 961)],
+    "CO": [(800, 816)],
+    "CT": [(60, 69)],
+    "DE": [(197, 199)],
+    "DC": [(200, 200), (202, 205)],
+    "FL": [(320, 349)],
+    "GA": [(300, 319), (398, 399)],
+    "HI": [(967, 968)],
+    "ID": [(832, 838)],
+    "IL": [(600, 629)],
+    "IN": [(460, 479)],
+    "IA": [(500, 528)],
+    "KS": [(660, 679)],
+    "KY": [(400, 427)],
+    "LA": [(700, 714)],
+    "ME": [(39, 49)],
+    "MD": [(206, 219)],
+    "MA": [(10, 27), (55, 55)],
+    "MI": [(480, 499)],
+    "MN": [(550, 567)],
+    "MS": [(386, 397)],
+    "MO": [(630, 658)],
+    "MT": [(590, 599)],
+    "NE": [(680, 693)],
+    "NV": [(889, 898)],
+    "NH": [(30, 38)],
+    "NJ": [(70, 89)],
+    "NM": [(870, 884)],
+    "NY": [(5, 5), (63, 63), (100, 149)],
+    "NC": [(270, 289)],
+    "ND": [(580, 588)],
+    "OH": [(430, 459)],
+    "OK": [(730, 749)],
+    "OR": [(970, 979)],
+    "PA": [(150, 196)],
+    "PR": [(6, 9)],
+    "RI": [(28, 29)],
+    "SC": [(290, 299)],
+    "SD": [(570, 577)],
+    "TN": [(370, 385)],
+    "TX": [(733, 733), (750, 799), (885, 885)],
+    "UT": [(840, 847)],
+    "VT": [(50, 59)],
+    "VA": [(201, 201), (220, 246)],
+    "WA": [(980, 994)],
+    "WV": [(247, 268)],
+    "WI": [(530, 549)],
+    "WY": [(820, 831)],
+}
+STATE_CODES = frozenset(STATES.values())
+
+_ZIP = re.compile(r"(?:^|\s)(\d{5})(?:\s*-\s*(\d{4}))?$")
+_NUMBER = re.compile(r"^\d+[A-Z]?(?:-\d+[A-Z]?)?$|^\d+/\d+$")
+
+
+@dataclass
+class NormalizedAddress:
+    # A US street address split into USPS components. `key` is the canonical
+    # one-line form; normalizing a key again yields the same key.
+    number: str | None = None
+    predirection: str | None = None
+    street: str | None = None
+    suffix: str | None = None
+    postdirection: str | None = None
+    unit: str | None = None
+    city: str | None = None
+    state: str | None = None
+    zip5: str | None = None
+    zip4: str | None = None
+    problems: List[str] = field(default_factory=list)
+
+    @property
+    def street_line(self) -> str:
+        parts = (
+            self.number,
+            self.predirection,
+            self.street,
+            self.suffix,
+            self.postdirection,
+            self.unit,
+        )
+        return " ".join(part for part in parts if part)
+
+    @property
+    def zip_valid(self) -> bool:
+        return self.zip5 is not None and not any(
+            problem.startswith("ZIP") for problem in self.problems
+        )
+
+    @property
+    def key(self) -> str:
+        last = " ".join(part for part in (self.state, self.zip5) if part)
+        return ", ".join(part for part in (self.street_line, self.city, last) if part)
+
+
+def normalize_address(raw: str | None) -> NormalizedAddress | None:
+    # Uppercases, drops periods, abbreviates suffixes, directionals, unit
+    # designators and state names, and checks the ZIP against the state.
+    # Returns None when there is nothing address-like to work with.
+    if not raw:
+        return None
+    text = re.sub(r"[^\w#,/\- ]", " ", raw.upper().replace(".", ""))
+    text = re.sub(r"\s+", " ", text).strip(" ,")
+    if not text:
+        return None
+    address = NormalizedAddress()
+
+    match = _ZIP.search(text)
+    if match:
+        address.zip5, address.zip4 = match.group(1), match.group(2)
+        text = text[: match.start()].rstrip(" ,")
+    text, address.state = _take_state(text)
+
+    segments = [segment.strip() for segment in text.split(",") if segment.strip()]
+    if not segments:
+        return None
+    words = segments[0].replace("#", " # ").split()
+    city_parts: List[str] = []
+    for segment in segments[1:]:
+        first = segment.replace("#", " # ").split()
+        if first and first[0] in UNITS and address.unit is None:
+            address.unit = _unit(first)
+        else:
+            city_parts.append(segment)
+    _split_street(words, address, city_parts)
+    if city_parts:
+        address.city = city_parts[-1]
+
+    # Without a house number or a ZIP there is nothing to geocode ("see
+    # attached", "unknown").
+    if address.number is None and address.zip5 is None:
+        return None
+    _check_zip(address)
+    return address
+
+
+def _take_state(text: str) -> Tuple[str, str | None]:
+    # The state is the last word (a code) or the last one to three words (a
+    # full name), possibly set off by a comma.
+    words = text.replace(",", " , ").split()
+    for size in (3, 2, 1):
+        if len(words) <= size:
+            continue
+        tail = " ".join(words[-size:])
+        code = STATES.get(tail) or (tail if size == 1 and tail in STATE_CODES else None)
+        if code is None:
+            continue
+        # A lone code right after the street number is a street name ("1 N ST").
+        rest = words[:-size]
+        if len([word for word in rest if word != ","]) < 2:
+            continue
+        return " ".join(rest).replace(" , ", ", ").rstrip(" ,"), code
+    return text, None
+
+
+def _split_street(
+    words: List[str], address: NormalizedAddress, city_parts: List[str]
+) -> None:
+    if words and _NUMBER.match(words[0]):
+        address.number = words.pop(0)
+    # A unit designator ends the street; anything after the unit's id is the
+    # city when no comma set it apart ("1 Elm St Apt 2 Austin").
+    for index, word in enumerate(words):
+        if word in UNITS and index > 0:
+            tail = words[index:]
+            size = 2 if len(tail) > 1 else 1
+            address.unit = _unit(tail[:size])
+            if tail[size:] and not city_parts:
+                city_parts.append(" ".join(tail[size:]))
+            words = words[:index]
+            break
+    else:
+        # Without commas the city follows the last street suffix.
+        if not city_parts:
+            for index in range(len(words) - 1, 0, -1):
+                if words[index] in SUFFIXES:
+                    after = words[index + 1 :]
+                    if after and after[0] in DIRECTIONS:
+                        after = after[1:]
+                        index += 1
+                    if after:
+                        city_parts.append(" ".join(after))
+                        words = words[: index + 1]
+                    break
+    if len(words) > 1 and words[0] in DIRECTIONS:
+        address.predirection = DIRECTIONS[words.pop(0)]
+    if len(words) > 1 and words[-1] in DIRECTIONS and words[-2] in SUFFIXES:
+        address.postdirection = DIRECTIONS[words.pop()]
+    if len(words) > 1 and words[-1] in SUFFIXES:
+        address.suffix = SUFFIXES[words.pop()]
+    address.street = " ".join(words) or None
+
+
+def _unit(words: List[str]) -> str:
+    designator = UNITS[words[0]]
+    ident = " ".join(word.lstrip("#") for word in words[1:] if word != "#")
+    if designator == "#":
+        return f"# {ident}".strip()
+    return f"{designator} {ident}".strip()
+
+
+def _check_zip(address: NormalizedAddress) -> None:
+    if address.zip5 is None:
+        address.problems.append("no ZIP")
+        return
+    if address.zip5 == "00000":
+        address.problems.append(f"ZIP {address.zip5} is not a valid ZIP")
+        return
+    if address.state is None:
+        return
+    prefix = int(address.zip5[:3])
+    ranges = ZIP_PREFIXES.get(address.state, ())
+    if not any(low <= prefix <= high for low, high in ranges):
+        address.problems.append(f"ZIP {address.zip5} is not in {address.state}")
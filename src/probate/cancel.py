@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import signal
+import threading
+import time
+
+
+class Cancelled(BaseException):
+    # Derives from BaseException (like KeyboardInterrupt) so the broad
+    # `except Exception` fallbacks in extraction and OCR don't swallow it.
+    pass
+
+
+class CancelToken:
+    def __init__(self) -> None:
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+        self.reason = ""
+        # Time spent paused, so deadlines can stand still during a pause (see
+        # watchdog.CaseToken). No lock: pause() runs in signal handlers.
+        self._paused_at: float | None = None
+        self._paused_total = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        self.reason = reason
+        self._cancelled.set()
+        # Wake anything blocked in a paused checkpoint so it can observe the cancel.
+        self._end_pause()
+        self._running.set()
+
+    def pause(self) -> None:
+        if not self.cancelled:
+            if self._paused_at is None:
+                self._paused_at = time.monotonic()
+            self._running.clear()
+
+    def resume(self) -> None:
+        self._end_pause()
+        self._running.set()
+
+    def paused_seconds(self) -> float:
+        # Total time paused so far, including a pause still in progress.
+        paused_at = self._paused_at
+        current = time.monotonic() - paused_at if paused_at is not None else 0.0
+        return self._paused_total + current
+
+    def _end_pause(self) -> None:
+        paused_at, self._paused_at = self._paused_at, None
+        if paused_at is not None:
+            self._paused_total += time.monotonic() - paused_at
+
+    def checkpoint(self) -> None:
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise Cancelled(self.reason)
+
+    def sleep(self, seconds: float) -> None:
+        if self._cancelled.wait(seconds):
+            raise Cancelled(self.reason)
+        self.checkpoint()
+
+
+def checkpoint(token: CancelToken | None) -> None:
+    if token is not None:
+        token.checkpoint()
+
+
+def install_signal_handlers(token: CancelToken) -> None:
+    # SIGINT/SIGTERM request a clean stop (a second SIGINT interrupts for real);
+    # SIGUSR1/SIGUSR2 pause and resume where the platform has them.
+    def request_stop(signum: int, _frame: object) -> None:
+        if token.cancelled and signum == signal.SIGINT:
+            raise KeyboardInterrupt
+        token.cancel(f"received {signal.Signals(signum).name}")
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    if hasattr(signal, "SIGBREAK"):
+        signal.signal(signal.SIGBREAK, request_stop)  # type: ignore[attr-defined]
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda *_args: token.pause())
+        signal.signal(signal.SIGUSR2, lambda *_args: token.resume())
@@ -1,35 +1,529 @@
 from __future__ import annotations
 
 import argparse
+import sys
 from datetime import date, datetime, timedelta
-from zoneinfo import ZoneInfo
 
-from probate.config import load_config
-from probate.pipeline import run_from_config
+# Keep module-level imports to the standard library: config parsing and the
+# pipeline (pdfplumber, requests, openpyxl, ...) are imported inside the
+# command handlers so `--help` and argument errors return without paying for them.
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="InfinityAlamo pipeline")
     parser.add_argument("--config", default="config/counties.yaml")
     parser.add_argument("--date", help="Run for specific date YYYY-MM-DD")
     parser.add_argument("--yesterday", action="store_true")
     parser.add_argument("--today", action="store_true")
-    return parser.parse_args()
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Rehash stored PDFs for the run date instead of trusting size/mtime",
+    )
 
+    commands = parser.add_subparsers(dest="command")
+    verify = commands.add_parser(
+        "verify", help="Check the PDF store for corrupt, truncated or orphaned files"
+    )
+    verify.add_argument("--workers", type=int, default=None)
+    verify.add_argument(
+        "--repair",
+        action="store_true",
+        help="Refetch corrupt, truncated and missing files through their connector",
+    )
+
+    reparse = commands.add_parser(
+        "reparse",
+        help="Rerun the field parser over stored text and rewrite existing reports",
+    )
+    reparse.add_argument("--since", help="First report date YYYY-MM-DD")
+    reparse.add_argument("--until", help="Last report date YYYY-MM-DD")
+    reparse.add_argument("--workers", type=int, default=None)
+    reparse.add_argument(
+        "--extract-missing",
+        action="store_true",
+        help="Extract text from the stored PDF for cases not yet in the text corpus",
+    )
+    reparse.add_argument(
+        "--dry-run", action="store_true", help="Show the diff without writing reports"
+    )
+    reparse.add_argument(
+        "--show", type=int, default=20, help="Field changes to list (default 20)"
+    )
+
+    page_hashes = commands.add_parser(
+        "page-hashes",
+        help="Print each page's hash and blank check, for boilerplate_pages",
+    )
+    page_hashes.add_argument("pdfs", nargs="+", metavar="PDF")
+
+    learn = commands.add_parser(
+        "learn-template",
+        help="Build a county form template from sample PDFs and print its YAML",
+    )
+    learn.add_argument("name", help="Template name")
+    learn.add_argument("pdfs", nargs="+", metavar="PDF")
+    learn.add_argument("--page", type=int, default=1, help="Page holding the fields")
+
+    bench = commands.add_parser(
+        "bench-text",
+        help="Compare text-layer backends for speed and field recall",
+    )
+    bench.add_argument(
+        "paths",
+        nargs="*",
+        metavar="PATH",
+        help="PDFs or directories to scan (defaults to the bundled fixtures)",
+    )
+    bench.add_argument(
+        "--backends",
+        default=None,
+        help="Comma-separated backends in fallback order (default pdfium,pdfplumber)",
+    )
+
+    bench_parse = commands.add_parser(
+        "bench-parse",
+        help="Compare exact and fuzzy field parsing on text with synthetic OCR noise",
+    )
+    bench_parse.add_argument(
+        "paths",
+        nargs="*",
+        metavar="PATH",
+        help="PDFs, .txt files or directories (defaults to the bundled fixtures)",
+    )
+    bench_parse.add_argument(
+        "--noise", type=float, default=0.15, help="Per-character noise rate in labels"
+    )
+    bench_parse.add_argument(
+        "--rounds", type=int, default=20, help="Noisy copies of each document"
+    )
+    bench_parse.add_argument("--seed", type=int, default=0)
+
+    standin = commands.add_parser(
+        "standin-portal",
+        help="Serve simulated county portals locally for the `standin` connector",
+    )
+    standin.add_argument("--host", default="127.0.0.1")
+    standin.add_argument("--port", type=int, default=8899)
+    _portal_arguments(standin)
+
+    loadtest = commands.add_parser(
+        "loadtest",
+        help="Run the pipeline over simulated counties on a local stand-in portal",
+    )
+    loadtest.add_argument("--counties", type=int, default=8)
+    loadtest.add_argument(
+        "--concurrency", type=int, default=2, help="Cases in flight per county"
+    )
+    loadtest.add_argument(
+        "--rate-limit-seconds",
+        type=float,
+        default=0.0,
+        help="Client-side spacing between one county's portal requests",
+    )
+    loadtest.add_argument(
+        "--workdir", help="Where PDFs and logs go (defaults to a temporary directory)"
+    )
+    _portal_arguments(loadtest)
+
+    poll = commands.add_parser(
+        "poll", help="Poll county indexes during the day and process new cases"
+    )
+    poll.add_argument(
+        "--interval",
+        type=float,
+        default=None,
+        help="Minutes between polls (defaults to per-county poll_interval_minutes)",
+    )
+    poll.add_argument("--once", action="store_true", help="Poll a single time")
+
+    serve = commands.add_parser(
+        "serve", help="Run as a daemon with a built-in scheduler and local API"
+    )
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument(
+        "--socket", help="Listen on this Unix socket path instead of TCP"
+    )
+
+    coordinate = commands.add_parser(
+        "coordinate",
+        help="Enqueue the run date's cases for workers and assemble the report",
+    )
+    coordinate.add_argument("--queue", help="Job queue URL (defaults to run.job_queue)")
+    coordinate.add_argument(
+        "--timeout", type=float, default=None, help="Give up after this many seconds"
+    )
+
+    worker = commands.add_parser("worker", help="Process queued cases")
+    worker.add_argument("--queue", help="Job queue URL (defaults to run.job_queue)")
+    worker.add_argument("--worker-id", default=None)
+    worker.add_argument(
+        "--visibility-timeout",
+        type=float,
+        default=600.0,
+        help="Seconds a leased case stays hidden before another worker may retry it",
+    )
+    worker.add_argument(
+        "--idle-exit",
+        type=float,
+        default=None,
+        help="Exit after the queue has been empty this many seconds",
+    )
+    return parser.parse_args(argv)
+
+
+def _portal_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--cases", type=int, default=20, help="Cases per county")
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument(
+        "--jitter-ms", type=float, default=20.0, help="Mean extra latency (exponential)"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.02, help="Share of API requests given 503"
+    )
+    parser.add_argument("--document-error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--rate-limit", type=float, default=None, help="Requests/s per county, or none"
+    )
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--token", help="Bearer token the portal requires")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    try:
+        _dispatch(args)
+    except ValueError as exc:
+        from probate.config import ConfigError
+
+        if not isinstance(exc, ConfigError):
+            raise
+        print(exc, file=sys.stderr)
+        sys.exit(2)
+
+
+def _dispatch(args: argparse.Namespace) -> None:
+    if args.command == "verify":
+        sys.exit(_verify(args))
+    if args.command == "reparse":
+        _reparse(args)
+        return
+    if args.command == "page-hashes":
+        _page_hashes(args)
+        return
+    if args.command == "learn-template":
+        _learn_template(args)
+        return
+    if args.command == "bench-text":
+        _bench_text(args)
+        return
+    if args.command == "bench-parse":
+        _bench_parse(args)
+        return
+    if args.command in ("standin-portal", "loadtest"):
+        _standin(args)
+        return
+    if args.command == "poll":
+        _poll(args)
+        return
+    if args.command == "serve":
+        from probate.daemon import serve
+
+        serve(args.config, host=args.host, port=args.port, socket_path=args.socket)
+        return
+    if args.command in ("coordinate", "worker"):
+        _jobs(args)
+        return
+    _run(args)
+
+
+def _run(args: argparse.Namespace) -> None:
+    from probate.cancel import CancelToken, install_signal_handlers
+    from probate.config import load_config
+    from probate.pipeline import run_pipeline
 
-def main() -> None:
-    args = parse_args()
     config = load_config(args.config)
-    tz = ZoneInfo(config.run.timezone)
+    target_date = _target_date(args, config)
 
+    token = CancelToken()
+    install_signal_handlers(token)
+    run_pipeline(config, target_date, verify=args.verify, cancel_token=token)
+    if token.cancelled:
+        sys.exit(1)
+
+
+def _target_date(args: argparse.Namespace, config) -> date:
+    from zoneinfo import ZoneInfo
+
+    tz = ZoneInfo(config.run.timezone)
     if args.date:
-        target_date = date.fromisoformat(args.date)
-    elif args.today:
-        target_date = datetime.now(tz).date()
-    else:
-        target_date = datetime.now(tz).date() - timedelta(days=1)
+        return date.fromisoformat(args.date)
+    if args.today:
+        return datetime.now(tz).date()
+    return datetime.now(tz).date() - timedelta(days=1)
 
-    run_from_config(args.config, target_date)
+
+def _poll(args: argparse.Namespace) -> None:
+    from zoneinfo import ZoneInfo
+
+    from probate.cancel import CancelToken, install_signal_handlers
+    from probate.config import load_config
+    from probate.incremental import poll_forever, poll_once
+
+    config = load_config(args.config)
+    token = CancelToken()
+    install_signal_handlers(token)
+    if args.once:
+        target_date = (
+            date.fromisoformat(args.date)
+            if args.date
+            else datetime.now(ZoneInfo(config.run.timezone)).date()
+        )
+        poll_once(config, target_date, cancel_token=token)
+        return
+    poll_forever(config, token, interval_minutes=args.interval, config_path=args.config)
+
+
+def _jobs(args: argparse.Namespace) -> None:
+    from probate.cancel import CancelToken, install_signal_handlers
+    from probate.config import load_config
+    from probate.jobs import get_queue
+
+    config = load_config(args.config)
+    queue = get_queue(args.queue or config.run.job_queue)
+    token = CancelToken()
+    install_signal_handlers(token)
+    try:
+        if args.command == "worker":
+            from probate.jobs.worker import run_worker
+
+            run_worker(
+                config,
+                queue,
+                worker_id=args.worker_id,
+                visibility_timeout=args.visibility_timeout,
+                idle_exit=args.idle_exit,
+                cancel_token=token,
+            )
+            return
+        from probate.jobs.coordinator import coordinate
+
+        coordinate(
+            config,
+            queue,
+            _target_date(args, config),
+            timeout=args.timeout,
+            cancel_token=token,
+        )
+    finally:
+        queue.close()
+
+
+def _reparse(args: argparse.Namespace) -> None:
+    from probate.config import load_config
+    from probate.reparse import reparse
+
+    config = load_config(args.config)
+    # The global --date limits the reparse to that one day.
+    since = args.since or args.date
+    until = args.until or args.date
+    report = reparse(
+        config,
+        since=date.fromisoformat(since) if since else None,
+        until=date.fromisoformat(until) if until else None,
+        workers=args.workers,
+        extract_missing=args.extract_missing,
+        write=not args.dry_run,
+    )
+    print(
+        f"reparsed {report.reparsed} of {report.cases} cases in "
+        f"{len(report.reports)} reports in {report.elapsed_seconds:.1f}s "
+        f"({report.missing_text} without stored text, "
+        f"{report.extracted} extracted)"
+    )
+    print(f"{report.changed_cases} cases changed")
+    for name, count in sorted(report.field_counts().items()):
+        print(f"  {name}: {count}")
+    for change in report.changes[: args.show]:
+        print(
+            f"{change.report.name} {change.county} {change.case_number} "
+            f"{change.field}: {change.old!r} -> {change.new!r}"
+        )
+    if len(report.changes) > args.show:
+        print(f"... {len(report.changes) - args.show} more changes")
+    if args.dry_run:
+        print("dry run: no reports written")
+
+
+def _page_hashes(args: argparse.Namespace) -> None:
+    from pathlib import Path
+
+    from probate.pdf.page_filter import classify, pdf_page_signals
+
+    for pdf in args.pdfs:
+        for number, signals in enumerate(pdf_page_signals(Path(pdf)), start=1):
+            verdict = classify(signals) or "ocr"
+            print(
+                f"{pdf} page {number}: {signals.dhash} ink={signals.ink:.4f} "
+                f"entropy={signals.entropy:.2f} {verdict}"
+            )
+
+
+def _learn_template(args: argparse.Namespace) -> None:
+    from pathlib import Path
+
+    import yaml
+
+    from probate.pdf.templates import learn_template
+
+    template = learn_template(
+        args.name, [Path(pdf) for pdf in args.pdfs], page_number=args.page
+    )
+    if not template.fields:
+        print("no field labels found on the samples", file=sys.stderr)
+        sys.exit(1)
+    # Paste under the county's entry in config/counties.yaml.
+    print(yaml.safe_dump({"templates": [template.to_config()]}, sort_keys=False))
+
+
+def _bench_text(args: argparse.Namespace) -> None:
+    from pathlib import Path
+
+    from probate.pdf.backends import BACKENDS, DEFAULT_BACKENDS, benchmark, find_pdfs
+
+    backends = args.backends.split(",") if args.backends else list(DEFAULT_BACKENDS)
+    unknown = [name for name in backends if name not in BACKENDS]
+    if unknown:
+        print(f"unknown backends: {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(2)
+    paths = [Path(path) for path in args.paths] or [Path(__file__).parent / "fixtures"]
+    pdfs = find_pdfs(paths)
+    if not pdfs:
+        print("no PDFs found", file=sys.stderr)
+        sys.exit(1)
+    print(f"{len(pdfs)} PDFs")
+    for row in benchmark(pdfs, backends):
+        print(
+            f"{row.name:<20} {row.ms_per_document:8.1f} ms/doc  "
+            f"recall {row.recall:6.1%}  ({row.fields_found}/{row.fields_possible} "
+            f"fields, {row.unreadable} unreadable)"
+        )
+        missed = [
+            name for name, count in row.per_field.items() if count < row.documents
+        ]
+        if missed:
+            print(f"{'':<20} missed: {', '.join(missed)}")
+
+
+def _bench_parse(args: argparse.Namespace) -> None:
+    from pathlib import Path
+
+    from probate.pdf.extract_text import extract_text
+    from probate.pdf.fuzzy_labels import benchmark_parse
+    from probate.pdf.parse_fields import parse_fields
+
+    paths = [Path(path) for path in args.paths] or [Path(__file__).parent / "fixtures"]
+    files = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(path.rglob("*.pdf")) + sorted(path.rglob("*.txt")))
+        else:
+            files.append(path)
+    texts = [extract_text(path, ocr="never")[0] for path in files]
+    texts = [text for text in texts if text.strip()]
+    if not texts:
+        print("no text found", file=sys.stderr)
+        sys.exit(1)
+    print(
+        f"{len(texts)} documents, {args.rounds} noisy copies each at {args.noise:.0%}"
+    )
+    for row in benchmark_parse(
+        texts, parse_fields, noise=args.noise, seed=args.seed, rounds=args.rounds
+    ):
+        print(
+            f"{row.name:<12} precision {row.precision:6.1%}  recall {row.recall:6.1%}  "
+            f"{row.docs_per_second:9.0f} docs/s"
+        )
+
+
+def _standin(args: argparse.Namespace) -> None:
+    import tempfile
+    from contextlib import nullcontext
+    from pathlib import Path
+
+    from probate.standin import PortalSettings, StandinPortal
+
+    settings = PortalSettings(
+        cases_per_day=args.cases,
+        page_size=args.page_size,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        document_error_rate=args.document_error_rate,
+        rate_limit_per_second=args.rate_limit,
+        burst=args.burst,
+        token=args.token,
+        seed=args.seed,
+    )
+    if args.command == "standin-portal":
+        portal = StandinPortal(settings, host=args.host, port=args.port)
+        print(f"serving simulated counties at {portal.url}/<county>")
+        try:
+            portal.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    from probate.standin.loadtest import run_load_test
+
+    # A scratch directory is only made when no --workdir is given.
+    workdir = (
+        nullcontext(args.workdir)
+        if args.workdir
+        else tempfile.TemporaryDirectory(prefix="probate-loadtest-")
+    )
+    with workdir as root:
+        report = run_load_test(
+            Path(root),
+            counties=args.counties,
+            settings=settings,
+            concurrency=args.concurrency,
+            rate_limit_seconds=args.rate_limit_seconds,
+        )
+    for line in report.summary_lines():
+        print(line)
+
+
+def _verify(args: argparse.Namespace) -> int:
+    from probate.config import load_config
+    from probate.verify import print_progress, verify_storage
+
+    config = load_config(args.config)
+    report = verify_storage(
+        config, workers=args.workers, repair=args.repair, progress=print_progress
+    )
+    print(
+        f"checked {report.files_checked} files "
+        f"({report.bytes_hashed / 1_000_000:.1f} MB) in "
+        f"{report.elapsed_seconds:.1f}s, {report.throughput_mb_s:.1f} MB/s"
+    )
+    for label, paths in (
+        ("corrupt", report.corrupt),
+        ("truncated", report.truncated),
+        ("missing", report.missing),
+        ("untracked", report.untracked),
+        ("orphaned blob", report.orphaned_blobs),
+        ("repaired", report.repaired),
+        ("repair failed", report.repair_failed),
+    ):
+        for path in paths:
+            print(f"{label}: {path}")
+    if args.repair:
+        return 0 if not report.repair_failed else 1
+    return 0 if report.ok else 1
 
 
 if __name__ == "__main__":
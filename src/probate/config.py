@@ -1,11 +1,28 @@
 from __future__ import annotations
 
+import copy
+import dataclasses
+import difflib
+import importlib.util
+import logging
+import os
+import re
+import threading
+import types
+import typing
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 import yaml
 
+logger = logging.getLogger("probate.config")
+
+OCR_POLICIES = ("auto", "always", "never")
+REPORT_SIBLINGS = ("csv", "parquet")
+TEXT_BACKENDS = ("pdfium", "pypdf", "pdfplumber")
+CASE_STAGES = ("details", "download", "extract", "parse")
+
 
 @dataclass
 class RunConfig:
@@ -13,6 +30,19 @@ class RunConfig:
     default_mode: str = "yesterday"
     rate_limit_seconds: float = 1.0
     retries: int = 3
+    run_at: str = "21:00"
+    poll_interval_minutes: float = 15.0
+    job_queue: str = "data/jobs.sqlite3"
+    prioritize: bool = False
+    priority_probe: bool = False
+    time_budget_minutes: float | None = None
+    cpu_budget_minutes: float | None = None
+    # 0 disables DEBUG logs, 1 keeps all of them, N keeps one in N per call site.
+    log_debug_every: int = 0
+    # Geocoder URL ("census", "offline://points.json"); unset leaves
+    # coordinates empty. Answers are cached by normalized address.
+    geocoder: str | None = None
+    geocode_cache: str = "data/geocode.sqlite3"
 
 
 @dataclass
@@ -20,6 +50,11 @@ class OutputConfig:
     pdf_dir: str = "data/pdfs"
     report_dir: str = "output/reports"
     logs_dir: str = "output/logs"
+    # Extra copies of each report written next to the .xlsx: csv and/or parquet.
+    report_siblings: List[str] = dataclasses.field(default_factory=list)
+    # One sheet per county after the combined "All Leads" sheet. Off by
+    # default: every row is then written twice, doubling the report's cost.
+    per_county_sheets: bool = False
 
 
 @dataclass
@@ -30,6 +65,52 @@ class CountyConfig:
     portal_url: str
     mode: str = "requests"
     auth: Dict[str, Any] | None = None
+    run_at: str | None = None
+    poll_interval_minutes: float | None = None
+    # Cases processed in parallel for this county.
+    concurrency: int = 1
+    # Minimum seconds between portal requests; defaults to run.rate_limit_seconds.
+    rate_limit_seconds: float | None = None
+    # auto: OCR only when a PDF has no text layer; always; or never.
+    ocr: str = "auto"
+    request_timeout_seconds: float = 30.0
+    # Circuit breaker: skip the county's remaining cases after this many
+    # consecutive failures, or once median portal latency exceeds the limit.
+    breaker_failures: int = 5
+    breaker_latency_seconds: float | None = None
+    # Per-county budgets; cases past a limit are deferred to the next run.
+    time_budget_minutes: float | None = None
+    max_requests: int | None = None
+    max_ocr_pages: int | None = None
+    # Checked before a page is OCR'd: near-empty pages are skipped, and so are
+    # pages whose hash (see `probate page-hashes`) matches a known boilerplate
+    # page such as a cover sheet or clerk stamp.
+    skip_blank_pages: bool = True
+    boilerplate_pages: List[str] = dataclasses.field(default_factory=list)
+    # Per-document limits: pages past max_pdf_pages are not read, and text past
+    # max_text_mb goes to <label>.txt next to the PDF instead of memory.
+    max_pdf_pages: int | None = None
+    max_text_mb: float = 4.0
+    # Text-layer readers tried in order until every field parses; the last
+    # one's text is used when none gets them all. See probate.pdf.backends.
+    text_backends: List[str] = dataclasses.field(
+        default_factory=lambda: ["pdfium", "pdfplumber"]
+    )
+    # Form layouts (see `probate learn-template`): fields are read only from
+    # their regions on documents that match.
+    templates: List[Dict[str, Any]] = dataclasses.field(default_factory=list)
+    # Watchdog (see probate.watchdog): a case is abandoned once it has run for
+    # case_timeout_seconds, or once a stage (details, download, extract,
+    # parse) passes its stage_timeouts entry; it is reported with the timeout
+    # as its error. Extraction runs in a worker process that is killed at the
+    # deadline unless isolate_extraction is off; other stages stop at their
+    # next cancellation checkpoint (connectors get the case's token for
+    # details and download), or fail when they end past the deadline.
+    case_timeout_seconds: float | None = 1800.0
+    stage_timeouts: Dict[str, float] = dataclasses.field(
+        default_factory=lambda: {"extract": 600.0}
+    )
+    isolate_extraction: bool = True
 
 
 @dataclass
@@ -39,14 +120,326 @@ class AppConfig:
     counties: List[CountyConfig]
 
 
+class ConfigError(ValueError):
+    def __init__(self, path: str | Path, problems: List[str]) -> None:
+        self.path = str(path)
+        self.problems = problems
+        lines = "\n".join(f"  - {problem}" for problem in problems)
+        super().__init__(f"Invalid config {self.path}:\n{lines}")
+
+
+_cache: Dict[Path, Tuple[Tuple[int, int], AppConfig]] = {}
+_cache_lock = threading.Lock()
+
+
 def load_config(path: str | Path) -> AppConfig:
-    data = _read_yaml(path)
-    run = RunConfig(**data.get("run", {}))
-    output = OutputConfig(**data.get("output", {}))
-    counties = [CountyConfig(**c) for c in data.get("counties", [])]
+    # Parsed configs are cached by (mtime, size); callers get their own copy so
+    # per-run tweaks (the UI disabling counties) never leak into the cache.
+    resolved = Path(path).resolve()
+    stamp = _stamp(resolved)
+    with _cache_lock:
+        cached = _cache.get(resolved)
+    if cached is None or cached[0] != stamp:
+        config = _build(_read_yaml(resolved), path)
+        with _cache_lock:
+            _cache[resolved] = (stamp, config)
+    else:
+        config = cached[1]
+    return copy.deepcopy(config)
+
+
+class ConfigWatcher:
+    # Long-running modes call poll() between runs to pick up edits. An invalid
+    # edit is logged and the last good config stays in effect.
+
+    def __init__(self, path: str | Path, config: AppConfig | None = None) -> None:
+        self.path = Path(path)
+        self.config = config or load_config(self.path)
+        self._stamp = _stamp(self.path.resolve())
+
+    def poll(self) -> bool:
+        try:
+            stamp = _stamp(self.path.resolve())
+        except OSError:
+            return False
+        if stamp == self._stamp:
+            return False
+        try:
+            self.config = load_config(self.path)
+        except ConfigError as exc:
+            self._stamp = stamp
+            logger.error("Keeping previous config: %s", exc)
+            return False
+        except OSError as exc:
+            # Replaced or deleted between the stat and the read; the stamp is
+            # left alone so the next poll tries again.
+            logger.error("Keeping previous config: %s", exc)
+            return False
+        self._stamp = stamp
+        logger.info("Reloaded config from %s", self.path)
+        return True
+
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _build(data: Any, path: str | Path) -> AppConfig:
+    problems: List[str] = []
+    if not isinstance(data, dict):
+        raise ConfigError(path, ["top level must be a mapping"])
+    _check_keys(data, {"run", "output", "counties"}, "", problems)
+
+    run = _section(RunConfig, data.get("run") or {}, "run", problems)
+    output = _section(OutputConfig, data.get("output") or {}, "output", problems)
+    counties: List[CountyConfig] = []
+    entries = data.get("counties") or []
+    if not isinstance(entries, list):
+        problems.append("counties: expected a list")
+        entries = []
+    seen: set[str] = set()
+    for position, entry in enumerate(entries):
+        where = f"counties[{position}]"
+        if isinstance(entry, dict) and entry.get("name"):
+            where = f"counties[{entry['name']}]"
+        county = _section(CountyConfig, entry, where, problems)
+        if county is None:
+            continue
+        if county.name in seen:
+            problems.append(f"{where}: duplicate county name")
+        seen.add(county.name)
+        _check_county(county, where, problems)
+        counties.append(county)
+
+    if run is not None:
+        _check_run(run, problems)
+    if output is not None:
+        _check_output(output, problems)
+    if problems or run is None or output is None:
+        raise ConfigError(path, problems)
+    for county in counties:
+        if county.rate_limit_seconds is None:
+            county.rate_limit_seconds = run.rate_limit_seconds
     return AppConfig(run=run, output=output, counties=counties)
 
 
+def _section(cls: type, data: Any, where: str, problems: List[str]) -> Any:
+    if not isinstance(data, dict):
+        problems.append(f"{where}: expected a mapping")
+        return None
+    fields = {field.name: field for field in dataclasses.fields(cls)}
+    hints = typing.get_type_hints(cls)
+    before = len(problems)
+    _check_keys(data, set(fields), where, problems)
+    for name, field in fields.items():
+        if name not in data:
+            required = (
+                field.default is dataclasses.MISSING
+                and field.default_factory is dataclasses.MISSING
+            )
+            if required:
+                problems.append(f"{where}.{name}: required")
+            continue
+        if not _matches(data[name], hints[name]):
+            problems.append(
+                f"{where}.{name}: expected {_type_name(hints[name])}, "
+                f"got {data[name]!r}"
+            )
+    if len(problems) > before:
+        return None
+    return cls(**{key: value for key, value in data.items() if key in fields})
+
+
+def _check_keys(
+    data: Dict[str, Any], known: set[str], where: str, problems: List[str]
+) -> None:
+    prefix = f"{where}." if where else ""
+    for key in data:
+        if key in known:
+            continue
+        hint = difflib.get_close_matches(str(key), sorted(known), n=1)
+        suggestion = f" (did you mean '{hint[0]}'?)" if hint else ""
+        problems.append(f"{prefix}{key}: unknown key{suggestion}")
+
+
+def _matches(value: Any, hint: Any) -> bool:
+    options = typing.get_args(hint) if _is_union(hint) else (hint,)
+    for option in options:
+        origin = typing.get_origin(option) or option
+        if option is type(None) and value is None:
+            return True
+        if origin is bool:
+            if isinstance(value, bool):
+                return True
+        elif origin is float:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return True
+        elif origin is int:
+            if isinstance(value, int) and not isinstance(value, bool):
+                return True
+        elif origin in (str, dict, list) and isinstance(value, origin):
+            return True
+    return False
+
+
+def _is_union(hint: Any) -> bool:
+    return typing.get_origin(hint) in (typing.Union, types.UnionType)
+
+
+def _type_name(hint: Any) -> str:
+    options = typing.get_args(hint) if _is_union(hint) else (hint,)
+    names = []
+    for option in options:
+        origin = typing.get_origin(option) or option
+        names.append("null" if option is type(None) else origin.__name__)
+    return " or ".join(names)
+
+
+_CLOCK = re.compile(r"^([01]?\d|2[0-3]):[0-5]\d$")
+_PAGE_HASH = re.compile(r"^[0-9a-fA-F]{16}$")
+
+
+def _check_run(run: RunConfig, problems: List[str]) -> None:
+    if run.default_mode not in ("today", "yesterday"):
+        problems.append("run.default_mode: expected 'today' or 'yesterday'")
+    if not _CLOCK.match(run.run_at):
+        problems.append(f"run.run_at: expected HH:MM, got {run.run_at!r}")
+    try:
+        from zoneinfo import ZoneInfo
+
+        ZoneInfo(run.timezone)
+    except Exception:
+        problems.append(f"run.timezone: unknown time zone {run.timezone!r}")
+    for name in ("rate_limit_seconds", "poll_interval_minutes"):
+        if getattr(run, name) < 0:
+            problems.append(f"run.{name}: must not be negative")
+    if run.log_debug_every < 0:
+        problems.append("run.log_debug_every: must not be negative")
+    if run.retries < 1:
+        problems.append("run.retries: must be at least 1")
+    if run.geocoder:
+        scheme = run.geocoder.partition("://")[0]
+        if scheme in ("geocode", "normalize") or (
+            importlib.util.find_spec(f"probate.address.{scheme}") is None
+        ):
+            problems.append(f"run.geocoder: no geocoder named {scheme!r}")
+
+
+def _check_output(output: OutputConfig, problems: List[str]) -> None:
+    for value in output.report_siblings:
+        if value not in REPORT_SIBLINGS:
+            problems.append(
+                f"output.report_siblings: expected {' or '.join(REPORT_SIBLINGS)}, "
+                f"got {value!r}"
+            )
+
+
+def _check_county(county: CountyConfig, where: str, problems: List[str]) -> None:
+    if importlib.util.find_spec(f"probate.connectors.{county.connector}") is None:
+        problems.append(f"{where}.connector: no connector named {county.connector!r}")
+    if county.run_at is not None and not _CLOCK.match(county.run_at):
+        problems.append(f"{where}.run_at: expected HH:MM, got {county.run_at!r}")
+    if county.ocr not in OCR_POLICIES:
+        problems.append(f"{where}.ocr: expected one of {', '.join(OCR_POLICIES)}")
+    if not county.text_backends:
+        problems.append(f"{where}.text_backends: must name at least one backend")
+    for value in county.text_backends:
+        if value not in TEXT_BACKENDS:
+            problems.append(
+                f"{where}.text_backends: expected one of {', '.join(TEXT_BACKENDS)}, "
+                f"got {value!r}"
+            )
+        elif value == "pypdf" and importlib.util.find_spec("pypdf") is None:
+            problems.append(f"{where}.text_backends: pypdf is not installed")
+    for value in county.boilerplate_pages:
+        if not isinstance(value, str) or not _PAGE_HASH.match(value):
+            problems.append(
+                f"{where}.boilerplate_pages: expected 16 hex digits, got {value!r}"
+            )
+    for position, template in enumerate(county.templates):
+        _check_template(template, f"{where}.templates[{position}]", problems)
+    if county.concurrency < 1:
+        problems.append(f"{where}.concurrency: must be at least 1")
+    if county.rate_limit_seconds is not None and county.rate_limit_seconds < 0:
+        problems.append(f"{where}.rate_limit_seconds: must not be negative")
+    if county.max_pdf_pages is not None and county.max_pdf_pages < 1:
+        problems.append(f"{where}.max_pdf_pages: must be at least 1")
+    if county.max_text_mb <= 0:
+        problems.append(f"{where}.max_text_mb: must be positive")
+    if county.request_timeout_seconds <= 0:
+        problems.append(f"{where}.request_timeout_seconds: must be positive")
+    for stage, seconds in county.stage_timeouts.items():
+        if stage not in CASE_STAGES:
+            problems.append(
+                f"{where}.stage_timeouts: expected stages among "
+                f"{', '.join(CASE_STAGES)}, got {stage!r}"
+            )
+        elif not isinstance(seconds, (int, float)) or seconds <= 0:
+            problems.append(f"{where}.stage_timeouts.{stage}: must be positive")
+    if county.case_timeout_seconds is not None and county.case_timeout_seconds <= 0:
+        problems.append(f"{where}.case_timeout_seconds: must be positive")
+    if county.breaker_failures < 1:
+        problems.append(f"{where}.breaker_failures: must be at least 1")
+    for name in (
+        "breaker_latency_seconds",
+        "time_budget_minutes",
+        "max_requests",
+        "max_ocr_pages",
+    ):
+        value = getattr(county, name)
+        if value is not None and value < 0:
+            problems.append(f"{where}.{name}: must not be negative")
+
+
+_TEMPLATE_FIELDS = {
+    "deceased_name",
+    "filer_name",
+    "property_address",
+    "case_number",
+    "filing_date",
+}
+
+
+def _check_template(template: Any, where: str, problems: List[str]) -> None:
+    if not isinstance(template, dict):
+        problems.append(f"{where}: expected a mapping")
+        return
+    _check_keys(template, {"name", "page", "page_hash", "fields"}, where, problems)
+    if not isinstance(template.get("name"), str):
+        problems.append(f"{where}.name: required")
+    page = template.get("page", 1)
+    if not isinstance(page, int) or isinstance(page, bool) or page < 1:
+        problems.append(f"{where}.page: expected a page number from 1")
+    page_hash = template.get("page_hash")
+    if page_hash is None:
+        problems.append(f"{where}.page_hash: required")
+    elif not _PAGE_HASH.match(str(page_hash)):
+        problems.append(f"{where}.page_hash: expected 16 hex digits")
+    fields = template.get("fields")
+    if not isinstance(fields, dict) or not fields:
+        problems.append(f"{where}.fields: expected a mapping of field to region")
+        return
+    _check_keys(fields, _TEMPLATE_FIELDS, f"{where}.fields", problems)
+    for name, box in fields.items():
+        valid = (
+            isinstance(box, list)
+            and len(box) == 4
+            and all(isinstance(value, (int, float)) for value in box)
+            and 0 <= box[0] < box[2] <= 1
+            and 0 <= box[1] < box[3] <= 1
+        )
+        if not valid:
+            problems.append(
+                f"{where}.fields.{name}: expected [x0, top, x1, bottom] "
+                "as fractions of the page"
+            )
+
+
 def _read_yaml(path: str | Path) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as handle:
-        return yaml.safe_load(handle) or {}
+        try:
+            return yaml.safe_load(handle) or {}
+        except yaml.YAMLError as exc:
+            # Reported like any other config problem, with the line and column.
+            raise ConfigError(path, [f"YAML syntax: {exc}"]) from None
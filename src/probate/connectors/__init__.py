@@ -3,11 +3,18 @@ from __future__ import annotations
 import importlib
 from typing import Type
 
+from probate.cancel import CancelToken
 from probate.config import CountyConfig
 from probate.connectors.base import BaseConnector
 
 
-def get_connector(connector_name: str, config: CountyConfig) -> BaseConnector:
+def get_connector(
+    connector_name: str,
+    config: CountyConfig,
+    cancel_token: CancelToken | None = None,
+) -> BaseConnector:
     module = importlib.import_module(f"probate.connectors.{connector_name}")
     connector_cls: Type[BaseConnector] = getattr(module, "Connector")
-    return connector_cls(config)
+    connector = connector_cls(config)
+    connector.cancel_token = cancel_token
+    return connector
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import threading
+import time
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from datetime import date
-from typing import List
+from typing import Iterator, List
 
+from probate.cancel import CancelToken, checkpoint
 from probate.config import CountyConfig
 from probate.models import CaseDetails, CaseRef
 
@@ -11,6 +15,59 @@ from probate.models import CaseDetails, CaseRef
 class BaseConnector(ABC):
     def __init__(self, config: CountyConfig) -> None:
         self.config = config
+        self.cancel_token: CancelToken | None = None
+        # Set by case_token() for the thread working on a case.
+        self._case = threading.local()
+        self._throttle_lock = threading.Lock()
+        self._next_request = 0.0
+        # Portal requests made through throttle(); per-county request budgets
+        # are charged from this.
+        self.requests_made = 0
+
+    @contextmanager
+    def case_token(self, token: CancelToken) -> Iterator[None]:
+        # Within the block, the calling thread's checkpoints and waits use the
+        # case's token, which also trips at the case's stage deadlines. The
+        # connector is shared by a county's case threads, so this is per
+        # thread; other threads keep the run's token.
+        previous = getattr(self._case, "token", None)
+        self._case.token = token
+        try:
+            yield
+        finally:
+            self._case.token = previous
+
+    def _token(self) -> CancelToken | None:
+        return getattr(self._case, "token", None) or self.cancel_token
+
+    def checkpoint(self) -> None:
+        # Connectors call this between portal requests (index pages, detail
+        # fetches) so a cancelled or paused run stops at a clean boundary.
+        checkpoint(self._token())
+
+    def throttle(self) -> None:
+        # Spaces portal requests at least rate_limit_seconds apart, shared by
+        # every thread working this county. Connectors call it before every
+        # request their fetch methods send (index pages, detail pages,
+        # retries); PDF downloads are throttled by the caller. Connectors that
+        # only read local files, like the demo fixtures, have nothing to space.
+        interval = self.config.rate_limit_seconds or 0.0
+        with self._throttle_lock:
+            self.requests_made += 1
+            now = time.monotonic()
+            wait = max(0.0, self._next_request - now)
+            self._next_request = max(now, self._next_request) + interval
+        if wait:
+            self.sleep(wait)
+
+    def sleep(self, seconds: float) -> None:
+        # Waits (throttling, retry backoff) end early when the run is cancelled
+        # or, inside case_token(), at the case's deadline.
+        token = self._token()
+        if token is not None:
+            token.sleep(seconds)
+        else:
+            time.sleep(seconds)
 
     @abstractmethod
     def fetch_case_index(self, target_date: date) -> List[CaseRef]:
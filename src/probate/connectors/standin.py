@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import itertools
+import os
+import threading
+import time
+from collections import Counter
+from datetime import date
+from typing import Any, Dict, List
+
+from probate.config import CountyConfig
+from probate.connectors.base import BaseConnector
+from probate.models import CaseDetails, CaseRef, PdfLink
+
+# Attempts per portal request; 429 and 5xx answers and dropped connections
+# are retried, waiting Retry-After when the portal sends one.
+MAX_ATTEMPTS = 4
+BACKOFF_SECONDS = 0.2
+MAX_BACKOFF_SECONDS = 5.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class StandinConnector(BaseConnector):
+    # Talks to probate.standin's portal (or anything speaking its JSON API);
+    # portal_url is the county's base, e.g. http://127.0.0.1:8899/harris.
+    # auth: {"token": ...} or {"token_env": "COUNTY_API_KEY"} for a bearer token.
+    def __init__(self, config: CountyConfig) -> None:
+        super().__init__(config)
+        self.retries = 0
+        self.statuses: Counter[int] = Counter()
+        self.latencies: List[float] = []
+        self._stats_lock = threading.Lock()
+        self._session: Any = None
+
+    def fetch_case_index(self, target_date: date) -> List[CaseRef]:
+        refs: List[CaseRef] = []
+        page: int | None = 1
+        while page is not None:
+            data = self._get(
+                f"{self.config.portal_url}/cases",
+                {"date": target_date.isoformat(), "page": page},
+            )
+            refs.extend(
+                CaseRef(
+                    case_number=case["case_number"],
+                    filing_date=date.fromisoformat(case["filing_date"]),
+                    detail_url=case["detail_url"],
+                )
+                for case in data["cases"]
+            )
+            page = data.get("next_page")
+        return refs
+
+    def fetch_case_details(self, case_ref: CaseRef) -> CaseDetails:
+        data = self._get(case_ref.detail_url)
+        return CaseDetails(
+            case_ref=case_ref,
+            pdf_links=[
+                PdfLink(url=document["url"], label=document["label"])
+                for document in data["documents"]
+            ],
+        )
+
+    def _get(self, url: str, params: Dict[str, Any] | None = None) -> Any:
+        import requests
+
+        for attempt in itertools.count(1):
+            self.checkpoint()
+            self.throttle()
+            started = time.monotonic()
+            try:
+                response = self._http().get(
+                    url,
+                    params=params,
+                    headers=self._headers(),
+                    timeout=self.config.request_timeout_seconds,
+                )
+            except requests.ConnectionError:
+                if attempt >= MAX_ATTEMPTS:
+                    raise
+                self._retry(attempt, None)
+                continue
+            self._record(response.status_code, time.monotonic() - started)
+            if response.status_code in RETRY_STATUSES and attempt < MAX_ATTEMPTS:
+                self._retry(attempt, response.headers.get("Retry-After"))
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    def _retry(self, attempt: int, retry_after: str | None) -> None:
+        with self._stats_lock:
+            self.retries += 1
+        wait = min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS * 2 ** (attempt - 1))
+        if retry_after:
+            try:
+                wait = min(MAX_BACKOFF_SECONDS, float(retry_after))
+            except ValueError:
+                pass
+        self.sleep(wait)
+
+    def _record(self, status: int, seconds: float) -> None:
+        with self._stats_lock:
+            self.statuses[status] += 1
+            self.latencies.append(seconds)
+
+    def _headers(self) -> Dict[str, str]:
+        auth = self.config.auth or {}
+        token = auth.get("token")
+        if token is None and auth.get("token_env"):
+            token = os.environ.get(auth["token_env"])
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    def _http(self) -> Any:
+        # One pooled session per connector, created on first use so that
+        # constructing connectors never imports requests.
+        with self._stats_lock:
+            if self._session is None:
+                self._session = self._new_session()
+        return self._session
+
+    def _new_session(self) -> Any:
+        import requests
+
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=4, pool_maxsize=max(4, self.config.concurrency)
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+
+Connector = StandinConnector
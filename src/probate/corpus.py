@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from concurrent.futures import Future, TimeoutError
+from pathlib import Path
+from typing import Callable, Dict, Generic, Tuple, TypeVar
+
+from probate.address import normalize_fields
+from probate.cancel import CancelToken, checkpoint
+from probate.models import ExtractedFields
+from probate.pdf.parse_fields import parse_fields
+from probate.storage import StoragePaths
+
+# Extracted text is kept per PDF digest, next to the blob store, so parser
+# changes can be replayed over history without re-downloading or re-OCRing.
+# Entries written by the pipeline also name the extraction settings they were
+# made with (ExtractRequest.settings_key), so later runs can reuse them.
+
+T = TypeVar("T")
+
+# How often a case waiting on another case's extraction checks its token.
+FLIGHT_POLL_SECONDS = 0.2
+
+
+def text_path(storage: StoragePaths, digest: str) -> Path:
+    return storage.text_dir / digest[:2] / digest[2:4] / f"{digest}.json"
+
+
+def store_text(
+    path: Path, text: str, used_ocr: bool, settings: str | None = None
+) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    record = {"text": text, "ocr": used_ocr}
+    if settings is not None:
+        record["settings"] = settings
+    tmp.write_text(json.dumps(record), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_text(path: Path, settings: str | None = None) -> Tuple[str, bool] | None:
+    # With `settings`, only an entry extracted under those settings counts.
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if settings is not None and data.get("settings") != settings:
+        return None
+    return data["text"], bool(data.get("ocr"))
+
+
+class SingleFlight(Generic[T]):
+    # At most one computation per key at a time: a caller asking for a key
+    # that is already being computed waits for that result (or exception)
+    # instead of starting its own. Finished keys are forgotten, so results
+    # that should outlive the flight need their own store (the corpus).
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: Dict[str, Future[T]] = {}
+
+    def run(
+        self,
+        key: str,
+        compute: Callable[[], T],
+        cancel_token: CancelToken | None = None,
+    ) -> Tuple[T, bool]:
+        # Returns the result and whether it came from another caller's flight.
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = Future()
+                self._flights[key] = flight
+        if not leader:
+            while True:
+                try:
+                    return flight.result(timeout=FLIGHT_POLL_SECONDS), True
+                except TimeoutError:
+                    checkpoint(cancel_token)
+        try:
+            result = compute()
+        except BaseException as exc:
+            flight.set_exception(exc)
+            raise
+        else:
+            flight.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+
+def parse_text(text: str, used_ocr: bool) -> ExtractedFields:
+    fields = parse_fields(text)
+    if used_ocr:
+        fields.notes = (fields.notes + "; used OCR").strip("; ")
+    return normalize_fields(fields)
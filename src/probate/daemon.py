@@ -0,0 +1,479 @@
+from __future__ import annotations
+
+import dataclasses
+import itertools
+import json
+import logging
+import queue
+import signal
+import socketserver
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List
+from urllib.parse import unquote, urlparse
+from zoneinfo import ZoneInfo
+
+from probate.cancel import CancelToken
+from probate.config import AppConfig, ConfigWatcher, CountyConfig
+from probate.connectors.base import BaseConnector
+from probate.incremental import poll_once
+from probate.pipeline import run_pipeline
+from probate.results_log import POLL_REPORT_TAG
+from probate.storage import StoragePaths, build_paths, report_path
+
+logger = logging.getLogger("probate.daemon")
+
+HISTORY_LIMIT = 50
+MAX_SCHEDULER_SLEEP_SECONDS = 60.0
+
+
+@dataclass
+class RunRecord:
+    run_id: int
+    county: str
+    target_date: date
+    trigger: str
+    queued_at: datetime
+    # "full" runs the whole index for the date; "poll" only unseen cases.
+    kind: str = "full"
+    # queued, running, done, cancelled or failed
+    state: str = "queued"
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    cases: int = 0
+    errors: int = 0
+    report_path: str | None = None
+    message: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dataclasses.asdict(self)
+        for key, value in data.items():
+            if isinstance(value, (date, datetime)):
+                data[key] = value.isoformat()
+        return data
+
+
+class ProbateDaemon:
+    def __init__(self, config_path: str) -> None:
+        self.config_path = config_path
+        self._config_watch = ConfigWatcher(config_path)
+        self.config = self._config_watch.config
+        self.tz = ZoneInfo(self.config.run.timezone)
+        # Connector instances (and any portal sessions they hold) outlive runs.
+        self.connectors: Dict[str, BaseConnector] = {}
+        self._runs: queue.Queue[RunRecord | None] = queue.Queue()
+        self._records: Dict[int, RunRecord] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._current: RunRecord | None = None
+        self._current_token: CancelToken | None = None
+        self._next_due: Dict[str, datetime] = {}
+        self._next_poll: Dict[str, datetime] = {}
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        for target, name in (
+            (self._schedule_loop, "probate-scheduler"),
+            (self._worker_loop, "probate-runner"),
+        ):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stop.set()
+        token = self._current_token
+        if token is not None:
+            token.cancel("daemon shutting down")
+        self._runs.put(None)
+        for thread in self._threads:
+            thread.join(timeout=30)
+
+    def trigger(
+        self,
+        county_name: str | None = None,
+        target_date: date | None = None,
+        trigger: str = "api",
+        kind: str = "full",
+    ) -> List[RunRecord]:
+        if kind not in ("full", "poll"):
+            raise ValueError(f"Unknown run kind: {kind}")
+        counties = [
+            county
+            for county in self.config.counties
+            if county.enabled and county_name in (None, county.name)
+        ]
+        if county_name and not counties:
+            raise KeyError(f"Unknown or disabled county: {county_name}")
+        if target_date is not None:
+            run_date = target_date
+        elif kind == "poll":
+            run_date = datetime.now(self.tz).date()
+        else:
+            run_date = self.default_date()
+        records = []
+        for county in counties:
+            record = RunRecord(
+                run_id=next(self._ids),
+                county=county.name,
+                target_date=run_date,
+                trigger=trigger,
+                queued_at=datetime.now(self.tz),
+                kind=kind,
+            )
+            with self._lock:
+                self._records[record.run_id] = record
+                self._trim_history()
+            self._runs.put(record)
+            records.append(record)
+        return records
+
+    def get_run(self, run_id: int) -> RunRecord | None:
+        with self._lock:
+            return self._records.get(run_id)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            history = [record.to_dict() for record in self._records.values()]
+            current = self._current.to_dict() if self._current else None
+            next_runs = {name: due.isoformat() for name, due in self._next_due.items()}
+            next_polls = {
+                name: due.isoformat() for name, due in self._next_poll.items()
+            }
+        return {
+            "now": datetime.now(self.tz).isoformat(),
+            "current": current,
+            "queued": self._runs.qsize(),
+            "next_runs": next_runs,
+            "next_polls": next_polls,
+            "warm_connectors": sorted(self.connectors),
+            "runs": history,
+        }
+
+    def report_files(self, target_date: date) -> List[Path]:
+        storage = self._storage()
+        return sorted(
+            storage.report_dir.glob(
+                f"Daily_Probate_Leads_{target_date.isoformat()}*.xlsx"
+            )
+        )
+
+    def report_file(self, name: str) -> Path | None:
+        report_dir = self._storage().report_dir.resolve()
+        candidate = (report_dir / name).resolve()
+        if candidate.parent != report_dir or not candidate.is_file():
+            return None
+        return candidate
+
+    def default_date(self) -> date:
+        today = datetime.now(self.tz).date()
+        if self.config.run.default_mode == "today":
+            return today
+        return today - timedelta(days=1)
+
+    def reload_config(self) -> bool:
+        # Edits to the config file take effect between runs; a run already in
+        # progress keeps the config it started with.
+        if not self._config_watch.poll():
+            return False
+        self._apply_config(self._config_watch.config)
+        return True
+
+    def _apply_config(self, config: AppConfig) -> None:
+        # Keep pending schedule entries only for counties whose timing is
+        # unchanged; the others are recomputed on the next scheduler pass.
+        def timing(app: AppConfig, county: CountyConfig) -> tuple:
+            return (county.run_at or app.run.run_at, county.poll_interval_minutes)
+
+        before = {
+            county.name: timing(self.config, county)
+            for county in self.config.counties
+            if county.enabled
+        }
+        after = {
+            county.name: timing(config, county)
+            for county in config.counties
+            if county.enabled
+        }
+        with self._lock:
+            self.config = config
+            self.tz = ZoneInfo(config.run.timezone)
+            for schedule in (self._next_due, self._next_poll):
+                for name in list(schedule):
+                    if after.get(name) is None or after[name] != before.get(name):
+                        del schedule[name]
+
+    def _schedule_loop(self) -> None:
+        while not self._stop.is_set():
+            self.reload_config()
+            now = datetime.now(self.tz)
+            for county in self.config.counties:
+                if not county.enabled:
+                    continue
+                run_at = county.run_at or self.config.run.run_at
+                due = self._next_due.get(county.name)
+                if due is None:
+                    due = _next_occurrence(run_at, now)
+                elif due <= now:
+                    logger.info("Scheduled run due for %s", county.name)
+                    self.trigger(county.name, trigger="schedule")
+                    due = _next_occurrence(run_at, now)
+                with self._lock:
+                    self._next_due[county.name] = due
+                self._schedule_poll(county, now)
+            with self._lock:
+                pending = [*self._next_due.values(), *self._next_poll.values()]
+            sleep = MAX_SCHEDULER_SLEEP_SECONDS
+            if pending:
+                until_next = (min(pending) - datetime.now(self.tz)).total_seconds()
+                sleep = max(1.0, min(sleep, until_next))
+            self._stop.wait(sleep)
+
+    def _schedule_poll(self, county: CountyConfig, now: datetime) -> None:
+        # Only counties with an explicit poll_interval_minutes are polled intraday.
+        if not county.poll_interval_minutes:
+            return
+        due = self._next_poll.get(county.name)
+        if due is not None and due <= now:
+            self.trigger(county.name, trigger="schedule", kind="poll")
+            due = None
+        if due is None:
+            due = now + timedelta(minutes=county.poll_interval_minutes)
+        with self._lock:
+            self._next_poll[county.name] = due
+
+    def _worker_loop(self) -> None:
+        while True:
+            record = self._runs.get()
+            if record is None or self._stop.is_set():
+                return
+            self._execute(record)
+
+    def _execute(self, record: RunRecord) -> None:
+        county = self._county(record.county)
+        if county is None:
+            record.state = "failed"
+            record.message = "county no longer configured"
+            return
+        run_config = dataclasses.replace(self.config, counties=[county])
+        token = CancelToken()
+        with self._lock:
+            self._current = record
+            self._current_token = token
+        record.state = "running"
+        record.started_at = datetime.now(self.tz)
+        try:
+            if record.kind == "poll":
+                results = poll_once(
+                    run_config,
+                    record.target_date,
+                    cancel_token=token,
+                    connectors=self.connectors,
+                )
+                # A poll that found nothing new writes no report.
+                report = (
+                    report_path(
+                        self._storage(), record.target_date, tag=POLL_REPORT_TAG
+                    )
+                    if results
+                    else None
+                )
+            else:
+                results = run_pipeline(
+                    run_config,
+                    record.target_date,
+                    cancel_token=token,
+                    connectors=self.connectors,
+                    report_tag=county.name,
+                )
+                report = report_path(
+                    self._storage(),
+                    record.target_date,
+                    tag=county.name,
+                    partial=token.cancelled,
+                )
+            record.cases = len(results)
+            record.errors = sum(1 for result in results if result.errors)
+            record.state = "cancelled" if token.cancelled else "done"
+            record.report_path = str(report) if report is not None else None
+        except Exception as exc:
+            logger.exception("Run %s for %s failed", record.run_id, county.name)
+            record.state = "failed"
+            record.message = str(exc)
+        finally:
+            record.finished_at = datetime.now(self.tz)
+            with self._lock:
+                self._current = None
+                self._current_token = None
+
+    def _county(self, name: str) -> CountyConfig | None:
+        return next((c for c in self.config.counties if c.name == name), None)
+
+    def _storage(self) -> StoragePaths:
+        output = self.config.output
+        return build_paths(output.pdf_dir, output.report_dir, output.logs_dir)
+
+    def _trim_history(self) -> None:
+        finished = [
+            run_id
+            for run_id, record in self._records.items()
+            if record.state not in ("queued", "running")
+        ]
+        for run_id in finished[: max(0, len(self._records) - HISTORY_LIMIT)]:
+            del self._records[run_id]
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    server_version = "probate-serve"
+
+    @property
+    def app(self) -> ProbateDaemon:
+        return self.server.app  # type: ignore[attr-defined]
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path.rstrip("/")
+        if path == "/status":
+            self._send_json(HTTPStatus.OK, self.app.status())
+        elif path == "/runs":
+            self._send_json(HTTPStatus.OK, self.app.status()["runs"])
+        elif path.startswith("/runs/"):
+            record = self._run_from_path(path)
+            if record is None:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown run"})
+            else:
+                self._send_json(HTTPStatus.OK, record.to_dict())
+        elif path.startswith("/reports/"):
+            self._send_report(unquote(path[len("/reports/") :]))
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        if urlparse(self.path).path.rstrip("/") != "/runs":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            run_date = payload.get("date")
+            records = self.app.trigger(
+                payload.get("county"),
+                date.fromisoformat(run_date) if run_date else None,
+                kind=payload.get("kind", "full"),
+            )
+        except KeyError as exc:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": str(exc.args[0])})
+            return
+        except (ValueError, AttributeError) as exc:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+            return
+        self._send_json(
+            HTTPStatus.ACCEPTED, {"runs": [record.to_dict() for record in records]}
+        )
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("api %s - " + format, self.address_string(), *args)
+
+    def address_string(self) -> str:
+        # Unix-socket clients have no (host, port) address.
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def _run_from_path(self, path: str) -> RunRecord | None:
+        try:
+            return self.app.get_run(int(path.rsplit("/", 1)[1]))
+        except ValueError:
+            return None
+
+    def _send_report(self, name: str) -> None:
+        try:
+            target_date = date.fromisoformat(name)
+        except ValueError:
+            report = self.app.report_file(name)
+            if report is None:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown report"})
+                return
+            body = report.read_bytes()
+            self.send_response(HTTPStatus.OK)
+            self.send_header(
+                "Content-Type",
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+            self.send_header("Content-Disposition", f'attachment; filename="{name}"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        files = [path.name for path in self.app.report_files(target_date)]
+        self._send_json(HTTPStatus.OK, {"date": name, "reports": files})
+
+    def _send_json(self, status: HTTPStatus, payload: Any) -> None:
+        body = json.dumps(payload, indent=2).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _TcpApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+
+    class _UnixApiServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+def make_server(
+    app: ProbateDaemon,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: str | None = None,
+) -> socketserver.BaseServer:
+    if socket_path:
+        Path(socket_path).unlink(missing_ok=True)
+        server: socketserver.BaseServer = _UnixApiServer(socket_path, _ApiHandler)
+    else:
+        server = _TcpApiServer((host, port), _ApiHandler)
+    server.app = app  # type: ignore[attr-defined]
+    return server
+
+
+def serve(
+    config_path: str,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: str | None = None,
+) -> None:
+    app = ProbateDaemon(config_path)
+    server = make_server(app, host, port, socket_path)
+
+    def request_shutdown(_signum: int, _frame: object) -> None:
+        # shutdown() waits for serve_forever(), which runs on this thread.
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGINT, request_shutdown)
+    signal.signal(signal.SIGTERM, request_shutdown)
+
+    app.start()
+    logger.info("probate serve listening on %s", socket_path or f"{host}:{port}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        app.stop()
+        if socket_path:
+            Path(socket_path).unlink(missing_ok=True)
+
+
+def _next_occurrence(run_at: str, after: datetime) -> datetime:
+    hour, minute = (int(part) for part in run_at.split(":"))
+    candidate = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= after:
+        candidate += timedelta(days=1)
+    return candidate
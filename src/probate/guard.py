@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import statistics
+import threading
+from collections import deque
+
+from probate.config import CountyConfig
+from probate.connectors.base import BaseConnector
+
+
+class CircuitBreaker:
+    # Opens after `failure_threshold` consecutive case failures, or when the
+    # median portal latency of the last `latency_window` cases exceeds
+    # `latency_threshold` seconds. Once open it stays open for the run.
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        latency_threshold: float | None = None,
+        latency_window: int = 5,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.consecutive_failures = 0
+        self.reason: str | None = None
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.reason is not None
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self._latencies.append(latency)
+            if self.latency_threshold is None or self.reason is not None:
+                return
+            if len(self._latencies) < (self._latencies.maxlen or 0):
+                return
+            median = statistics.median(self._latencies)
+            if median > self.latency_threshold:
+                self.reason = (
+                    f"median latency {median:.1f}s over {self.latency_threshold:g}s"
+                )
+
+    def record_failure(self) -> int:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.reason is None and (
+                self.consecutive_failures >= self.failure_threshold
+            ):
+                self.reason = f"{self.consecutive_failures} consecutive failures"
+            return self.consecutive_failures
+
+
+class CountyGuard:
+    # Per-county circuit breaker plus wall-clock, portal-request and OCR-page
+    # budgets. Time is charged per case, so counties whose cases interleave
+    # (priority order, concurrency) are each billed only for their own work.
+
+    def __init__(self, county: CountyConfig, connector: BaseConnector) -> None:
+        self.county = county
+        self.connector = connector
+        self.breaker = CircuitBreaker(
+            county.breaker_failures, county.breaker_latency_seconds
+        )
+        self.seconds_used = 0.0
+        self.ocr_pages = 0
+        self.ocr_exhausted = False
+        self._requests_base = connector.requests_made
+        self._lock = threading.Lock()
+
+    @property
+    def requests_used(self) -> int:
+        return self.connector.requests_made - self._requests_base
+
+    def blocked(self) -> str | None:
+        county = self.county
+        if self.breaker.is_open:
+            return f"circuit open: {self.breaker.reason}"
+        if county.time_budget_minutes is not None:
+            if self.seconds_used >= county.time_budget_minutes * 60:
+                return "county time budget"
+        if county.max_requests is not None:
+            if self.requests_used >= county.max_requests:
+                return "county request budget"
+        return None
+
+    def charge_time(self, seconds: float) -> None:
+        with self._lock:
+            self.seconds_used += seconds
+
+    def take_ocr_page(self) -> bool:
+        limit = self.county.max_ocr_pages
+        with self._lock:
+            if limit is not None and self.ocr_pages >= limit:
+                self.ocr_exhausted = True
+                return False
+            self.ocr_pages += 1
+            return True
+
+    def ocr_pages_left(self) -> int | None:
+        limit = self.county.max_ocr_pages
+        if limit is None:
+            return None
+        with self._lock:
+            return max(0, limit - self.ocr_pages)
+
+    def charge_ocr_pages(self, pages: int, exhausted: bool) -> None:
+        # For documents extracted in a worker process against ocr_pages_left;
+        # cases running side by side may overshoot the limit by a document.
+        with self._lock:
+            self.ocr_pages += pages
+            self.ocr_exhausted = self.ocr_exhausted or exhausted
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+import os
+import re
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+from zoneinfo import ZoneInfo
+
+from probate.cancel import CancelToken, Cancelled
+from probate.config import AppConfig, ConfigWatcher, CountyConfig
+from probate.connectors.base import BaseConnector
+from probate.models import CaseRef, CaseResult
+from probate.pipeline import run_pipeline
+from probate.results_log import (
+    POLL_REPORT_TAG,
+    append_results,
+    load_results,
+    results_log_path,
+)
+from probate.storage import build_paths, report_path
+
+logger = logging.getLogger("probate.incremental")
+
+
+def case_sort_key(case_number: str) -> List[Any]:
+    # Natural ordering, so DEMO-2026-0010 sorts after DEMO-2026-0009 and 9 < 10.
+    return [
+        int(part) if part.isdigit() else part.lower()
+        for part in re.split(r"(\d+)", case_number)
+    ]
+
+
+class WatermarkStore:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._marks: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            self._marks = json.loads(path.read_text(encoding="utf-8"))
+
+    def get(self, county: str, target_date: date) -> Dict[str, Any]:
+        with self._lock:
+            mark = self._marks.get(county)
+        if not mark or mark.get("date") != target_date.isoformat():
+            return {"date": target_date.isoformat(), "last_case": None, "retry": []}
+        return mark
+
+    def new_cases(
+        self, county: str, target_date: date, case_refs: Sequence[CaseRef]
+    ) -> List[CaseRef]:
+        mark = self.get(county, target_date)
+        last_case = mark["last_case"]
+        retry = set(mark["retry"])
+        if last_case is None:
+            return list(case_refs)
+        last_key = case_sort_key(last_case)
+        return [
+            ref
+            for ref in case_refs
+            if ref.case_number in retry or case_sort_key(ref.case_number) > last_key
+        ]
+
+    def advance(
+        self,
+        county: str,
+        target_date: date,
+        selected: Sequence[CaseRef],
+        results: Sequence[CaseResult],
+    ) -> None:
+        mark = self.get(county, target_date)
+        processed = {result.case_ref.case_number: result for result in results}
+        candidates = [mark["last_case"]] if mark["last_case"] else []
+        candidates.extend(processed)
+        last_case = max(candidates, key=case_sort_key) if candidates else None
+        last_key = case_sort_key(last_case) if last_case else None
+        # Anything at or below the new mark that failed or was never reached (a
+        # cancelled or budget-limited run) is retried on the next poll.
+        retry = [
+            ref.case_number
+            for ref in selected
+            if last_key is not None
+            and case_sort_key(ref.case_number) <= last_key
+            and (ref.case_number not in processed or processed[ref.case_number].errors)
+        ]
+        with self._lock:
+            self._marks[county] = {
+                "date": target_date.isoformat(),
+                "last_case": last_case,
+                "retry": retry,
+                "updated_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(self._marks, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def poll_once(
+    config: AppConfig,
+    target_date: date,
+    cancel_token: CancelToken | None = None,
+    connectors: Dict[str, BaseConnector] | None = None,
+) -> List[CaseResult]:
+    storage = build_paths(
+        config.output.pdf_dir, config.output.report_dir, config.output.logs_dir
+    )
+    marks = WatermarkStore(storage.pdf_dir / "watermarks.json")
+    selected: Dict[str, List[CaseRef]] = {}
+
+    def select_new(county: CountyConfig, case_refs: List[CaseRef]) -> List[CaseRef]:
+        fresh = marks.new_cases(county.name, target_date, case_refs)
+        selected[county.name] = fresh
+        return fresh
+
+    results = run_pipeline(
+        config,
+        target_date,
+        cancel_token=cancel_token,
+        connectors=connectors,
+        select_cases=select_new,
+        write_report=False,
+    )
+    for county_name, refs in selected.items():
+        county_results = [r for r in results if r.county == county_name]
+        marks.advance(county_name, target_date, refs, county_results)
+
+    if results:
+        log_path = results_log_path(storage, target_date)
+        append_results(log_path, results)
+        from probate.output.excel import write_excel
+
+        write_excel(
+            load_results(log_path),
+            report_path(storage, target_date, tag=POLL_REPORT_TAG),
+            siblings=config.output.report_siblings,
+            per_county_sheets=config.output.per_county_sheets,
+        )
+    logger.info("Poll for %s found %s new cases", target_date, len(results))
+    return results
+
+
+def poll_forever(
+    config: AppConfig,
+    cancel_token: CancelToken,
+    interval_minutes: float | None = None,
+    config_path: str | None = None,
+) -> None:
+    # With config_path, edits to the file are picked up between polls.
+    watcher = ConfigWatcher(config_path, config) if config_path else None
+    tz = ZoneInfo(config.run.timezone)
+    next_due: Dict[str, datetime] = {}
+    while not cancel_token.cancelled:
+        if watcher is not None and watcher.poll():
+            config = watcher.config
+            tz = ZoneInfo(config.run.timezone)
+        now = datetime.now(tz)
+        due = [
+            county
+            for county in config.counties
+            if county.enabled and next_due.get(county.name, now) <= now
+        ]
+        if due:
+            poll_once(
+                dataclasses.replace(config, counties=due),
+                now.date(),
+                cancel_token=cancel_token,
+            )
+            for county in due:
+                minutes = interval_minutes or poll_interval_minutes(config, county)
+                next_due[county.name] = now + timedelta(minutes=minutes)
+        wake = min(next_due.values(), default=now + timedelta(minutes=1))
+        seconds = max(1.0, (wake - datetime.now(tz)).total_seconds())
+        try:
+            cancel_token.sleep(seconds)
+        except Cancelled:
+            return
+
+
+def poll_interval_minutes(config: AppConfig, county: CountyConfig) -> float:
+    return county.poll_interval_minutes or config.run.poll_interval_minutes
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from datetime import date
+from typing import Iterator, List, Tuple
+
+from probate.models import CaseRef
+from probate.pdf.download import sha256_file
+
+
+class ChecksumIndex:
+    def __init__(self, db_path: Path, root: Path) -> None:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.root = root
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, digest TEXT NOT NULL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(files)")}
+        for column in ("size", "mtime_ns"):
+            if column not in columns:
+                self._conn.execute(
+                    f"ALTER TABLE files ADD COLUMN {column} INTEGER NOT NULL DEFAULT -1"
+                )
+        # The case each file was fetched for, so `verify --repair` can ask the
+        # connector again. NULL for files recorded before these columns.
+        for column in ("case_number", "filing_date", "detail_url"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE files ADD COLUMN {column} TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS files_digest ON files(digest)")
+        self._conn.commit()
+
+    def lookup(self, path: Path) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM files WHERE path = ?", (self._key(path),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def trusted_digest(self, path: Path) -> str | None:
+        # A file whose size and mtime still match the recorded values is trusted
+        # without being read again.
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest, size, mtime_ns FROM files WHERE path = ?",
+                (self._key(path),),
+            ).fetchone()
+        if row is None or stat.st_size == 0:
+            return None
+        digest, size, mtime_ns = row
+        if size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+            return None
+        return digest
+
+    def record(self, path: Path, digest: str, case_ref: CaseRef | None = None) -> None:
+        # Without case_ref, a case already recorded for the path is kept.
+        stat = path.stat()
+        case = (None, None, None)
+        if case_ref is not None:
+            case = (
+                case_ref.case_number,
+                case_ref.filing_date.isoformat(),
+                case_ref.detail_url,
+            )
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO files (path, digest, size, mtime_ns, case_number, "
+                "filing_date, detail_url) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET digest = excluded.digest, "
+                "size = excluded.size, mtime_ns = excluded.mtime_ns, "
+                "case_number = coalesce(excluded.case_number, case_number), "
+                "filing_date = coalesce(excluded.filing_date, filing_date), "
+                "detail_url = coalesce(excluded.detail_url, detail_url)",
+                (self._key(path), digest, stat.st_size, stat.st_mtime_ns, *case),
+            )
+            self._conn.commit()
+
+    def case_ref(self, path: Path) -> CaseRef | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT case_number, filing_date, detail_url FROM files "
+                "WHERE path = ?",
+                (self._key(path),),
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return CaseRef(row[0], date.fromisoformat(row[1]), row[2])
+
+    def forget(self, path: Path) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM files WHERE path = ?", (self._key(path),))
+            self._conn.commit()
+
+    def entries(self, prefix: str = "") -> Iterator[Tuple[Path, str]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, digest FROM files WHERE substr(path, 1, ?) = ?",
+                (len(prefix), prefix),
+            ).fetchall()
+        for key, digest in rows:
+            yield self.root / key, digest
+
+    def rehash(
+        self, prefix: str = "", workers: int | None = None
+    ) -> List[Tuple[Path, str]]:
+        entries = list(self.entries(prefix))
+        workers = workers or min(32, (os.cpu_count() or 1) * 2)
+        # hashlib releases the GIL on large updates, so threads hash in parallel.
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            digests = list(pool.map(_digest_or_none, [path for path, _ in entries]))
+        mismatched: List[Tuple[Path, str]] = []
+        for (path, expected), actual in zip(entries, digests):
+            if actual == expected:
+                self.record(path, actual)
+            else:
+                mismatched.append((path, expected))
+                self.forget(path)
+        return mismatched
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "ChecksumIndex":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def _key(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+
+def _digest_or_none(path: Path) -> str | None:
+    try:
+        return sha256_file(path)
+    except OSError:
+        return None
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import importlib
+
+from probate.jobs.base import Job, JobQueue
+
+__all__ = ["Job", "JobQueue", "get_queue"]
+
+
+def get_queue(url: str) -> JobQueue:
+    # "sqlite://data/jobs.sqlite3" (relative; "sqlite:///srv/jobs.sqlite3" is
+    # absolute) or a bare path selects the SQLite backend;
+    # other schemes load probate.jobs.<scheme> and use its `Backend` class.
+    scheme, sep, location = url.partition("://")
+    if not sep:
+        scheme, location = "sqlite", url
+    module = importlib.import_module(f"probate.jobs.{scheme}")
+    return getattr(module, "Backend")(location)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+
+@dataclass
+class Job:
+    job_id: int
+    run_id: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+    lease_owner: str
+
+
+@dataclass
+class JobOutcome:
+    job_id: int
+    payload: Dict[str, Any]
+    # done or dead
+    state: str
+    result: Dict[str, Any] | None
+    error: str | None
+
+
+class JobQueue(ABC):
+    @abstractmethod
+    def enqueue(
+        self, run_id: str, payloads: List[Dict[str, Any]], max_attempts: int = 3
+    ) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def lease(self, worker_id: str, visibility_timeout: float) -> Job | None:
+        # Returns the next ready job and hides it from other workers until the
+        # timeout passes; a worker that dies mid-job simply lets it reappear.
+        raise NotImplementedError
+
+    @abstractmethod
+    def heartbeat(self, job: Job, visibility_timeout: float) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(self, job: Job, result: Dict[str, Any]) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def fail(self, job: Job, error: str, retry_delay: float = 0.0) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def release(self, job: Job) -> None:
+        # Hands a leased job back without counting the attempt, for workers
+        # that stop before finishing it.
+        raise NotImplementedError
+
+    @abstractmethod
+    def counts(self, run_id: str) -> Dict[str, int]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def outcomes(self, run_id: str) -> List[JobOutcome]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
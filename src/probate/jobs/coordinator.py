@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from datetime import date
+from typing import Dict, List
+
+from probate.address import geocode_fields
+from probate.cancel import CancelToken
+from probate.config import AppConfig
+from probate.connectors import get_connector
+from probate.jobs.base import JobQueue
+from probate.models import CaseResult
+from probate.pdf.parse_fields import parse_fields
+from probate.results_log import result_from_dict
+from probate.storage import build_paths, report_path
+
+logger = logging.getLogger("probate.jobs")
+
+
+def enqueue_date(
+    config: AppConfig,
+    queue: JobQueue,
+    target_date: date,
+    max_attempts: int | None = None,
+    cancel_token: CancelToken | None = None,
+) -> str:
+    # Only the index fetch happens here; details, downloads, extraction and
+    # parsing run on whichever workers lease the jobs.
+    run_id = f"{target_date.isoformat()}-{uuid.uuid4().hex[:8]}"
+    total = 0
+    for county in config.counties:
+        if not county.enabled:
+            continue
+        connector = get_connector(county.connector, county, cancel_token)
+        try:
+            case_refs = connector.fetch_case_index(target_date)
+        except Exception as exc:
+            # As in run_pipeline: a portal that is down skips its county.
+            logger.error("Index fetch failed for %s: %s", county.name, exc)
+            continue
+        payloads = [
+            {
+                "county": county.name,
+                "target_date": target_date.isoformat(),
+                "case_ref": {
+                    "case_number": ref.case_number,
+                    "filing_date": ref.filing_date.isoformat(),
+                    "detail_url": ref.detail_url,
+                },
+            }
+            for ref in case_refs
+        ]
+        total += queue.enqueue(
+            run_id, payloads, max_attempts=max_attempts or config.run.retries
+        )
+        logger.info("Enqueued %s cases for %s", len(payloads), county.name)
+    logger.info("Run %s: %s jobs enqueued", run_id, total)
+    return run_id
+
+
+def wait_for_run(
+    queue: JobQueue,
+    run_id: str,
+    poll_seconds: float = 5.0,
+    timeout: float | None = None,
+    cancel_token: CancelToken | None = None,
+) -> Dict[str, int]:
+    token = cancel_token or CancelToken()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        counts = queue.counts(run_id)
+        pending = counts.get("queued", 0) + counts.get("leased", 0)
+        if not pending:
+            return counts
+        if deadline is not None and time.monotonic() >= deadline:
+            raise TimeoutError(f"Run {run_id} still has {pending} pending jobs")
+        token.sleep(poll_seconds)
+
+
+def collect_results(queue: JobQueue, run_id: str) -> List[CaseResult]:
+    results: List[CaseResult] = []
+    for outcome in queue.outcomes(run_id):
+        if outcome.result is not None:
+            results.append(result_from_dict(outcome.result))
+            continue
+        # Dead jobs still get a row so the report shows what was missed.
+        payload = outcome.payload
+        results.append(
+            result_from_dict(
+                {
+                    "county": payload["county"],
+                    "case_ref": payload["case_ref"],
+                    "pdf_paths": [],
+                    "extracted_fields": vars(parse_fields("")),
+                    "errors": [outcome.error or "job failed"],
+                }
+            )
+        )
+    return results
+
+
+def coordinate(
+    config: AppConfig,
+    queue: JobQueue,
+    target_date: date,
+    poll_seconds: float = 5.0,
+    timeout: float | None = None,
+    cancel_token: CancelToken | None = None,
+) -> List[CaseResult]:
+    run_id = enqueue_date(config, queue, target_date, cancel_token=cancel_token)
+    counts = wait_for_run(
+        queue,
+        run_id,
+        poll_seconds=poll_seconds,
+        timeout=timeout,
+        cancel_token=cancel_token,
+    )
+    results = collect_results(queue, run_id)
+    try:
+        geocode_fields(config, [r.extracted_fields for r in results], cancel_token)
+    except Exception:
+        # As in run_pipeline: the report is written without coordinates.
+        logger.exception("Geocoding failed; the report has no coordinates")
+    storage = build_paths(
+        config.output.pdf_dir, config.output.report_dir, config.output.logs_dir
+    )
+    from probate.output.excel import write_excel
+
+    report = report_path(storage, target_date)
+    write_excel(
+        results,
+        report,
+        siblings=config.output.report_siblings,
+        per_county_sheets=config.output.per_county_sheets,
+    )
+    logger.info(
+        "Run %s assembled: %s done, %s dead, report %s",
+        run_id,
+        counts.get("done", 0),
+        counts.get("dead", 0),
+        report,
+    )
+    return results
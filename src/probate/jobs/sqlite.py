@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from probate.jobs.base import Job, JobOutcome, JobQueue
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    lease_owner TEXT,
+    not_before REAL NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs(state, not_before);
+CREATE INDEX IF NOT EXISTS jobs_run ON jobs(run_id, state);
+"""
+
+
+class SqliteJobQueue(JobQueue):
+    # `not_before` doubles as the lease expiry for leased jobs and the retry
+    # backoff for queued ones.
+
+    def __init__(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def enqueue(
+        self, run_id: str, payloads: List[Dict[str, Any]], max_attempts: int = 3
+    ) -> int:
+        with self._lock, self._transaction():
+            self._conn.executemany(
+                "INSERT INTO jobs (run_id, payload, max_attempts) VALUES (?, ?, ?)",
+                [(run_id, json.dumps(payload), max_attempts) for payload in payloads],
+            )
+        return len(payloads)
+
+    def lease(self, worker_id: str, visibility_timeout: float) -> Job | None:
+        now = time.time()
+        with self._lock, self._transaction():
+            while True:
+                row = self._conn.execute(
+                    "SELECT job_id, run_id, payload, state, attempts, max_attempts "
+                    "FROM jobs WHERE state IN ('queued', 'leased') AND not_before <= ? "
+                    "ORDER BY job_id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    return None
+                job_id, run_id, payload, state, attempts, max_attempts = row
+                if state == "leased" and attempts >= max_attempts:
+                    # The last allowed attempt timed out without completing.
+                    self._conn.execute(
+                        "UPDATE jobs SET state = 'dead', lease_owner = NULL, "
+                        "error = COALESCE(error, 'lease expired') WHERE job_id = ?",
+                        (job_id,),
+                    )
+                    continue
+                self._conn.execute(
+                    "UPDATE jobs SET state = 'leased', attempts = attempts + 1, "
+                    "lease_owner = ?, not_before = ? WHERE job_id = ?",
+                    (worker_id, now + visibility_timeout, job_id),
+                )
+                return Job(
+                    job_id=job_id,
+                    run_id=run_id,
+                    payload=json.loads(payload),
+                    attempts=attempts + 1,
+                    max_attempts=max_attempts,
+                    lease_owner=worker_id,
+                )
+
+    def heartbeat(self, job: Job, visibility_timeout: float) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET not_before = ? "
+                "WHERE job_id = ? AND state = 'leased' AND lease_owner = ?",
+                (time.time() + visibility_timeout, job.job_id, job.lease_owner),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job: Job, result: Dict[str, Any]) -> bool:
+        # Only the current lease holder may complete; a worker whose lease
+        # expired and was re-leased elsewhere gets False and drops its result.
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = 'done', result = ?, error = NULL, "
+                "lease_owner = NULL WHERE job_id = ? AND state = 'leased' "
+                "AND lease_owner = ?",
+                (json.dumps(result), job.job_id, job.lease_owner),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job: Job, error: str, retry_delay: float = 0.0) -> None:
+        state = "dead" if job.attempts >= job.max_attempts else "queued"
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, lease_owner = NULL, "
+                "not_before = ? WHERE job_id = ? AND state = 'leased' "
+                "AND lease_owner = ?",
+                (
+                    state,
+                    error,
+                    time.time() + retry_delay,
+                    job.job_id,
+                    job.lease_owner,
+                ),
+            )
+
+    def release(self, job: Job) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET state = 'queued', attempts = attempts - 1, "
+                "lease_owner = NULL, not_before = ? WHERE job_id = ? "
+                "AND state = 'leased' AND lease_owner = ?",
+                (time.time(), job.job_id, job.lease_owner),
+            )
+
+    def counts(self, run_id: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) FROM jobs WHERE run_id = ? GROUP BY state",
+                (run_id,),
+            ).fetchall()
+        return {state: count for state, count in rows}
+
+    def outcomes(self, run_id: str) -> List[JobOutcome]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, payload, state, result, error FROM jobs "
+                "WHERE run_id = ? AND state IN ('done', 'dead') ORDER BY job_id",
+                (run_id,),
+            ).fetchall()
+        return [
+            JobOutcome(
+                job_id=job_id,
+                payload=json.loads(payload),
+                state=state,
+                result=json.loads(result) if result else None,
+                error=error,
+            )
+            for job_id, payload, state, result, error in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._conn)
+
+
+class _ImmediateTransaction:
+    # BEGIN IMMEDIATE takes the write lock up front, so two workers can never
+    # select the same ready row.
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self._conn
+
+    def __exit__(self, exc_type: object, *_exc: object) -> None:
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+Backend = SqliteJobQueue
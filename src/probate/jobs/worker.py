@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import date
+from typing import Dict
+
+from probate.cancel import CancelToken, Cancelled
+from probate.config import AppConfig
+from probate.connectors.base import BaseConnector
+from probate.index import ChecksumIndex
+from probate.jobs.base import Job, JobQueue
+from probate.logging import log_context, setup_logging
+from probate.models import CaseRef
+from probate.pipeline import RunContext, RunStats, connector_for, process_case
+from probate.progress import ProgressReporter
+from probate.results_log import result_to_dict
+from probate.storage import StoragePaths, build_paths
+
+logger = logging.getLogger("probate.jobs")
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(
+    config: AppConfig,
+    queue: JobQueue,
+    worker_id: str | None = None,
+    visibility_timeout: float = 600.0,
+    idle_exit: float | None = None,
+    poll_seconds: float = 2.0,
+    cancel_token: CancelToken | None = None,
+) -> int:
+    # Leases one case at a time until cancelled, or until the queue has been
+    # empty for `idle_exit` seconds. Returns the number of jobs handled.
+    worker_id = worker_id or default_worker_id()
+    token = cancel_token or CancelToken()
+    storage = build_paths(
+        config.output.pdf_dir, config.output.report_dir, config.output.logs_dir
+    )
+    setup_logging(storage.logs_dir, debug_every=config.run.log_debug_every)
+    index = ChecksumIndex(storage.index_path, root=storage.pdf_dir)
+    connectors: Dict[str, BaseConnector] = {}
+    handled = 0
+    idle_since = time.monotonic()
+    logger.info("Worker %s started", worker_id)
+    try:
+        while not token.cancelled:
+            job = queue.lease(worker_id, visibility_timeout)
+            if job is None:
+                if idle_exit is not None and time.monotonic() - idle_since >= idle_exit:
+                    break
+                token.sleep(poll_seconds)
+                continue
+            _handle_job(
+                config,
+                queue,
+                job,
+                storage,
+                index,
+                connectors,
+                token,
+                visibility_timeout,
+            )
+            handled += 1
+            idle_since = time.monotonic()
+    except Cancelled:
+        pass
+    finally:
+        index.close()
+    logger.info("Worker %s stopped after %s jobs", worker_id, handled)
+    return handled
+
+
+def _handle_job(
+    config: AppConfig,
+    queue: JobQueue,
+    job: Job,
+    storage: StoragePaths,
+    index: ChecksumIndex,
+    connectors: Dict[str, BaseConnector],
+    token: CancelToken,
+    visibility_timeout: float,
+) -> None:
+    payload = job.payload
+    county = next((c for c in config.counties if c.name == payload["county"]), None)
+    if county is None:
+        queue.fail(job, f"Unknown county {payload['county']!r} on this worker")
+        return
+    case_ref = CaseRef(
+        case_number=payload["case_ref"]["case_number"],
+        filing_date=date.fromisoformat(payload["case_ref"]["filing_date"]),
+        detail_url=payload["case_ref"]["detail_url"],
+    )
+    context = RunContext(
+        date.fromisoformat(payload["target_date"]),
+        storage,
+        index,
+        RunStats(),
+        ProgressReporter(None),
+        logger,
+        token,
+    )
+
+    stop_heartbeat = threading.Event()
+    heartbeat = threading.Thread(
+        target=_keep_leased,
+        args=(queue, job, visibility_timeout, stop_heartbeat),
+        daemon=True,
+    )
+    heartbeat.start()
+    try:
+        connector = connector_for(county, token, connectors)
+        with log_context(run_id=job.run_id):
+            result = process_case(context, connector, county, case_ref)
+    except Cancelled:
+        # Stopping is not the case's fault; it goes back without using up
+        # one of its attempts.
+        queue.release(job)
+        raise
+    finally:
+        stop_heartbeat.set()
+        heartbeat.join()
+
+    if result.errors and job.attempts < job.max_attempts:
+        delay = min(300.0, 5.0 * 2 ** (job.attempts - 1))
+        logger.warning(
+            "Case %s attempt %s/%s failed, retrying in %.0fs",
+            case_ref.case_number,
+            job.attempts,
+            job.max_attempts,
+            delay,
+        )
+        queue.fail(job, "; ".join(result.errors), retry_delay=delay)
+        return
+    if not queue.complete(job, result_to_dict(result)):
+        logger.warning("Lost lease on case %s; result dropped", case_ref.case_number)
+
+
+def _keep_leased(
+    queue: JobQueue, job: Job, visibility_timeout: float, stop: threading.Event
+) -> None:
+    # Slow OCR can outlast the visibility timeout; extend it while we still
+    # hold the job so another worker does not pick it up mid-flight.
+    while not stop.wait(visibility_timeout / 3):
+        if not queue.heartbeat(job, visibility_timeout):
+            return
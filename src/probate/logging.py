@@ -1,27 +1,224 @@
 from __future__ import annotations
 
+import atexit
+import contextvars
+import copy
+import json
 import logging
-from datetime import date
+import logging.handlers
+import queue
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
 from pathlib import Path
+from typing import Any, Dict, Iterator
+
+# Context attached to every record logged while it is set. Values follow the
+# current thread/task; submit work to pools through contextvars.copy_context()
+# so case threads inherit the run's fields.
+CONTEXT_FIELDS = ("run_id", "county", "case")
+# log_file is context too, but only picks the file a record is written to:
+# runs set it so that runs for different dates in one process keep apart.
+_context: Dict[str, contextvars.ContextVar[str | None]] = {
+    name: contextvars.ContextVar(f"probate_log_{name}", default=None)
+    for name in (*CONTEXT_FIELDS, "log_file")
+}
+
+# Attributes every LogRecord has; anything else came from `extra=` and is
+# written out as its own JSON field.
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "asctime",
+    "log_file",
+}
+
+# Run log files kept open at once; older ones are closed and reopened on use.
+MAX_OPEN_FILES = 8
+
+
+@contextmanager
+def log_context(**fields: str | None) -> Iterator[None]:
+    tokens = [
+        (_context[name], _context[name].set(value)) for name, value in fields.items()
+    ]
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _StructuredQueueHandler(logging.handlers.QueueHandler):
+    # The stock prepare() flattens the traceback into the message; keep it
+    # separate so the JSON line has its own "exc" field.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _ContextFilter(logging.Filter):
+    # Runs on the thread that logs, before the record crosses the queue.
+    def filter(self, record: logging.LogRecord) -> bool:
+        for name, var in _context.items():
+            if getattr(record, name, None) is None:
+                setattr(record, name, var.get())
+        if record.log_file is None and _file_handler is not None:
+            # Pinned now, so a later setup_logging can't redirect it.
+            record.log_file = _file_handler.path
+        return True
+
+
+class DebugSampler(logging.Filter):
+    # Keeps one in every `every` DEBUG records per call site, so hot-path debug
+    # logging can stay on in production at a fraction of the volume.
+    def __init__(self, every: int = 1) -> None:
+        super().__init__()
+        self.every = every
+        self._seen: Dict[tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.DEBUG:
+            return True
+        if self.every <= 1:
+            return True
+        site = (record.pathname, record.lineno)
+        with self._lock:
+            count = self._seen.get(site, 0)
+            self._seen[site] = count + 1
+        return count % self.every == 0
+
+
+class _RunFileHandler(logging.Handler):
+    # The listener's only handler. A record goes to the file named by its
+    # log_file context, or else to the file of the latest setup_logging call
+    # (the worker log, runs outside run_pipeline).
+    def __init__(self) -> None:
+        super().__init__()
+        self.path: Path | None = None
+        self._files: OrderedDict[Path, logging.FileHandler] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def use(self, path: Path) -> None:
+        with self._lock:
+            self.path = path
+
+    def emit(self, record: logging.LogRecord) -> None:
+        routed = getattr(record, "log_file", None)
+        path = Path(routed) if routed else self.path
+        if path is None:
+            return
+        with self._lock:
+            self._file(path).handle(record)
+
+    def _file(self, path: Path) -> logging.FileHandler:
+        handler = self._files.get(path)
+        if handler is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handler = logging.FileHandler(path, encoding="utf-8")
+            handler.setFormatter(JsonFormatter())
+            self._files[path] = handler
+            if len(self._files) > MAX_OPEN_FILES:
+                self._files.popitem(last=False)[1].close()
+        else:
+            self._files.move_to_end(path)
+        return handler
+
+    def close(self) -> None:
+        with self._lock:
+            for handler in self._files.values():
+                handler.close()
+            self._files.clear()
+        super().close()
+
+
+_setup_lock = threading.Lock()
+_file_handler: _RunFileHandler | None = None
+_listener: logging.handlers.QueueListener | None = None
+_listening = False
+_sampler = DebugSampler()
+
+
+def log_path(logs_dir: Path, target_date: date | None = None) -> Path:
+    return logs_dir / (
+        f"{target_date.isoformat()}.jsonl" if target_date else "run.jsonl"
+    )
 
 
 def setup_logging(
-    logs_dir: Path, target_date: date | None = None, name: str = "probate"
+    logs_dir: Path,
+    target_date: date | None = None,
+    name: str = "probate",
+    debug_every: int = 0,
 ) -> logging.Logger:
+    # Records are put on an unbounded queue by the calling thread and written
+    # as JSON lines by one background listener, so logging never blocks case
+    # threads on disk I/O. Safe to call once per run: the queue handler is
+    # installed once, and only the default file changes.
     logs_dir.mkdir(parents=True, exist_ok=True)
+    log_file = log_path(logs_dir, target_date)
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-
-    if target_date:
-        log_file = logs_dir / f"{target_date.isoformat()}.log"
-    else:
-        log_file = logs_dir / "run.log"
-    handler = logging.FileHandler(log_file, encoding="utf-8")
-    formatter = logging.Formatter(
-        "%(asctime)s %(levelname)s %(name)s - %(message)s"
-    )
-    handler.setFormatter(formatter)
-
-    if not logger.handlers:
-        logger.addHandler(handler)
+    global _file_handler, _listener, _listening
+    with _setup_lock:
+        if _listener is None:
+            _file_handler = _RunFileHandler()
+            records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+            queue_handler = _StructuredQueueHandler(records)
+            queue_handler.addFilter(_sampler)
+            queue_handler.addFilter(_ContextFilter())
+            logger.addHandler(queue_handler)
+            _listener = logging.handlers.QueueListener(records, _file_handler)
+            atexit.register(_shutdown)
+        assert _file_handler is not None
+        _file_handler.use(log_file)
+        if not _listening:
+            _listener.start()
+            _listening = True
+        # debug_every: 0 turns DEBUG off, 1 keeps every record, N keeps 1 in N.
+        _sampler.every = debug_every
+        logger.setLevel(logging.DEBUG if debug_every else logging.INFO)
     return logger
+
+
+def flush_logging() -> None:
+    # Blocks until every queued record is written; logging continues after.
+    with _setup_lock:
+        if _listener is None or not _listening:
+            return
+        _listener.stop()
+        _listener.start()
+
+
+def _shutdown() -> None:
+    global _listening
+    with _setup_lock:
+        if _listener is not None and _listening:
+            _listener.stop()
+            _listening = False
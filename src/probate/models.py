@@ -32,6 +32,11 @@ class ExtractedFields:
     case_number: Optional[str]
     filing_date: Optional[str]
     notes: str = ""
+    # Canonical USPS form of property_address (see probate.address) and, when
+    # a geocoder is configured, its coordinates.
+    normalized_address: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
 
 @dataclass
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import csv
+import logging
+import os
+from contextlib import ExitStack
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from probate.models import CaseRef, CaseResult, ExtractedFields
+
+logger = logging.getLogger("probate.output")
+
+ALL_SHEET = "All Leads"
+# Parquet row groups; also bounds how many rows are held in memory at once.
+PARQUET_BATCH_ROWS = 10_000
+
+Column = Tuple[str, float, Callable[[CaseResult], Any]]
+COLUMNS: List[Column] = [
+    ("County", 14, lambda r: r.county),
+    ("Case Number", 18, lambda r: r.case_ref.case_number),
+    ("Filing Date", 12, lambda r: r.case_ref.filing_date.isoformat()),
+    ("Deceased Name", 24, lambda r: r.extracted_fields.deceased_name),
+    ("Filer Name", 24, lambda r: r.extracted_fields.filer_name),
+    ("Property Address", 40, lambda r: r.extracted_fields.property_address),
+    ("Normalized Address", 40, lambda r: r.extracted_fields.normalized_address),
+    ("Latitude", 11, lambda r: r.extracted_fields.latitude),
+    ("Longitude", 11, lambda r: r.extracted_fields.longitude),
+    ("Parsed Case Number", 18, lambda r: r.extracted_fields.case_number),
+    ("Parsed Filing Date", 14, lambda r: r.extracted_fields.filing_date),
+    ("Detail URL", 40, lambda r: r.case_ref.detail_url),
+    ("PDF Paths", 40, lambda r: "; ".join(r.pdf_paths)),
+    ("Notes", 40, lambda r: r.extracted_fields.notes),
+    ("Errors", 30, lambda r: "; ".join(r.errors)),
+]
+HEADERS = [header for header, _width, _get in COLUMNS]
+
+
+def write_excel(
+    results: Iterable[CaseResult],
+    path: Path,
+    siblings: Sequence[str] = (),
+    per_county_sheets: bool = False,
+) -> Path:
+    # Rows are streamed straight into openpyxl's write-only workbook (and any
+    # CSV/Parquet siblings) in one pass, so memory stays flat for backfills.
+    # Every file is written to a temporary name and renamed into place, so a
+    # reader never sees a half-written report.
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    workbook = Workbook(write_only=True)
+    header_font = Font(bold=True)
+
+    def add_sheet(title: str) -> Any:
+        sheet = workbook.create_sheet(title=_sheet_title(title))
+        for index, (_header, width, _get) in enumerate(COLUMNS, start=1):
+            sheet.column_dimensions[get_column_letter(index)].width = width
+        sheet.freeze_panes = "A2"
+        header = []
+        for text in HEADERS:
+            cell = WriteOnlyCell(sheet, value=text)
+            cell.font = header_font
+            header.append(cell)
+        sheet.append(header)
+        return sheet
+
+    all_sheet = add_sheet(ALL_SHEET)
+    county_sheets: Dict[str, Any] = {}
+    tmp = _temporary(path)
+    temporaries: List[Tuple[Path, Path]] = [(tmp, path)]
+    saved = False
+    rows = 0
+    try:
+        with ExitStack() as stack:
+            sinks = [
+                stack.enter_context(_open_sibling(fmt, path, temporaries))
+                for fmt in siblings
+            ]
+            for result in results:
+                row = [get(result) for _header, _width, get in COLUMNS]
+                all_sheet.append(row)
+                if per_county_sheets:
+                    sheet = county_sheets.get(result.county)
+                    if sheet is None:
+                        sheet = county_sheets[result.county] = add_sheet(result.county)
+                    sheet.append(row)
+                for sink in sinks:
+                    sink(row)
+                rows += 1
+        workbook.save(tmp)
+        saved = True
+        for tmp_path, final in temporaries:
+            os.replace(tmp_path, final)
+    except BaseException:
+        if not saved:
+            _discard(workbook, tmp)
+        raise
+    finally:
+        for tmp_path, _final in temporaries:
+            tmp_path.unlink(missing_ok=True)
+    logger.info("Wrote %s rows to %s", rows, path)
+    return path
+
+
+def read_excel(path: Path) -> List[CaseResult]:
+    # Reads a report's "All Leads" sheet back into results. Columns are found
+    # by header, so reports written with another column order still load.
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True)
+    try:
+        rows = workbook[ALL_SHEET].iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        results = []
+        for row in rows:
+            values = dict(zip(header, row))
+            results.append(
+                CaseResult(
+                    county=_text(values.get("County")),
+                    case_ref=CaseRef(
+                        case_number=_text(values.get("Case Number")),
+                        filing_date=date.fromisoformat(
+                            _text(values.get("Filing Date"))
+                        ),
+                        detail_url=_text(values.get("Detail URL")),
+                    ),
+                    pdf_paths=_split(values.get("PDF Paths")),
+                    extracted_fields=ExtractedFields(
+                        deceased_name=values.get("Deceased Name"),
+                        filer_name=values.get("Filer Name"),
+                        property_address=values.get("Property Address"),
+                        case_number=values.get("Parsed Case Number"),
+                        filing_date=values.get("Parsed Filing Date"),
+                        notes=_text(values.get("Notes")),
+                        normalized_address=values.get("Normalized Address"),
+                        latitude=_number(values.get("Latitude")),
+                        longitude=_number(values.get("Longitude")),
+                    ),
+                    errors=_split(values.get("Errors")),
+                )
+            )
+        return results
+    finally:
+        workbook.close()
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def _number(value: Any) -> float | None:
+    return None if value in (None, "") else float(value)
+
+
+def _split(value: Any) -> List[str]:
+    return str(value).split("; ") if value else []
+
+
+def _open_sibling(fmt: str, path: Path, temporaries: List[Tuple[Path, Path]]):
+    if fmt == "csv":
+        return _CsvSink(path.with_suffix(".csv"), temporaries)
+    if fmt == "parquet":
+        return _ParquetSink(path.with_suffix(".parquet"), temporaries)
+    raise ValueError(f"Unknown report format: {fmt}")
+
+
+class _CsvSink:
+    def __init__(self, final: Path, temporaries: List[Tuple[Path, Path]]) -> None:
+        self.tmp = _temporary(final)
+        temporaries.append((self.tmp, final))
+
+    def __enter__(self) -> Callable[[List[Any]], None]:
+        # utf-8-sig so Excel opens the CSV with the right encoding.
+        self.handle = open(self.tmp, "w", encoding="utf-8-sig", newline="")
+        writer = csv.writer(self.handle)
+        writer.writerow(HEADERS)
+        return writer.writerow
+
+    def __exit__(self, *_exc: object) -> None:
+        self.handle.close()
+
+
+class _ParquetSink:
+    def __init__(self, final: Path, temporaries: List[Tuple[Path, Path]]) -> None:
+        self.final = final
+        self.temporaries = temporaries
+        self.batch: List[List[Any]] = []
+        self.writer: Any = None
+
+    def __enter__(self) -> Callable[[List[Any]], None]:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            logger.warning("pyarrow is not installed; skipping %s", self.final.name)
+            return lambda _row: None
+        self.pa = pa
+        self.schema = pa.schema([(header, pa.string()) for header in HEADERS])
+        self.tmp = _temporary(self.final)
+        self.temporaries.append((self.tmp, self.final))
+        self.writer = pq.ParquetWriter(self.tmp, self.schema)
+        return self._add
+
+    def _add(self, row: List[Any]) -> None:
+        self.batch.append(row)
+        if len(self.batch) >= PARQUET_BATCH_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self.batch:
+            return
+        columns = [
+            [None if value is None else str(value) for value in column]
+            for column in zip(*self.batch)
+        ]
+        table = self.pa.Table.from_pydict(dict(zip(HEADERS, columns)), self.schema)
+        self.writer.write_table(table)
+        self.batch = []
+
+    def __exit__(self, *_exc: object) -> None:
+        if self.writer is None:
+            return
+        self._flush()
+        self.writer.close()
+
+
+def _discard(workbook: Any, tmp: Path) -> None:
+    # Write-only sheets stream into temp files that openpyxl only removes when
+    # the workbook is saved, so an aborted report is saved to its temporary
+    # name (deleted by the caller) to leave nothing behind.
+    try:
+        workbook.save(tmp)
+    except Exception:
+        pass
+
+
+def _temporary(path: Path) -> Path:
+    return path.with_name(f".{path.name}.tmp")
+
+
+def _sheet_title(name: str) -> str:
+    # Excel sheet names: at most 31 characters, none of []:*?/\
+    cleaned = "".join("_" if char in "[]:*?/\\" else char for char in name)
+    return cleaned[:31] or "Sheet"
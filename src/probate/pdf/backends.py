@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence, Type
+
+from probate.cancel import CancelToken, checkpoint
+from probate.pdf.pages import PDFIUM_LOCK, iter_pages
+
+logger = logging.getLogger("probate.pdf")
+
+# Tried in order by extract_text. The layout-aware pdfplumber pass only runs
+# when the fast text has no labels at all or a label whose value won't parse.
+DEFAULT_BACKENDS = ("pdfium", "pdfplumber")
+
+
+class TextBackend(ABC):
+    # Reads a PDF's text layer one page at a time. Backends differ in speed
+    # and in how faithfully they keep the printed reading order.
+    name = ""
+
+    @abstractmethod
+    def page_texts(
+        self,
+        pdf_path: Path,
+        cancel_token: CancelToken | None = None,
+        max_pages: int | None = None,
+    ) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class PdfiumBackend(TextBackend):
+    # PDFium's text page in content order with its own line breaks; no layout
+    # analysis, so it is an order of magnitude faster than pdfplumber.
+    # pypdfium2 ships with pdfplumber, so it is always available.
+    name = "pdfium"
+
+    def page_texts(
+        self,
+        pdf_path: Path,
+        cancel_token: CancelToken | None = None,
+        max_pages: int | None = None,
+    ) -> Iterator[str]:
+        import pypdfium2
+
+        # The lock is taken per page, not across the yield, so other threads
+        # get their turn while the caller works on this page's text.
+        with PDFIUM_LOCK:
+            document = pypdfium2.PdfDocument(str(pdf_path))
+            pages = len(document)
+        try:
+            for index in range(pages):
+                if max_pages is not None and index >= max_pages:
+                    logger.warning("Stopped after %s of %s pages", index, pages)
+                    return
+                checkpoint(cancel_token)
+                with PDFIUM_LOCK:
+                    page = document[index]
+                    textpage = page.get_textpage()
+                    try:
+                        text = textpage.get_text_range()
+                    finally:
+                        textpage.close()
+                        page.close()
+                yield text.replace("\r\n", "\n")
+        finally:
+            with PDFIUM_LOCK:
+                document.close()
+
+
+class PypdfBackend(TextBackend):
+    # Pure-Python alternative to pdfium; needs the `pypdf` extra.
+    name = "pypdf"
+
+    def page_texts(
+        self,
+        pdf_path: Path,
+        cancel_token: CancelToken | None = None,
+        max_pages: int | None = None,
+    ) -> Iterator[str]:
+        from pypdf import PdfReader
+
+        reader = PdfReader(str(pdf_path))
+        for index, page in enumerate(reader.pages):
+            if max_pages is not None and index >= max_pages:
+                logger.warning("Stopped after %s of %s pages", index, len(reader.pages))
+                return
+            checkpoint(cancel_token)
+            yield page.extract_text() or ""
+
+
+class PlumberBackend(TextBackend):
+    # pdfplumber's layout mode: groups characters into lines by position, so
+    # it copes with content drawn out of reading order. The slow, careful one.
+    name = "pdfplumber"
+
+    def page_texts(
+        self,
+        pdf_path: Path,
+        cancel_token: CancelToken | None = None,
+        max_pages: int | None = None,
+    ) -> Iterator[str]:
+        import pdfplumber
+
+        with pdfplumber.open(pdf_path) as pdf:
+            for page in iter_pages(pdf, cancel_token, max_pages):
+                yield page.extract_text() or ""
+
+
+BACKENDS: Dict[str, Type[TextBackend]] = {
+    backend.name: backend for backend in (PdfiumBackend, PypdfBackend, PlumberBackend)
+}
+
+
+def get_backend(name: str) -> TextBackend:
+    return BACKENDS[name]()
+
+
+@dataclass
+class BackendBench:
+    # One row of `probate bench-text`: how long a backend (or chain of them,
+    # named "a>b") took over the corpus and how many fields parsed from it.
+    name: str
+    documents: int = 0
+    unreadable: int = 0
+    seconds: float = 0.0
+    fields_found: int = 0
+    fields_possible: int = 0
+    per_field: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def recall(self) -> float:
+        return self.fields_found / self.fields_possible if self.fields_possible else 0.0
+
+    @property
+    def ms_per_document(self) -> float:
+        return 1000 * self.seconds / self.documents if self.documents else 0.0
+
+
+def find_pdfs(paths: Iterable[Path]) -> List[Path]:
+    found: List[Path] = []
+    for path in paths:
+        found.extend(sorted(path.rglob("*.pdf")) if path.is_dir() else [path])
+    return found
+
+
+def benchmark(
+    pdfs: Sequence[Path], backends: Sequence[str] = DEFAULT_BACKENDS
+) -> List[BackendBench]:
+    # Each backend alone, then the chain extract_text would run with
+    # `backends` (including its plain-read fallback for files no backend can
+    # open). Recall counts the fields parse_fields finds per document.
+    from probate.pdf.extract_text import _text_layer
+    from probate.pdf.pages import DocumentLimits
+    from probate.pdf.parse_fields import parse_fields
+    from probate.pdf.templates import FIELD_LABELS
+
+    limits = DocumentLimits()
+    rows: List[BackendBench] = []
+    runs = [(name, (name,)) for name in backends]
+    if len(backends) > 1:
+        runs.append((">".join(backends), tuple(backends)))
+    for label, chain in runs:
+        row = BackendBench(label, per_field={name: 0 for name in FIELD_LABELS})
+        for pdf in pdfs:
+            started = time.perf_counter()
+            if len(chain) == 1:
+                try:
+                    text = "\n".join(get_backend(chain[0]).page_texts(pdf))
+                except Exception as exc:
+                    logger.debug("%s could not read %s: %s", label, pdf.name, exc)
+                    row.unreadable += 1
+                    continue
+            else:
+                text = _text_layer(pdf, chain, None, limits, None)
+            row.seconds += time.perf_counter() - started
+            row.documents += 1
+            row.fields_possible += len(FIELD_LABELS)
+            fields = parse_fields(text)
+            for name in FIELD_LABELS:
+                if getattr(fields, name) is not None:
+                    row.per_field[name] += 1
+                    row.fields_found += 1
+        rows.append(row)
+    return rows
@@ -1,30 +1,43 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 import hashlib
+import mmap
+import os
+import sys
+from typing import BinaryIO, Callable
 from urllib.parse import urlparse, unquote
 
-import requests
-
 try:
-    from tenacity import retry, stop_after_attempt, wait_exponential
-except Exception:  # pragma: no cover - fallback when tenacity isn't installed
-    def retry(*_args, **_kwargs):  # type: ignore
-        def decorator(func):
-            return func
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
 
-        return decorator
+from probate.cancel import CancelToken, checkpoint
+from probate.models import PdfLink
 
-    def stop_after_attempt(_attempts):  # type: ignore
-        return None
+_COPY_CHUNK = 8 << 20
+_HTTP_CHUNK = 1 << 16
+_FICLONE = 0x40049409
 
-    def wait_exponential(*_args, **_kwargs):  # type: ignore
-        return None
 
-from probate.models import PdfLink
+def download_pdf(
+    link: PdfLink,
+    dest_path: Path,
+    cancel_token: CancelToken | None = None,
+    timeout: float = 30.0,
+) -> Path:
+    download_pdf_hashed(link, dest_path, cancel_token, timeout)
+    return dest_path
 
 
-def download_pdf(link: PdfLink, dest_path: Path) -> Path:
+def download_pdf_hashed(
+    link: PdfLink,
+    dest_path: Path,
+    cancel_token: CancelToken | None = None,
+    timeout: float = 30.0,
+) -> str:
     dest_path.parent.mkdir(parents=True, exist_ok=True)
 
     if link.url.startswith("file://"):
@@ -34,19 +47,134 @@ def download_pdf(link: PdfLink, dest_path: Path) -> Path:
             path_str = f"//{parsed.netloc}{path_str}"
         if path_str.startswith("/") and len(path_str) > 2 and path_str[2] == ":":
             path_str = path_str.lstrip("/")
-        source = Path(path_str)
-        dest_path.write_bytes(source.read_bytes())
-        return dest_path
+        return copy_local_file(Path(path_str), dest_path, cancel_token)
+
+    return _http_fetcher()(link.url, dest_path, cancel_token, timeout)
+
+
+def copy_local_file(
+    source: Path, dest_path: Path, cancel_token: CancelToken | None = None
+) -> str:
+    # Returns the SHA-256 of the copied bytes. Copies go through a reflink, the
+    # kernel (copy_file_range/sendfile) or a reused buffer, in that order, and
+    # the digest is computed in the same pass so memory stays constant.
+    with open(source, "rb") as src, open(dest_path, "wb") as dst:
+        size = os.fstat(src.fileno()).st_size
+        if size == 0:
+            return hashlib.sha256().hexdigest()
+        if _reflink(src.fileno(), dst.fileno()):
+            return sha256_mmap(source)
+        digest = _copy_in_kernel(src.fileno(), dst.fileno(), size, cancel_token)
+        if digest is not None:
+            return digest
+        dst.seek(0)
+        dst.truncate()
+        return _copy_buffered(src, dst, cancel_token)
+
+
+def _reflink(src_fd: int, dst_fd: int) -> bool:
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    try:
+        fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+    except OSError:
+        return False
+    return True
+
+
+def _copy_in_kernel(
+    src_fd: int, dst_fd: int, size: int, cancel_token: CancelToken | None
+) -> str | None:
+    copy = _kernel_copy_function()
+    if copy is None:
+        return None
+    digest = hashlib.sha256()
+    with mmap.mmap(src_fd, 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            offset = 0
+            while offset < size:
+                checkpoint(cancel_token)
+                count = min(_COPY_CHUNK, size - offset)
+                try:
+                    copied = copy(src_fd, dst_fd, count, offset)
+                except OSError:
+                    return None
+                if copied <= 0:
+                    return None
+                # The range was just read by the kernel, so it hashes from cache.
+                digest.update(view[offset : offset + copied])
+                offset += copied
+        finally:
+            view.release()
+    return digest.hexdigest()
 
-    dest_path.write_bytes(_download_http(link.url))
-    return dest_path
 
+def _kernel_copy_function() -> Callable[[int, int, int, int], int] | None:
+    if hasattr(os, "copy_file_range"):
+
+        def copy_range(src_fd: int, dst_fd: int, count: int, offset: int) -> int:
+            return os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+
+        return copy_range
+    if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=4))
-def _download_http(url: str) -> bytes:
-    response = requests.get(url, timeout=30)
-    response.raise_for_status()
-    return response.content
+        def send(src_fd: int, dst_fd: int, count: int, offset: int) -> int:
+            return os.sendfile(dst_fd, src_fd, offset, count)
+
+        return send
+    return None
+
+
+def _copy_buffered(
+    src: BinaryIO, dst: BinaryIO, cancel_token: CancelToken | None
+) -> str:
+    digest = hashlib.sha256()
+    buffer = bytearray(_COPY_CHUNK)
+    view = memoryview(buffer)
+    while True:
+        checkpoint(cancel_token)
+        read = src.readinto(buffer)
+        if not read:
+            break
+        digest.update(view[:read])
+        dst.write(view[:read])
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _http_fetcher() -> Callable[[str, Path, CancelToken | None, float], str]:
+    # requests and tenacity are only imported once an http(s) link is fetched;
+    # local file:// runs never load them.
+    import requests
+
+    # One pooled session per process keeps connections to each portal alive
+    # across downloads (and across runs in `probate serve`).
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    def fetch(
+        url: str, dest_path: Path, cancel_token: CancelToken | None, timeout: float
+    ) -> str:
+        digest = hashlib.sha256()
+        with session.get(url, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            with open(dest_path, "wb") as handle:
+                for chunk in response.iter_content(chunk_size=_HTTP_CHUNK):
+                    checkpoint(cancel_token)
+                    digest.update(chunk)
+                    handle.write(chunk)
+        return digest.hexdigest()
+
+    try:
+        from tenacity import retry, stop_after_attempt, wait_exponential
+    except Exception:  # pragma: no cover - fallback when tenacity isn't installed
+        return fetch
+
+    # Cancelled is a BaseException, so tenacity never retries a cancelled fetch.
+    return retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=4))(fetch)
 
 
 def sha256_file(path: Path) -> str:
@@ -57,5 +185,22 @@ def sha256_file(path: Path) -> str:
     return digest.hexdigest()
 
 
+def sha256_mmap(path: Path, chunk_size: int = 1 << 20) -> str:
+    # Hashes straight from the page cache without copying into Python buffers.
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, chunk_size):
+                    digest.update(view[offset : offset + chunk_size])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+
 def checksum_path(path: Path) -> Path:
     return path.with_suffix(path.suffix + ".sha256")
@@ -1,35 +1,258 @@
 from __future__ import annotations
 
+import dataclasses
+import hashlib
+import json
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from importlib import metadata
 from pathlib import Path
+from typing import Any, Dict, List, Sequence
 
-import pdfplumber
+from probate.cancel import CancelToken
+from probate.pdf.backends import DEFAULT_BACKENDS, get_backend
+from probate.pdf.ocr import PageAllowance, ocr_text
+from probate.pdf.page_filter import PageFilter
+from probate.pdf.pages import DocumentLimits, TextBuffer
+from probate.pdf.parse_fields import labelled_fields, parse_fields
+from probate.pdf.templates import FIELD_LABELS, Template, extract_with_template
 
-from probate.pdf.ocr import ocr_text
+logger = logging.getLogger("probate.pdf")
 
+# Part of every settings_key(). Bump it with any change that makes extraction
+# give different text for the same PDF and settings, so the corpus text from
+# earlier code is not reused. The installed PDF and OCR libraries' versions
+# are included as well.
+EXTRACTOR_VERSION = 1
+EXTRACTOR_LIBRARIES = ("pdfplumber", "pypdfium2", "pypdf", "pytesseract")
 
-def extract_text(pdf_path: Path) -> tuple[str, bool]:
-    text = ""
-    used_ocr = False
+
+def extract_text(
+    pdf_path: Path,
+    cancel_token: CancelToken | None = None,
+    ocr: str = "auto",
+    allow_ocr_page: PageAllowance | None = None,
+    page_filter: PageFilter | None = None,
+    templates: Sequence[Template] = (),
+    limits: DocumentLimits | None = None,
+    spill_path: Path | None = None,
+    backends: Sequence[str] = DEFAULT_BACKENDS,
+) -> tuple[str, bool]:
+    # ocr: "auto" falls back to OCR when there is no text layer, "always" OCRs
+    # every PDF (for portals whose text layers are garbage), "never" skips it.
+    # Pages are read one at a time within `limits`; see DocumentLimits.
+    limits = limits or DocumentLimits()
 
     if pdf_path.suffix.lower() == ".txt":
-        return pdf_path.read_text(encoding="utf-8"), False
+        return _read_text_fallback(pdf_path, limits.max_text_bytes), False
 
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-    except Exception:
-        text = _read_text_fallback(pdf_path)
+    regions, regions_ocr = "", False
+    if templates:
+        # A document laid out like a known county form is read region by
+        # region; anything else falls through to the whole-document path.
+        templated = extract_with_template(
+            pdf_path, templates, cancel_token, ocr, allow_ocr_page
+        )
+        if templated is not None:
+            if _fields_found(templated[0]) == len(FIELD_LABELS):
+                return templated
+            # Fields the template doesn't cover still come from the whole
+            # document. The region lines go first, so parse_fields prefers
+            # their values.
+            regions, regions_ocr = templated
 
-    if not text.strip():
-        text = ocr_text(pdf_path)
+    text, used_ocr = _whole_document(
+        pdf_path,
+        cancel_token,
+        ocr,
+        allow_ocr_page,
+        page_filter,
+        limits,
+        spill_path,
+        backends,
+    )
+    return regions + text, regions_ocr or used_ocr
+
+
+def _whole_document(
+    pdf_path: Path,
+    cancel_token: CancelToken | None,
+    ocr: str,
+    allow_ocr_page: PageAllowance | None,
+    page_filter: PageFilter | None,
+    limits: DocumentLimits,
+    spill_path: Path | None,
+    backends: Sequence[str],
+) -> tuple[str, bool]:
+    used_ocr = False
+    if ocr == "always":
+        text = ocr_text(
+            pdf_path, cancel_token, allow_ocr_page, page_filter, limits, spill_path
+        )
+        if text.strip():
+            return text, True
+
+    text = _text_layer(pdf_path, backends, cancel_token, limits, spill_path)
+
+    if not text.strip() and ocr != "never":
+        text = ocr_text(
+            pdf_path, cancel_token, allow_ocr_page, page_filter, limits, spill_path
+        )
         used_ocr = bool(text.strip())
 
     return text, used_ocr
 
 
-def _read_text_fallback(pdf_path: Path) -> str:
+@dataclass
+class ExtractRequest:
+    # extract_text's inputs as plain data, so the call can run in a watchdog
+    # worker process (see probate.watchdog). Templates are in config form.
+    pdf_path: Path
+    ocr: str = "auto"
+    templates: List[Dict[str, Any]] = field(default_factory=list)
+    limits: DocumentLimits = field(default_factory=DocumentLimits)
+    spill_path: Path | None = None
+    backends: Sequence[str] = DEFAULT_BACKENDS
+    boilerplate_pages: List[str] = field(default_factory=list)
+    skip_blank_pages: bool = True
+    # OCR pages this document may use; None for no limit.
+    ocr_pages_left: int | None = None
+
+    def settings_key(self) -> str:
+        # Everything but the file itself that shapes the text, including the
+        # extractor's version: the same bytes under the same key extract to
+        # the same text. The OCR allowance is left out; text cut short by it
+        # is never shared.
+        settings = dataclasses.asdict(self)
+        for name in ("pdf_path", "spill_path", "ocr_pages_left"):
+            settings.pop(name)
+        settings["extractor"] = [EXTRACTOR_VERSION, _library_versions()]
+        encoded = json.dumps(settings, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def _library_versions() -> Dict[str, str | None]:
+    versions: Dict[str, str | None] = {}
+    for name in EXTRACTOR_LIBRARIES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+@dataclass
+class ExtractOutcome:
+    text: str = ""
+    used_ocr: bool = False
+    ocr_pages: int = 0
+    # OCR stopped at the page limit before the document was done.
+    ocr_exhausted: bool = False
+    # Pages the page filter skipped, by reason ("blank", "boilerplate").
+    pages_skipped: Dict[str, int] = field(default_factory=dict)
+
+
+def extract_document(
+    request: ExtractRequest,
+    cancel_token: CancelToken | None = None,
+    allow_ocr_page: PageAllowance | None = None,
+) -> ExtractOutcome:
+    # extract_text for an ExtractRequest, counting OCR pages and skipped pages
+    # instead of reporting them through callbacks. allow_ocr_page, when given,
+    # replaces the request's ocr_pages_left (for in-process callers that share
+    # a live budget).
+    outcome = ExtractOutcome()
+    skipped: Counter[str] = Counter()
+
+    def allow_page() -> bool:
+        if allow_ocr_page is not None:
+            allowed = allow_ocr_page()
+        else:
+            limit = request.ocr_pages_left
+            allowed = limit is None or outcome.ocr_pages < limit
+        if allowed:
+            outcome.ocr_pages += 1
+        else:
+            outcome.ocr_exhausted = True
+        return allowed
+
+    outcome.text, outcome.used_ocr = extract_text(
+        request.pdf_path,
+        cancel_token,
+        ocr=request.ocr,
+        allow_ocr_page=allow_page,
+        page_filter=PageFilter(
+            request.boilerplate_pages,
+            skip_blank=request.skip_blank_pages,
+            record=lambda reason: skipped.update((reason,)),
+        ),
+        templates=[Template.from_config(data) for data in request.templates],
+        limits=request.limits,
+        spill_path=request.spill_path,
+        backends=request.backends,
+    )
+    outcome.pages_skipped = dict(skipped)
+    return outcome
+
+
+def _text_layer(
+    pdf_path: Path,
+    backends: Sequence[str],
+    cancel_token: CancelToken | None,
+    limits: DocumentLimits,
+    spill_path: Path | None,
+) -> str:
+    best: tuple[int, str] | None = None
+    for name in backends:
+        try:
+            with TextBuffer(limits.max_text_bytes, spill_path) as buffer:
+                for page_text in get_backend(name).page_texts(
+                    pdf_path, cancel_token, limits.max_pages
+                ):
+                    if page_text:
+                        buffer.add(page_text + "\n")
+        except Exception as exc:
+            logger.debug("%s could not read %s: %s", name, pdf_path.name, exc)
+            continue
+        found = _fields_found(buffer.text)
+        # On a tie the later, more careful backend's text is kept.
+        if best is None or found >= best[0]:
+            best = (found, buffer.text)
+        if not _needs_next_backend(buffer.text):
+            break
+        logger.debug("%s found %s fields in %s", name, found, pdf_path.name)
+    if best is None:
+        return _read_text_fallback(pdf_path, limits.max_text_bytes)
+    return best[1]
+
+
+def _needs_next_backend(text: str) -> bool:
+    # A filing may simply lack a field, so missing fields alone don't justify
+    # the next, slower backend. Text with no labels at all, or with a label
+    # whose value didn't parse, is likely out of reading order.
+    labelled = labelled_fields(text)
+    if not labelled:
+        return True
+    fields = parse_fields(text, fuzzy=False)
+    return any(getattr(fields, name) is None for name in labelled)
+
+
+def _fields_found(text: str) -> int:
+    if not text.strip():
+        return 0
+    fields = parse_fields(text)
+    return sum(getattr(fields, name) is not None for name in FIELD_LABELS)
+
+
+def _read_text_fallback(pdf_path: Path, limit: int) -> str:
+    # For .txt fixtures and files no backend could open. Only strict UTF-8 text
+    # is returned: a corrupt PDF gives "" rather than its raw bytes.
     try:
-        return pdf_path.read_text(encoding="utf-8")
+        with open(pdf_path, "r", encoding="utf-8") as handle:
+            text = handle.read(limit)
     except Exception:
         return ""
+    return "" if text.lstrip().startswith("%PDF") else text
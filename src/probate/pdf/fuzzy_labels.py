@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from probate.models import ExtractedFields
+
+# Only the head of a document is scanned for noisy labels (form fields sit on
+# the first pages). That bounds the fallback to a fraction of a second even on
+# prose dense with label-like words; typical filings take a millisecond or two.
+MAX_FUZZY_CHARS = 50_000
+
+# Characters OCR commonly swaps into label words, mapped back before comparing.
+_OCR_FOLD = str.maketrans(
+    {"0": "o", "1": "l", "|": "l", "!": "i", "3": "e", "5": "s", "8": "b", "$": "s"}
+)
+_SEPARATOR = re.compile(r"[ \t]*[:;.,][ \t]*|[ \t]+")
+
+
+@dataclass(frozen=True)
+class FuzzyField:
+    # Printed labels (lowercase, no punctuation) and the value that must follow
+    # one for it to count; the same value shapes as the exact regexes.
+    name: str
+    labels: Tuple[str, ...]
+    value: re.Pattern[str]
+
+
+FUZZY_FIELDS: Tuple[FuzzyField, ...] = (
+    FuzzyField(
+        "case_number",
+        ("case number", "case no"),
+        re.compile(r"(?=[A-Z\-]*[0-9])[A-Z0-9\-]+", re.IGNORECASE),
+    ),
+    FuzzyField(
+        "filing_date",
+        ("filing date", "filed"),
+        re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}"),
+    ),
+    FuzzyField(
+        "deceased_name", ("deceased", "decedent"), re.compile(r"[A-Za-z][A-Za-z\. ]*")
+    ),
+    FuzzyField(
+        "filer_name", ("petitioner", "executor"), re.compile(r"[A-Za-z][A-Za-z\. ]*")
+    ),
+    FuzzyField(
+        "property_address", ("property address", "address"), re.compile(r"[^\n]+")
+    ),
+)
+
+
+def max_edits(label: str) -> int:
+    # Short labels tolerate one slip; longer ones one more per ~6 characters.
+    if len(label) <= 3:
+        return 0
+    if len(label) <= 8:
+        return 1
+    return 2 if len(label) <= 14 else 3
+
+
+def _pieces(label: str, k: int) -> List[Tuple[int, str]]:
+    # k + 1 disjoint slices of the label with their offsets: k edits can
+    # touch at most k of them, so one always appears in the text unchanged.
+    size = len(label) // (k + 1)
+    bounds = [i * size for i in range(k + 1)] + [len(label)]
+    return [(bounds[i], label[bounds[i] : bounds[i + 1]]) for i in range(k + 1)]
+
+
+class LabelMatcher:
+    # Finds "<label><separator><value>" where the label is within a few edits
+    # of a known one. One regex pass over the OCR-folded text finds where any
+    # label piece (see _pieces) occurs; only word starts next to those hits go
+    # through the banded edit-distance table, which fills just the cells
+    # within k of the diagonal.
+    def __init__(self, fields: Sequence[FuzzyField] = FUZZY_FIELDS) -> None:
+        self._labels = [
+            (spec, label, max_edits(label)) for spec in fields for label in spec.labels
+        ]
+
+    def find(self, text: str, wanted: Iterable[str]) -> Dict[str, Tuple[str, str]]:
+        # First value per wanted field, in document order, with a note naming
+        # the text that was taken as its label.
+        wanted = set(wanted)
+        labels = [entry for entry in self._labels if entry[0].name in wanted]
+        text = text[:MAX_FUZZY_CHARS]
+        folded = text.lower().translate(_OCR_FOLD)
+        found: Dict[str, Tuple[str, str]] = {}
+        for begin, label_index in self._candidates(folded, labels):
+            spec, label, k = labels[label_index]
+            if spec.name in found:
+                continue
+            # One character past the longest match, to see where the word ends.
+            stop = begin + len(label) + k + 1
+            end = _label_end(label, folded[begin:stop], text[begin:stop], k)
+            if end is None:
+                continue
+            value = _value_after(spec, label, text, begin + end)
+            if value is None:
+                continue
+            found[spec.name] = (value, text[begin : begin + end])
+            if len(found) == len(wanted):
+                break
+        return found
+
+    def _candidates(
+        self, folded: str, labels: List[Tuple[FuzzyField, str, int]]
+    ) -> List[Tuple[int, int]]:
+        # (word start, label index) pairs in document order, then label order.
+        pieces: Dict[str, List[Tuple[int, int, int]]] = {}
+        for index, (_, label, k) in enumerate(labels):
+            for offset, piece in _pieces(label, k):
+                pieces.setdefault(piece, []).append((index, offset, k))
+        if not pieces:
+            return []
+        # Pieces are at least two characters; hits on a shared two-character
+        # prefix are checked against every piece that starts with it, since
+        # pieces of different labels overlap ("fil" and "fi").
+        by_prefix: Dict[str, List[str]] = {}
+        for piece in pieces:
+            by_prefix.setdefault(piece[:2], []).append(piece)
+        pattern = re.compile(
+            "(?=(" + "|".join(re.escape(prefix) for prefix in by_prefix) + "))"
+        )
+        candidates = set()
+        for hit in pattern.finditer(folded):
+            at = hit.start()
+            for piece in by_prefix[hit.group(1)]:
+                if not folded.startswith(piece, at):
+                    continue
+                for index, offset, k in pieces[piece]:
+                    for begin in range(at - offset - k, at - offset + k + 1):
+                        if (
+                            0 <= begin < len(folded)
+                            and not folded[begin].isspace()
+                            and (begin == 0 or folded[begin - 1].isspace())
+                        ):
+                            candidates.add((begin, index))
+        return sorted(candidates)
+
+
+def _label_end(label: str, window: str, raw: str, k: int) -> int | None:
+    # Length of the closest prefix of `window` within k edits of `label` that
+    # ends at a word boundary, or None. Row i holds the distances between
+    # label[:i] and each window[:j]; cells off the band stay at k + 1.
+    width = len(window)
+    over = k + 1
+    previous = [j if j <= k else over for j in range(width + 1)]
+    for i in range(1, len(label) + 1):
+        current = [over] * (width + 1)
+        if i <= k:
+            current[0] = i
+        for j in range(max(1, i - k), min(width, i + k) + 1):
+            current[j] = min(
+                previous[j - 1] + (label[i - 1] != window[j - 1]),
+                previous[j] + 1,
+                current[j - 1] + 1,
+            )
+        if min(current) > k:
+            return None
+        previous = current
+    best_end = None
+    for j in range(max(0, len(label) - k), min(width, len(label) + k) + 1):
+        if j < width and raw[j].isalnum():
+            continue
+        if previous[j] <= k and (best_end is None or previous[j] < previous[best_end]):
+            best_end = j
+    return best_end
+
+
+def _value_after(spec: FuzzyField, label: str, text: str, pos: int) -> str | None:
+    separator = _SEPARATOR.match(text, pos)
+    if separator is None or "\n" in separator.group():
+        return None
+    # A bare space only separates multi-word labels ("Case N0 PR-1"); single
+    # words need punctuation so prose like "was filed by" is left alone.
+    if not separator.group().strip() and " " not in label:
+        return None
+    value = spec.value.match(text, separator.end())
+    if value is None:
+        return None
+    return value.group().strip() or None
+
+
+_NOISE: Dict[str, Sequence[str]] = {
+    "o": ("0",),
+    "O": ("0",),
+    "e": ("3", "c"),
+    "l": ("1", "|"),
+    "i": ("!", "l"),
+    "s": ("5",),
+    "S": ("5", "$"),
+    "a": ("o",),
+    "m": ("rn",),
+    "n": ("m",),
+    ":": (";", " ;", "."),
+    ".": ("", ","),
+}
+
+
+def add_ocr_noise(text: str, rate: float, rng: random.Random) -> str:
+    # Garbles the label part of each "Label: value" line the way OCR does:
+    # look-alike substitutions, dropped letters and mangled
+    # colons. Values are left alone so results can be checked against them.
+    lines = []
+    for line in text.splitlines(keepends=True):
+        cut = line.find(":") + 1 if ":" in line else 0
+        if not cut and line.lower().startswith("case no."):
+            cut = len("case no.")
+        chars = []
+        for char in line[:cut]:
+            roll = rng.random()
+            if roll < rate and char in _NOISE:
+                chars.append(rng.choice(_NOISE[char]))
+            elif roll < rate * 1.2 and char.isalpha():
+                chars.append("")
+            else:
+                chars.append(char)
+        lines.append("".join(chars) + line[cut:])
+    return "".join(lines)
+
+
+@dataclass
+class ParseBench:
+    # One row of `probate bench-parse`. Truth is what the exact parser reads
+    # from the clean text; a value counts as correct only if it equals that.
+    name: str
+    documents: int = 0
+    seconds: float = 0.0
+    expected: int = 0
+    returned: int = 0
+    correct: int = 0
+
+    @property
+    def precision(self) -> float:
+        return self.correct / self.returned if self.returned else 0.0
+
+    @property
+    def recall(self) -> float:
+        return self.correct / self.expected if self.expected else 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.documents / self.seconds if self.seconds else 0.0
+
+
+FIELD_NAMES = tuple(spec.name for spec in FUZZY_FIELDS)
+
+
+def benchmark_parse(
+    texts: Sequence[str],
+    parse: Callable[..., ExtractedFields],
+    noise: float = 0.15,
+    seed: int = 0,
+    rounds: int = 20,
+) -> List[ParseBench]:
+    # Clean text, then `rounds` noisy copies of each text, parsed with the
+    # exact regexes alone and with the fuzzy fallback.
+    rng = random.Random(seed)
+    cases = []
+    for text in texts:
+        truth = parse(text, fuzzy=False)
+        cases.append((text, truth))
+        cases.extend((add_ocr_noise(text, noise, rng), truth) for _ in range(rounds))
+    rows = []
+    for name, fuzzy in (("regex", False), ("regex+fuzzy", True)):
+        row = ParseBench(name)
+        for text, truth in cases:
+            started = time.perf_counter()
+            fields = parse(text, fuzzy=fuzzy)
+            row.seconds += time.perf_counter() - started
+            row.documents += 1
+            for field_name in FIELD_NAMES:
+                want = getattr(truth, field_name)
+                got = getattr(fields, field_name)
+                row.expected += want is not None
+                row.returned += got is not None
+                row.correct += got is not None and got == want
+        rows.append(row)
+    return rows
@@ -1,22 +1,48 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Callable
 
+from probate.cancel import CancelToken
+from probate.pdf.page_filter import PageFilter
+from probate.pdf.pages import DocumentLimits, TextBuffer, iter_pages, render_page
 
-def ocr_text(pdf_path: Path) -> str:
+# Called before each page is OCR'd; returning False stops OCR for this PDF.
+PageAllowance = Callable[[], bool]
+
+
+def ocr_text(
+    pdf_path: Path,
+    cancel_token: CancelToken | None = None,
+    allow_page: PageAllowance | None = None,
+    page_filter: PageFilter | None = None,
+    limits: DocumentLimits | None = None,
+    spill_path: Path | None = None,
+) -> str:
     try:
         import pdfplumber  # type: ignore
         import pytesseract  # type: ignore
     except Exception:
         return ""
 
-    text_chunks: list[str] = []
+    limits = limits or DocumentLimits()
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                image = page.to_image(resolution=200).original
-                text_chunks.append(pytesseract.image_to_string(image))
+        with (
+            pdfplumber.open(pdf_path) as pdf,
+            TextBuffer(limits.max_text_bytes, spill_path) as buffer,
+        ):
+            for page in iter_pages(pdf, cancel_token, limits.max_pages):
+                # Skipped pages never reach Tesseract or the OCR page budget.
+                if page_filter is not None and not page_filter.worth_ocr(page):
+                    continue
+                if allow_page is not None and not allow_page():
+                    break
+                # One full-resolution render alive at a time.
+                with render_page(page, 200) as image:
+                    chunk = pytesseract.image_to_string(image)
+                if chunk:
+                    buffer.add(chunk + "\n")
     except Exception:
         return ""
 
-    return "\n".join(chunk for chunk in text_chunks if chunk)
+    return buffer.text.rstrip("\n")
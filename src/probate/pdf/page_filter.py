@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, List
+
+from probate.pdf.pages import render_page
+
+# Pages are judged on a coarse render, which is cheap next to a 200 dpi
+# Tesseract pass and still shows whether anything is printed on the page.
+PREVIEW_DPI = 36
+# A pixel this much darker (0-255 grayscale) than the page background counts
+# as ink; measuring from the background handles tinted and grey scans.
+INK_CONTRAST = 48
+# Separator sheets and scanner backs: almost no ink (about a dozen pixels of a
+# letter page at PREVIEW_DPI; one short word already has more), or a page that
+# is a single flat tone.
+BLANK_INK = 0.0001
+BLANK_ENTROPY = 0.01
+# dHash bits that may differ for a page to still match a boilerplate hash.
+HASH_DISTANCE = 4
+
+
+@dataclass
+class PageSignals:
+    ink: float
+    entropy: float
+    dhash: str
+
+
+def page_signals(image: Any) -> PageSignals:
+    gray = image.convert("L")
+    histogram = gray.histogram()
+    total = sum(histogram) or 1
+    background = max(range(len(histogram)), key=histogram.__getitem__)
+    ink = sum(histogram[: max(0, background - INK_CONTRAST)]) / total
+    entropy = sum(
+        -(count / total) * math.log2(count / total) for count in histogram if count
+    )
+    return PageSignals(ink, entropy, dhash(gray, background))
+
+
+def dhash(image: Any, background: int = 255) -> str:
+    # Difference hash of the printed area: compares neighbouring pixels of a
+    # 9x8 thumbnail, so it survives rescans, shifts and contrast changes.
+    # Cropping the margins first keeps sparse pages from all hashing alike.
+    gray = image.convert("L")
+    cutoff = background - INK_CONTRAST
+    box = gray.point(lambda value: 255 if value < cutoff else 0).getbbox()
+    if box:
+        gray = gray.crop(box)
+    small = gray.resize((9, 8)).tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left = small[row * 9 + col]
+            right = small[row * 9 + col + 1]
+            bits = (bits << 1) | (left > right)
+    return f"{bits:016x}"
+
+
+def hash_distance(first: str, second: str) -> int:
+    return bin(int(first, 16) ^ int(second, 16)).count("1")
+
+
+def classify(
+    signals: PageSignals, boilerplate: Iterable[str] = (), skip_blank: bool = True
+) -> str | None:
+    # Returns why the page should be skipped, or None if it is worth OCRing.
+    if skip_blank and (signals.ink < BLANK_INK or signals.entropy < BLANK_ENTROPY):
+        return "blank"
+    for known in boilerplate:
+        if hash_distance(signals.dhash, known) <= HASH_DISTANCE:
+            return "boilerplate"
+    return None
+
+
+class PageFilter:
+    # One per county per run; `record` is told why each skipped page was
+    # skipped ("blank" or "boilerplate").
+    def __init__(
+        self,
+        boilerplate: Iterable[str] = (),
+        skip_blank: bool = True,
+        record: Callable[[str], None] | None = None,
+    ) -> None:
+        self.boilerplate: List[str] = [value.lower() for value in boilerplate]
+        self.skip_blank = skip_blank
+        self.record = record
+
+    def worth_ocr(self, page: Any) -> bool:
+        if not self.skip_blank and not self.boilerplate:
+            return True
+        try:
+            image = render_page(page, PREVIEW_DPI)
+            signals = page_signals(image)
+        except Exception:
+            return True
+        reason = classify(signals, self.boilerplate, self.skip_blank)
+        if reason is None:
+            return True
+        if self.record is not None:
+            self.record(reason)
+        return False
+
+
+def pdf_page_signals(pdf_path: Path) -> List[PageSignals]:
+    # For `probate page-hashes`: the signals of every page of a sample PDF, so
+    # a county's boilerplate pages can be copied into its config.
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return [page_signals(render_page(page, PREVIEW_DPI)) for page in pdf.pages]
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Iterator, List
+
+from probate.cancel import CancelToken, checkpoint
+
+logger = logging.getLogger("probate.pdf")
+
+# PDFium (pypdfium2, also behind pdfplumber's page.to_image) is not thread-safe;
+# cases running on worker threads make every call into it under this lock.
+PDFIUM_LOCK = threading.RLock()
+
+
+@dataclass
+class DocumentLimits:
+    # Pages past max_pages are not read. Text past max_text_bytes is not kept
+    # in memory: it goes to the spill file (when one is given) and the parser
+    # sees the first max_text_bytes only.
+    max_pages: int | None = None
+    max_text_bytes: int = 4_000_000
+
+
+def iter_pages(
+    pdf: Any, cancel_token: CancelToken | None = None, max_pages: int | None = None
+) -> Iterator[Any]:
+    # Yields one pdfplumber page at a time and drops its parsed objects (chars,
+    # images, layout) once the caller moves on, so memory tracks a single page
+    # rather than the whole document.
+    for number, page in enumerate(pdf.pages, start=1):
+        if max_pages is not None and number > max_pages:
+            logger.warning("Stopped after %s of %s pages", max_pages, len(pdf.pages))
+            return
+        checkpoint(cancel_token)
+        try:
+            yield page
+        finally:
+            release = getattr(page, "close", None) or getattr(page, "flush_cache", None)
+            if release is not None:
+                release()
+
+
+def render_page(page: Any, resolution: int) -> Any:
+    # PIL image of a pdfplumber page (or cropped region) at `resolution` DPI.
+    with PDFIUM_LOCK:
+        return page.to_image(resolution=resolution).original
+
+
+class TextBuffer:
+    # Collects page text in a list (no quadratic `+=`) up to a byte limit;
+    # anything after that is written to `spill_path` instead of memory.
+    def __init__(self, limit: int, spill_path: Path | None = None) -> None:
+        self.limit = limit
+        self.spill_path = spill_path
+        self.size = 0
+        self.spilled = False
+        self._parts: List[str] = []
+        self._spill: IO[str] | None = None
+        self._tmp: Path | None = None
+
+    def add(self, text: str) -> None:
+        if not text:
+            return
+        size = len(text.encode("utf-8"))
+        if not self.spilled and self.size + size <= self.limit:
+            self._parts.append(text)
+            self.size += size
+            return
+        if not self.spilled:
+            self.spilled = True
+            room = self.limit - self.size
+            head = text.encode("utf-8")[:room].decode("utf-8", "ignore")
+            self._parts.append(head)
+            self.size += len(head.encode("utf-8"))
+            if self.spill_path is not None:
+                self._tmp = self.spill_path.with_name(self.spill_path.name + ".tmp")
+                self._spill = open(self._tmp, "w", encoding="utf-8")
+                self._spill.writelines(self._parts[:-1])
+        if self._spill is not None:
+            self._spill.write(text)
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def close(self, keep: bool = True) -> None:
+        if self._spill is None:
+            return
+        self._spill.close()
+        self._spill = None
+        assert self._tmp is not None and self.spill_path is not None
+        if not keep:
+            self._tmp.unlink(missing_ok=True)
+            return
+        os.replace(self._tmp, self.spill_path)
+        logger.info(
+            "Text over %s bytes; full text written to %s", self.limit, self.spill_path
+        )
+
+    def __enter__(self) -> "TextBuffer":
+        return self
+
+    def __exit__(self, exc_type: object, *_exc: object) -> None:
+        self.close(keep=exc_type is None)
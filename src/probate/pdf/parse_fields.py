@@ -3,9 +3,14 @@ from __future__ import annotations
 import re
 
 from probate.models import ExtractedFields
+from probate.pdf.fuzzy_labels import LabelMatcher
 
+_matcher = LabelMatcher()
 
-def parse_fields(text: str) -> ExtractedFields:
+
+def parse_fields(text: str, fuzzy: bool = True) -> ExtractedFields:
+    # Exact labels first; fields they miss are looked for under OCR-garbled
+    # labels ("Dec3dent ;", "Case N0") unless fuzzy is off.
     notes = []
 
     case_number = _first_match(
@@ -58,16 +63,48 @@ def parse_fields(text: str) -> ExtractedFields:
         "property_address",
     )
 
+    values = {
+        "deceased_name": deceased_name,
+        "filer_name": filer_name,
+        "property_address": property_address,
+        "case_number": case_number,
+        "filing_date": filing_date,
+    }
+    missing = [name for name in values if f"{name}: no match" in notes]
+    if fuzzy and missing:
+        for name, (value, label) in _matcher.find(text, missing).items():
+            values[name] = value
+            notes[notes.index(f"{name}: no match")] = f"{name}: fuzzy matched {label!r}"
+
     return ExtractedFields(
-        deceased_name=_clean(deceased_name),
-        filer_name=_clean(filer_name),
-        property_address=_clean(property_address),
-        case_number=_clean(case_number),
-        filing_date=_clean(filing_date),
+        deceased_name=_clean(values["deceased_name"]),
+        filer_name=_clean(values["filer_name"]),
+        property_address=_clean(values["property_address"]),
+        case_number=_clean(values["case_number"]),
+        filing_date=_clean(values["filing_date"]),
         notes="; ".join(notes),
     )
 
 
+# The labels parse_fields reads, without their values.
+LABELS = {
+    "case_number": r"Case (?:Number:|No\.)",
+    "filing_date": r"Filing Date:|Filed:",
+    "deceased_name": r"Deceased:|Decedent:",
+    "filer_name": r"Petitioner:|Executor:",
+    "property_address": r"Address:",
+}
+
+
+def labelled_fields(text: str) -> set[str]:
+    # Fields whose label appears in the text, whether or not a value follows.
+    return {
+        name
+        for name, pattern in LABELS.items()
+        if re.search(pattern, text, re.IGNORECASE)
+    }
+
+
 def _first_match(text: str, patterns: list[str], notes: list[str], label: str) -> str:
     for pattern in patterns:
         match = re.search(pattern, text, re.IGNORECASE)
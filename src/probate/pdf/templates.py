@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+from probate.cancel import CancelToken, checkpoint
+from probate.pdf.ocr import PageAllowance
+from probate.pdf.page_filter import PREVIEW_DPI, hash_distance, page_signals
+from probate.pdf.pages import render_page
+
+logger = logging.getLogger("probate.pdf")
+
+# Region boxes are fractions of the page: (x0, top, x1, bottom).
+Box = Tuple[float, float, float, float]
+
+# Each field is written back as a labelled line parse_fields already reads, so
+# templated text goes through the same parser (and `probate reparse`).
+FIELD_LABELS = {
+    "deceased_name": "Deceased",
+    "filer_name": "Petitioner",
+    "property_address": "Property Address",
+    "case_number": "Case Number",
+    "filing_date": "Filing Date",
+}
+# Printed labels that precede each field on county forms; used by learning.
+LABEL_WORDS: Dict[str, List[Tuple[str, ...]]] = {
+    "deceased_name": [("deceased:",), ("decedent:",)],
+    "filer_name": [("petitioner:",), ("executor:",), ("applicant:",)],
+    "property_address": [("property", "address:"), ("address:",)],
+    "case_number": [("case", "number:"), ("case", "no."), ("cause", "no.")],
+    "filing_date": [("filing", "date:"), ("filed:",)],
+}
+# Filled-in forms differ from each other more than rescans of one blank page
+# do, so a layout match is looser than a boilerplate match.
+LAYOUT_DISTANCE = 12
+CROP_DPI = 300
+# Below this share of fields found, the template is assumed not to fit and the
+# whole page is extracted instead.
+MIN_FIELD_SHARE = 0.5
+
+
+@dataclass
+class Template:
+    name: str
+    fields: Dict[str, Box]
+    page: int = 1
+    page_hash: str | None = None
+
+    @classmethod
+    def from_config(cls, data: Dict[str, Any]) -> "Template":
+        return cls(
+            name=data["name"],
+            fields={name: tuple(box) for name, box in data["fields"].items()},
+            page=data.get("page", 1),
+            page_hash=data.get("page_hash"),
+        )
+
+    def to_config(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"name": self.name, "page": self.page}
+        if self.page_hash:
+            data["page_hash"] = self.page_hash
+        data["fields"] = {
+            name: [round(value, 4) for value in box]
+            for name, box in self.fields.items()
+        }
+        return data
+
+
+def extract_with_template(
+    pdf_path: Path,
+    templates: Sequence[Template],
+    cancel_token: CancelToken | None = None,
+    ocr: str = "auto",
+    allow_page: PageAllowance | None = None,
+) -> Tuple[str, bool] | None:
+    # Reads only the template's regions: the text layer inside each box, or
+    # an OCR pass over each crop when the page is scanned (or ocr is
+    # "always"). Returns None when no template fits, so the caller extracts
+    # the whole document as before.
+    try:
+        import pdfplumber
+
+        with pdfplumber.open(pdf_path) as pdf:
+            for template in templates:
+                checkpoint(cancel_token)
+                if template.page > len(pdf.pages):
+                    continue
+                page = pdf.pages[template.page - 1]
+                if not _layout_matches(template, page):
+                    continue
+                found = _read_regions(template, page, ocr, allow_page)
+                if found is None:
+                    continue
+                values, used_ocr = found
+                logger.debug("Template %s matched %s", template.name, pdf_path.name)
+                lines = [
+                    f"{FIELD_LABELS[name]}: {value}" for name, value in values.items()
+                ]
+                return "\n".join(lines) + "\n", used_ocr
+    except Exception as exc:
+        logger.debug("Template extraction failed for %s: %s", pdf_path.name, exc)
+    return None
+
+
+def _layout_matches(template: Template, page: Any) -> bool:
+    # Without a layout hash any page would match and be read through boxes
+    # meant for another form.
+    if not template.page_hash:
+        return False
+    signals = page_signals(render_page(page, PREVIEW_DPI))
+    return hash_distance(signals.dhash, template.page_hash) <= LAYOUT_DISTANCE
+
+
+def _read_regions(
+    template: Template, page: Any, ocr: str, allow_page: PageAllowance | None
+) -> Tuple[Dict[str, str], bool] | None:
+    # ocr: "always" distrusts the text layer, so the crops are OCRed too.
+    scanned = ocr == "always" or not page.chars
+    if scanned:
+        if ocr == "never":
+            return None
+        try:
+            import pytesseract  # type: ignore
+        except Exception:
+            return None
+        if allow_page is not None and not allow_page():
+            return None
+    values: Dict[str, str] = {}
+    for name, box in template.fields.items():
+        x0, top, x1, bottom = _clamp(box)
+        left, upper = float(page.bbox[0]), float(page.bbox[1])
+        width, height = float(page.width), float(page.height)
+        bbox = (
+            left + x0 * width,
+            upper + top * height,
+            left + x1 * width,
+            upper + bottom * height,
+        )
+        region = page.within_bbox(bbox)
+        if scanned:
+            image = render_page(region, CROP_DPI)
+            text = pytesseract.image_to_string(image, config="--psm 6")
+        else:
+            text = region.extract_text() or ""
+        value = " ".join(text.split())
+        if value:
+            values[name] = value
+    if len(values) < MIN_FIELD_SHARE * len(template.fields):
+        return None
+    return values, scanned
+
+
+def _clamp(box: Box) -> Box:
+    x0, top, x1, bottom = (min(1.0, max(0.0, value)) for value in box)
+    return x0, top, x1, bottom
+
+
+def learn_template(
+    name: str, pdf_paths: Sequence[Path], page_number: int = 1
+) -> Template:
+    # Finds the printed labels (LABEL_WORDS) on each sample and takes the box
+    # to the right of each label, widened to cover every sample.
+    import pdfplumber
+
+    boxes: Dict[str, Box] = {}
+    page_hash = None
+    for pdf_path in pdf_paths:
+        with pdfplumber.open(pdf_path) as pdf:
+            page = pdf.pages[page_number - 1]
+            if page_hash is None:
+                preview = render_page(page, PREVIEW_DPI)
+                page_hash = page_signals(preview).dhash
+            left, upper = float(page.bbox[0]), float(page.bbox[1])
+            width, height = float(page.width), float(page.height)
+            for field, box in _label_boxes(_words(page), left + width).items():
+                scaled = _clamp(
+                    (
+                        (box[0] - left) / width,
+                        (box[1] - upper) / height,
+                        (box[2] - left) / width,
+                        (box[3] - upper) / height,
+                    )
+                )
+                if field in boxes:
+                    old = boxes[field]
+                    scaled = (
+                        min(old[0], scaled[0]),
+                        min(old[1], scaled[1]),
+                        max(old[2], scaled[2]),
+                        max(old[3], scaled[3]),
+                    )
+                boxes[field] = scaled
+    return Template(name, boxes, page=page_number, page_hash=page_hash)
+
+
+def _words(page: Any) -> List[Dict[str, Any]]:
+    # Text-layer words, or Tesseract's word boxes scaled back to PDF points.
+    if page.chars:
+        return page.extract_words()
+    import pytesseract  # type: ignore
+
+    image = render_page(page, CROP_DPI)
+    data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+    scale = 72 / CROP_DPI
+    offset_x, offset_y = float(page.bbox[0]), float(page.bbox[1])
+    words = []
+    for index, text in enumerate(data["text"]):
+        if not text.strip():
+            continue
+        left = offset_x + data["left"][index] * scale
+        top = offset_y + data["top"][index] * scale
+        words.append(
+            {
+                "text": text,
+                "x0": left,
+                "x1": left + data["width"][index] * scale,
+                "top": top,
+                "bottom": top + data["height"][index] * scale,
+            }
+        )
+    return words
+
+
+def _label_boxes(words: List[Dict[str, Any]], width: float) -> Dict[str, Box]:
+    lowered = [word["text"].lower() for word in words]
+    labels: Dict[str, Tuple[float, float, float, float]] = {}
+    for field, options in LABEL_WORDS.items():
+        for label in options:
+            start = _find(lowered, label)
+            if start is None:
+                continue
+            span = words[start : start + len(label)]
+            labels[field] = (
+                span[0]["x0"],
+                span[-1]["x1"],
+                min(word["top"] for word in span),
+                max(word["bottom"] for word in span),
+            )
+            break
+    boxes: Dict[str, Box] = {}
+    for field, (_x0, x1, top, bottom) in labels.items():
+        # The value runs from its label to the next label on the same line,
+        # or to the right margin.
+        right = min(
+            [
+                other[0]
+                for other in labels.values()
+                if other[0] > x1 and other[2] < bottom and other[3] > top
+            ],
+            default=width,
+        )
+        pad = (bottom - top) * 0.3
+        boxes[field] = (x1 + 1, top - pad, right - 1, bottom + pad)
+    return boxes
+
+
+def _find(lowered: List[str], label: Tuple[str, ...]) -> int | None:
+    for start in range(len(lowered) - len(label) + 1):
+        if tuple(lowered[start : start + len(label)]) == label:
+            return start
+    return None
@@ -1,113 +1,546 @@
 from __future__ import annotations
 
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import date
+from functools import partial
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, List, Tuple
 
-from probate.config import AppConfig, load_config
+from probate.address import geocode_fields
+from probate.cancel import CancelToken, Cancelled, checkpoint
+from probate.config import AppConfig, CountyConfig, load_config
 from probate.connectors import get_connector
-from probate.logging import setup_logging
-from probate.models import CaseResult
-from probate.output.excel import write_excel
-from probate.pdf.download import checksum_path, download_pdf, sha256_file
-from probate.pdf.extract_text import extract_text
+from probate.connectors.base import BaseConnector
+from probate.corpus import (
+    SingleFlight,
+    load_text,
+    parse_text,
+    store_text,
+    text_path,
+)
+from probate.guard import CountyGuard
+from probate.index import ChecksumIndex
+from probate.logging import log_context, log_path, setup_logging
+from probate.models import CaseDetails, CaseRef, CaseResult
+from probate.pdf.extract_text import (
+    ExtractOutcome,
+    ExtractRequest,
+    extract_document,
+)
+from probate.pdf.pages import DocumentLimits
 from probate.pdf.parse_fields import parse_fields
-from probate.storage import build_paths, case_pdf_dir
+from probate.priority import (
+    PlannedCase,
+    RunBudget,
+    deferred_path,
+    plan_cases,
+    prioritize,
+    write_deferred,
+)
+from probate.progress import ProgressCallback, ProgressReporter
+from probate.storage import (
+    StoragePaths,
+    build_paths,
+    case_pdf_dir,
+    discard_corrupt,
+    report_path,
+    store_case_pdf,
+)
+from probate.watchdog import CaseWatch, StageTimeout
 
+# Narrows a county's case index before processing (e.g. to unseen cases only).
+CaseSelector = Callable[[CountyConfig, List[CaseRef]], List[CaseRef]]
 
-def run_from_config(config_path: str, target_date: date) -> List[CaseResult]:
+
+@dataclass
+class RunStats:
+    cases_found: int = 0
+    pdfs_downloaded: int = 0
+    # Cases whose PDF text came from an identical PDF extracted by another
+    # case (in flight or earlier, this run or a previous one).
+    pdfs_deduplicated: int = 0
+    ocr_used: int = 0
+    ocr_pages: int = 0
+    pages_skipped_blank: int = 0
+    pages_skipped_boilerplate: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    deferred: int = 0
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def add(self, name: str, amount: int = 1) -> None:
+        # Cases of one county may run on several threads (CountyConfig.concurrency).
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+
+@dataclass
+class RunContext:
+    target_date: date
+    storage: StoragePaths
+    index: ChecksumIndex
+    stats: RunStats
+    reporter: ProgressReporter
+    logger: logging.Logger
+    cancel_token: CancelToken | None = None
+    guards: Dict[str, CountyGuard] = field(default_factory=dict)
+    # Extractions in flight, keyed by PDF digest and extraction settings.
+    extractions: SingleFlight[Tuple[ExtractOutcome, bool]] = field(
+        default_factory=SingleFlight
+    )
+
+
+def run_from_config(
+    config_path: str, target_date: date, verify: bool = False
+) -> List[CaseResult]:
     config = load_config(config_path)
-    return run_pipeline(config, target_date)
+    return run_pipeline(config, target_date, verify=verify)
+
+
+def run_pipeline(
+    config: AppConfig,
+    target_date: date,
+    verify: bool = False,
+    progress: ProgressCallback | None = None,
+    cancel_token: CancelToken | None = None,
+    connectors: Dict[str, BaseConnector] | None = None,
+    report_tag: str | None = None,
+    select_cases: CaseSelector | None = None,
+    write_report: bool = True,
+) -> List[CaseResult]:
+    # Every record of the run, case threads included, carries its run_id and
+    # goes to the run date's log file, even with other runs in flight.
+    log_file = log_path(Path(config.output.logs_dir), target_date)
+    with log_context(run_id=uuid.uuid4().hex[:12], log_file=str(log_file)):
+        return _run_pipeline(
+            config,
+            target_date,
+            verify,
+            progress,
+            cancel_token,
+            connectors,
+            report_tag,
+            select_cases,
+            write_report,
+        )
 
 
-def run_pipeline(config: AppConfig, target_date: date) -> List[CaseResult]:
+def _run_pipeline(
+    config: AppConfig,
+    target_date: date,
+    verify: bool,
+    progress: ProgressCallback | None,
+    cancel_token: CancelToken | None,
+    connectors: Dict[str, BaseConnector] | None,
+    report_tag: str | None,
+    select_cases: CaseSelector | None,
+    write_report: bool,
+) -> List[CaseResult]:
     storage = build_paths(
         config.output.pdf_dir, config.output.report_dir, config.output.logs_dir
     )
-    logger = setup_logging(storage.logs_dir, target_date=target_date)
+    logger = setup_logging(
+        storage.logs_dir,
+        target_date=target_date,
+        debug_every=config.run.log_debug_every,
+    )
+    index = ChecksumIndex(storage.index_path, root=storage.pdf_dir)
+    reporter = ProgressReporter(progress)
+    reporter.run_started()
 
     results: List[CaseResult] = []
-    cases_found = 0
-    pdfs_downloaded = 0
-    ocr_used = 0
-    error_count = 0
+    stats = RunStats()
+    context = RunContext(
+        target_date, storage, index, stats, reporter, logger, cancel_token
+    )
 
-    for county in config.counties:
-        if not county.enabled:
-            continue
-        connector = get_connector(county.connector, county)
-        case_refs = connector.fetch_case_index(target_date)
-        cases_found += len(case_refs)
-        for case_ref in case_refs:
-            errors = []
-            pdf_paths: List[str] = []
+    cancelled = False
+    deferred: List[PlannedCase] = []
+    budget = RunBudget.from_config(config.run)
+    try:
+        planned: List[PlannedCase] = []
+        for county in config.counties:
+            if not county.enabled:
+                continue
+            checkpoint(cancel_token)
+            if verify:
+                prefix = f"{county.name}/{target_date.isoformat()}/"
+                for path, digest in index.rehash(prefix):
+                    logger.warning("Checksum mismatch, refetching %s", path)
+                    discard_corrupt(storage, path, digest)
+            connector = connector_for(county, cancel_token, connectors)
+            guard = CountyGuard(county, connector)
+            context.guards[county.name] = guard
             try:
-                details = connector.fetch_case_details(case_ref)
-                case_dir = case_pdf_dir(storage, county.name, target_date, case_ref.case_number)
-                for link in details.pdf_links:
-                    dest = case_dir / f"{link.label}.pdf"
-                    checksum_file = checksum_path(dest)
-                    if dest.exists() and dest.stat().st_size > 0:
-                        if checksum_file.exists():
-                            existing_checksum = checksum_file.read_text(
-                                encoding="utf-8"
-                            ).strip()
-                            if existing_checksum and existing_checksum == sha256_file(dest):
-                                pdf_paths.append(str(dest))
-                                continue
-                        else:
-                            checksum_file.write_text(
-                                sha256_file(dest), encoding="utf-8"
-                            )
-                            pdf_paths.append(str(dest))
-                            continue
-                    downloaded = download_pdf(link, dest)
-                    pdf_paths.append(str(downloaded))
-                    pdfs_downloaded += 1
-                    checksum_file.write_text(sha256_file(downloaded), encoding="utf-8")
-
-                extracted_text = ""
-                used_ocr = False
-                if pdf_paths:
-                    extracted_text, used_ocr = extract_text(Path(pdf_paths[0]))
-                if used_ocr:
-                    ocr_used += 1
-
-                fields = parse_fields(extracted_text)
-                if used_ocr:
-                    fields.notes = (fields.notes + "; used OCR").strip("; ")
-
-                results.append(
-                    CaseResult(
-                        county=county.name,
-                        case_ref=case_ref,
-                        pdf_paths=pdf_paths,
-                        extracted_fields=fields,
-                        errors=errors,
-                    )
-                )
+                case_refs = connector.fetch_case_index(target_date)
             except Exception as exc:
-                logger.exception("Failed case %s", case_ref.case_number)
-                errors.append(str(exc))
-                error_count += 1
-                results.append(
-                    CaseResult(
-                        county=county.name,
-                        case_ref=case_ref,
-                        pdf_paths=pdf_paths,
-                        extracted_fields=parse_fields(""),
-                        errors=errors,
+                # A portal that is down skips its county instead of the whole run.
+                logger.error("Index fetch failed for %s: %s", county.name, exc)
+                stats.add("errors")
+                continue
+            if select_cases is not None:
+                case_refs = select_cases(county, case_refs)
+            stats.cases_found += len(case_refs)
+            reporter.county_indexed(county.name, len(case_refs))
+            if config.run.prioritize:
+                planned.extend(
+                    plan_cases(
+                        connector,
+                        county,
+                        case_refs,
+                        partial(_case_dir, context, county),
+                        probe=config.run.priority_probe,
+                        guard=guard,
+                        budget=budget,
                     )
                 )
+            else:
+                planned.extend(
+                    PlannedCase(county, connector, ref, None) for ref in case_refs
+                )
+        if config.run.prioritize:
+            planned = prioritize(planned)
+
+        deferred = _process_planned(context, planned, budget, results)
+        if deferred:
+            for reason, count in Counter(i.deferred_reason for i in deferred).items():
+                logger.warning("%s: deferring %s cases to the next run", reason, count)
+            write_deferred(deferred_path(storage, target_date, report_tag), deferred)
+        # One batch for the whole run, so an address shared by several
+        # filings is looked up once. Coordinates are optional: a missing
+        # geocoder package or a broken cache costs them, not the report.
+        try:
+            geocode_fields(config, [r.extracted_fields for r in results], cancel_token)
+        except Exception:
+            logger.exception("Geocoding failed; the report has no coordinates")
+    except Cancelled as exc:
+        # The in-flight case is dropped; everything already finished is reported.
+        cancelled = True
+        logger.warning("Run cancelled (%s) after %s completed cases", exc, len(results))
+    finally:
+        index.close()
+    stats.deferred = len(deferred)
+    if not deferred and not cancelled:
+        # A complete run supersedes whatever an earlier budgeted run deferred.
+        deferred_path(storage, target_date, report_tag).unlink(missing_ok=True)
+
+    report = report_path(storage, target_date, tag=report_tag, partial=cancelled)
+    if write_report:
+        from probate.output.excel import write_excel
 
-    report_path = Path(storage.report_dir) / f"Daily_Probate_Leads_{target_date.isoformat()}.xlsx"
-    write_excel(results, report_path)
+        write_excel(
+            results,
+            report,
+            siblings=config.output.report_siblings,
+            per_county_sheets=config.output.per_county_sheets,
+        )
     logger.info(
-        "Run summary: cases_found=%s pdfs_downloaded=%s ocr_used=%s errors=%s",
-        cases_found,
-        pdfs_downloaded,
-        ocr_used,
-        error_count,
+        "Run summary: cases_found=%s pdfs_downloaded=%s pdfs_deduplicated=%s "
+        "ocr_used=%s errors=%s timeouts=%s deferred=%s ocr_pages=%s "
+        "pages_skipped_blank=%s pages_skipped_boilerplate=%s",
+        stats.cases_found,
+        stats.pdfs_downloaded,
+        stats.pdfs_deduplicated,
+        stats.ocr_used,
+        stats.errors,
+        stats.timeouts,
+        stats.deferred,
+        stats.ocr_pages,
+        stats.pages_skipped_blank,
+        stats.pages_skipped_boilerplate,
     )
-    logger.info("Run complete: %s cases", len(results))
+    logger.info(
+        "Run %s: %s cases", "cancelled" if cancelled else "complete", len(results)
+    )
+    message = "cancelled" if cancelled else str(report) if write_report else "complete"
+    if deferred:
+        message += f" ({len(deferred)} cases deferred)"
+    reporter.run_finished(message)
     return results
+
+
+def connector_for(
+    county: CountyConfig,
+    cancel_token: CancelToken | None,
+    connectors: Dict[str, BaseConnector] | None,
+) -> BaseConnector:
+    # Long-running callers pass a cache so portal sessions survive between runs.
+    if connectors is None:
+        return get_connector(county.connector, county, cancel_token)
+    connector = connectors.get(county.name)
+    if connector is None or connector.config != county:
+        connector = get_connector(county.connector, county)
+        connectors[county.name] = connector
+    connector.cancel_token = cancel_token
+    return connector
+
+
+def _process_planned(
+    context: RunContext,
+    planned: List[PlannedCase],
+    budget: RunBudget,
+    results: List[CaseResult],
+) -> List[PlannedCase]:
+    # Cases are submitted in priority order; each county has at most
+    # `concurrency` cases in flight. Results are appended in plan order, and
+    # cases stopped by the run budget or their county's guard are returned.
+    token = context.cancel_token
+    slots = {
+        item.county.name: threading.BoundedSemaphore(item.county.concurrency)
+        for item in planned
+    }
+    workers = max((item.county.concurrency for item in planned), default=1)
+    futures: List[Future[CaseResult | None]] = []
+    submitted: List[PlannedCase] = []
+    deferred: List[PlannedCase] = []
+    stop: Cancelled | None = None
+    with ThreadPoolExecutor(workers, thread_name_prefix="probate-case") as pool:
+        try:
+            for position, item in enumerate(planned):
+                checkpoint(token)
+                exhausted = budget.exhausted()
+                if exhausted:
+                    for remaining in planned[position:]:
+                        remaining.deferred_reason = exhausted
+                        deferred.append(remaining)
+                    break
+                blocked = _guard(context, item.county, item.connector).blocked()
+                if blocked:
+                    item.deferred_reason = blocked
+                    deferred.append(item)
+                    continue
+                slot = slots[item.county.name]
+                slot.acquire()
+                # Case threads inherit the run's log context.
+                future = pool.submit(
+                    contextvars.copy_context().run, _run_planned, context, item
+                )
+                future.add_done_callback(lambda _done, slot=slot: slot.release())
+                submitted.append(item)
+                futures.append(future)
+        except Cancelled as exc:
+            stop = exc
+    guarded: List[PlannedCase] = []
+    for item, future in zip(submitted, futures):
+        try:
+            result = future.result()
+        except Cancelled as exc:
+            stop = stop or exc
+            continue
+        if result is None:
+            guarded.append(item)
+        else:
+            results.append(result)
+    if stop is not None:
+        raise stop
+    return guarded + deferred
+
+
+def _run_planned(context: RunContext, item: PlannedCase) -> CaseResult | None:
+    # The county's breaker may have opened while this case waited for a slot.
+    blocked = _guard(context, item.county, item.connector).blocked()
+    if blocked:
+        item.deferred_reason = blocked
+        return None
+    result = process_case(
+        context, item.connector, item.county, item.case_ref, item.details
+    )
+    context.reporter.case_finished(result)
+    return result
+
+
+def _guard(
+    context: RunContext, county: CountyConfig, connector: BaseConnector
+) -> CountyGuard:
+    guard = context.guards.get(county.name)
+    if guard is None:
+        guard = CountyGuard(county, connector)
+        context.guards[county.name] = guard
+    return guard
+
+
+def _case_dir(context: RunContext, county: CountyConfig, case_ref: CaseRef) -> Path:
+    return case_pdf_dir(
+        context.storage, county.name, context.target_date, case_ref.case_number
+    )
+
+
+def _extract(
+    context: RunContext,
+    county: CountyConfig,
+    guard: CountyGuard,
+    watch: CaseWatch,
+    pdf_path: Path,
+) -> ExtractOutcome:
+    # Identical PDFs are extracted once. Cases holding the same bytes under
+    # the same extraction settings share a single in-flight extraction, and
+    # text already in the corpus from an earlier case or run is reused.
+    stats = context.stats
+    request = ExtractRequest(
+        pdf_path,
+        ocr=county.ocr,
+        templates=county.templates,
+        limits=DocumentLimits(
+            county.max_pdf_pages, int(county.max_text_mb * 1_000_000)
+        ),
+        spill_path=pdf_path.with_suffix(".txt"),
+        backends=county.text_backends,
+        boilerplate_pages=county.boilerplate_pages,
+        skip_blank_pages=county.skip_blank_pages,
+        ocr_pages_left=guard.ocr_pages_left(),
+    )
+    settings = request.settings_key()
+    digest = context.index.lookup(pdf_path)
+    corpus_file = text_path(context.storage, digest) if digest else None
+
+    def extract() -> Tuple[ExtractOutcome, bool]:
+        # The outcome, and whether it came from the corpus.
+        if corpus_file is not None:
+            stored = load_text(corpus_file, settings)
+            if stored is not None:
+                return ExtractOutcome(*stored), True
+        if county.isolate_extraction:
+            outcome = watch.call_isolated(extract_document, request)
+            guard.charge_ocr_pages(outcome.ocr_pages, outcome.ocr_exhausted)
+        else:
+            outcome = extract_document(request, watch.token, guard.take_ocr_page)
+        stats.add("ocr_pages", outcome.ocr_pages)
+        for reason, count in outcome.pages_skipped.items():
+            stats.add(f"pages_skipped_{reason}", count)
+        # Kept for `probate reparse` and later copies; text cut short by the
+        # OCR budget is not kept.
+        if corpus_file is not None and outcome.text.strip():
+            if not guard.ocr_exhausted:
+                store_text(corpus_file, outcome.text, outcome.used_ocr, settings)
+        return outcome, False
+
+    if digest is None:
+        outcome, reused = extract()
+    else:
+        (outcome, reused), shared = context.extractions.run(
+            f"{digest}:{settings}", extract, watch.token
+        )
+        reused = reused or shared
+    if reused:
+        stats.add("pdfs_deduplicated")
+    return outcome
+
+
+def process_case(
+    context: RunContext,
+    connector: BaseConnector,
+    county: CountyConfig,
+    case_ref: CaseRef,
+    details: CaseDetails | None = None,
+) -> CaseResult:
+    with log_context(county=county.name, case=case_ref.case_number):
+        return _process_case(context, connector, county, case_ref, details)
+
+
+def _process_case(
+    context: RunContext,
+    connector: BaseConnector,
+    county: CountyConfig,
+    case_ref: CaseRef,
+    details: CaseDetails | None,
+) -> CaseResult:
+    stats = context.stats
+    reporter = context.reporter
+    watch = CaseWatch(county, context.cancel_token)
+    # Checkpoints against the case's token also stop at its deadlines.
+    token = watch.token
+    errors: List[str] = []
+    pdf_paths: List[str] = []
+    case_number = case_ref.case_number
+    guard = _guard(context, county, connector)
+    reporter.case_started(county.name, case_number)
+    started = time.monotonic()
+    portal_done = False
+    try:
+        # The connector's own checkpoints and waits see the case's deadlines.
+        with watch.stage("details"), connector.case_token(token):
+            if details is None:
+                details = connector.fetch_case_details(case_ref)
+        reporter.stage_done(county.name, case_number, "details")
+
+        case_dir = _case_dir(context, county, case_ref)
+        downloaded_bytes = 0
+        with watch.stage("download"), connector.case_token(token):
+            for link in details.pdf_links:
+                dest = case_dir / f"{link.label}.pdf"
+                if store_case_pdf(
+                    context.storage,
+                    context.index,
+                    link,
+                    dest,
+                    token,
+                    timeout=county.request_timeout_seconds,
+                    throttle=connector.throttle,
+                    case_ref=case_ref,
+                ):
+                    stats.add("pdfs_downloaded")
+                    downloaded_bytes += dest.stat().st_size
+                pdf_paths.append(str(dest))
+        reporter.stage_done(county.name, case_number, "download", downloaded_bytes)
+        # Portal latency covers the detail fetch and downloads, not extraction.
+        guard.breaker.record_success(time.monotonic() - started)
+        portal_done = True
+
+        extracted_text = ""
+        used_ocr = False
+        with watch.stage("extract"):
+            if pdf_paths:
+                outcome = _extract(context, county, guard, watch, Path(pdf_paths[0]))
+                extracted_text, used_ocr = outcome.text, outcome.used_ocr
+        if used_ocr:
+            stats.add("ocr_used")
+        reporter.stage_done(county.name, case_number, "extract")
+
+        with watch.stage("parse"):
+            fields = parse_text(extracted_text, used_ocr)
+            if guard.ocr_exhausted:
+                note = "OCR page budget exhausted"
+                fields.notes = f"{fields.notes}; {note}".strip("; ")
+        reporter.stage_done(county.name, case_number, "parse")
+    except StageTimeout as exc:
+        # A hung document costs this case, never the run. Only a hung portal
+        # (details, download) counts toward the breaker.
+        if not portal_done:
+            guard.breaker.record_failure()
+        context.logger.error("Case %s abandoned: %s", case_number, exc)
+        errors.append(str(exc))
+        stats.add("errors")
+        stats.add("timeouts")
+        fields = parse_fields("")
+    except Exception as exc:
+        # The breaker guards the portal: extraction and parsing errors (bad
+        # PDFs, bugs) don't open it. Only the first portal failure in a streak
+        # gets a traceback; a down portal would otherwise fill the log with
+        # identical ones.
+        failures = 1 if portal_done else guard.breaker.record_failure()
+        if failures == 1:
+            context.logger.exception("Failed case %s", case_number)
+        else:
+            context.logger.warning("Failed case %s: %s", case_number, exc)
+        errors.append(str(exc))
+        stats.add("errors")
+        fields = parse_fields("")
+    finally:
+        guard.charge_time(time.monotonic() - started)
+
+    return CaseResult(
+        county=county.name,
+        case_ref=case_ref,
+        pdf_paths=pdf_paths,
+        extracted_fields=fields,
+        errors=errors,
+    )
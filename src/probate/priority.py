@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Callable, List
+from urllib.parse import unquote, urlparse
+
+from probate.config import CountyConfig, RunConfig
+from probate.connectors.base import BaseConnector
+from probate.guard import CountyGuard
+from probate.models import CaseDetails, CaseRef, PdfLink
+from probate.storage import StoragePaths
+
+logger = logging.getLogger("probate.priority")
+
+# Filing labels that tend to come with real property (inventories, heirship
+# affidavits) score up; guardianships and small-estate filings rarely do.
+LABEL_WEIGHTS = [
+    (re.compile(r"inventory|appraisement", re.I), 4.0),
+    (re.compile(r"heirship", re.I), 3.0),
+    (re.compile(r"deed|real property|property", re.I), 3.0),
+    (re.compile(r"\bwill\b|testament", re.I), 2.0),
+    (re.compile(r"application|petition|probate", re.I), 1.0),
+    (re.compile(r"small estate", re.I), -1.0),
+    (re.compile(r"guardian", re.I), -3.0),
+]
+CASE_TYPE_WEIGHTS = [
+    (re.compile(r"^(GD|GUARD)", re.I), -3.0),
+    (re.compile(r"^(PR|PB|PROB)", re.I), 1.0),
+]
+ADDRESS_PROBE = re.compile(r"(Property\s+)?Address:\s*\S", re.I)
+# Larger filings usually carry inventories; cap the bonus so size never
+# outweighs an explicit label.
+MAX_SIZE_POINTS = 2.0
+
+
+@dataclass
+class PlannedCase:
+    county: CountyConfig
+    connector: BaseConnector
+    case_ref: CaseRef
+    details: CaseDetails | None
+    score: float = 0.0
+    reasons: List[str] = field(default_factory=list)
+    # Set when the case is skipped for this run (budget or circuit breaker).
+    deferred_reason: str | None = None
+
+
+class RunBudget:
+    def __init__(
+        self, wall_minutes: float | None = None, cpu_minutes: float | None = None
+    ) -> None:
+        self.wall_seconds = wall_minutes * 60 if wall_minutes else None
+        self.cpu_seconds = cpu_minutes * 60 if cpu_minutes else None
+        self._wall_start = time.monotonic()
+        self._cpu_start = time.process_time()
+
+    @classmethod
+    def from_config(cls, run: RunConfig) -> "RunBudget":
+        return cls(run.time_budget_minutes, run.cpu_budget_minutes)
+
+    def exhausted(self) -> str | None:
+        # CPU time covers this process only; tesseract runs in a subprocess
+        # and is bounded by the wall-clock budget instead.
+        if self.wall_seconds is not None:
+            if time.monotonic() - self._wall_start >= self.wall_seconds:
+                return "time budget"
+        if self.cpu_seconds is not None:
+            if time.process_time() - self._cpu_start >= self.cpu_seconds:
+                return "CPU budget"
+        return None
+
+
+def plan_cases(
+    connector: BaseConnector,
+    county: CountyConfig,
+    case_refs: List[CaseRef],
+    case_dir_for: Callable[[CaseRef], Path],
+    probe: bool = False,
+    guard: CountyGuard | None = None,
+    budget: RunBudget | None = None,
+) -> List[PlannedCase]:
+    # Detail pages are the cheapest per-case request and carry the PDF labels,
+    # so they are fetched up front (county.concurrency at a time); process_case
+    # reuses them. Planning is charged to the same limits as processing: once
+    # the run budget runs out or the county's guard blocks (open breaker,
+    # county budgets), the rest are planned unscored, without a request, and
+    # _process_planned defers them.
+    def plan_one(case_ref: CaseRef) -> PlannedCase:
+        if budget is not None and budget.exhausted():
+            return PlannedCase(county, connector, case_ref, None)
+        if guard is not None and guard.blocked():
+            return PlannedCase(county, connector, case_ref, None)
+        connector.checkpoint()
+        started = time.monotonic()
+        try:
+            details = connector.fetch_case_details(case_ref)
+        except Exception as exc:
+            logger.warning("Details failed for %s: %s", case_ref.case_number, exc)
+            if guard is not None:
+                guard.charge_time(time.monotonic() - started)
+                guard.breaker.record_failure()
+            return PlannedCase(county, connector, case_ref, None)
+        if guard is not None:
+            guard.charge_time(time.monotonic() - started)
+            guard.breaker.record_success(time.monotonic() - started)
+        item = PlannedCase(county, connector, case_ref, details)
+        score_case(item, case_dir_for(case_ref), probe)
+        return item
+
+    if county.concurrency <= 1 or len(case_refs) <= 1:
+        return [plan_one(case_ref) for case_ref in case_refs]
+    with ThreadPoolExecutor(county.concurrency) as pool:
+        return list(pool.map(plan_one, case_refs))
+
+
+def score_case(item: PlannedCase, case_dir: Path, probe: bool = False) -> None:
+    case_number = item.case_ref.case_number
+    for pattern, weight in CASE_TYPE_WEIGHTS:
+        if pattern.search(case_number):
+            item.score += weight
+            item.reasons.append(f"case type {weight:+g}")
+            break
+    links = item.details.pdf_links if item.details else []
+    for link in links:
+        for pattern, weight in LABEL_WEIGHTS:
+            if pattern.search(link.label):
+                item.score += weight
+                item.reasons.append(f"{link.label} {weight:+g}")
+                break
+    sizes = [size for size in (_known_size(link, case_dir) for link in links) if size]
+    if sizes:
+        points = min(MAX_SIZE_POINTS, sum(sizes) / 1_000_000)
+        item.score += points
+        item.reasons.append(f"size {points:+.1f}")
+    if probe and links:
+        text = _probe_first_page(_local_copy(links[0], case_dir))
+        if text and ADDRESS_PROBE.search(text):
+            item.score += 5.0
+            item.reasons.append("address on first page +5")
+
+
+def prioritize(planned: List[PlannedCase]) -> List[PlannedCase]:
+    # Stable, so equal scores keep index order.
+    return sorted(planned, key=lambda item: -item.score)
+
+
+def deferred_path(
+    storage: StoragePaths, target_date: date, tag: str | None = None
+) -> Path:
+    suffix = f"_{tag}" if tag else ""
+    return (
+        storage.report_dir
+        / f"Daily_Probate_Leads_{target_date.isoformat()}{suffix}_deferred.json"
+    )
+
+
+def write_deferred(path: Path, deferred: List[PlannedCase]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    reasons = sorted({item.deferred_reason or "deferred" for item in deferred})
+    rows = [
+        {
+            "county": item.county.name,
+            "case_number": item.case_ref.case_number,
+            "detail_url": item.case_ref.detail_url,
+            "score": round(item.score, 2),
+            "reasons": item.reasons,
+            "deferred_because": item.deferred_reason,
+        }
+        for item in deferred
+    ]
+    path.write_text(
+        json.dumps({"reason": "; ".join(reasons), "cases": rows}, indent=2),
+        encoding="utf-8",
+    )
+
+
+def _local_copy(link: PdfLink, case_dir: Path) -> Path | None:
+    stored = case_dir / f"{link.label}.pdf"
+    if stored.exists():
+        return stored
+    parsed = urlparse(link.url)
+    if parsed.scheme == "file":
+        return Path(unquote(parsed.path))
+    return None
+
+
+def _known_size(link: PdfLink, case_dir: Path) -> int | None:
+    # Only sizes we can learn without touching the portal: files already in
+    # the store from an earlier run, or file:// sources.
+    path = _local_copy(link, case_dir)
+    try:
+        return path.stat().st_size if path else None
+    except OSError:
+        return None
+
+
+def _probe_first_page(path: Path | None) -> str:
+    if path is None:
+        return ""
+    try:
+        import pdfplumber
+
+        with pdfplumber.open(path) as pdf:
+            if not pdf.pages:
+                return ""
+            return pdf.pages[0].extract_text() or ""
+    except Exception:
+        return ""
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from probate.models import CaseResult
+
+logger = logging.getLogger("probate.progress")
+
+
+@dataclass
+class ProgressEvent:
+    # kind: run_started, county_indexed, case_started, stage_done,
+    # case_finished or run_finished.
+    kind: str
+    county: Optional[str] = None
+    case_number: Optional[str] = None
+    stage: Optional[str] = None
+    cases_done: int = 0
+    cases_total: int = 0
+    bytes_downloaded: int = 0
+    elapsed_seconds: float = 0.0
+    eta_seconds: Optional[float] = None
+    result: Optional[CaseResult] = None
+    message: str = ""
+
+
+# Any callable works, including queue.Queue.put for consumers on another thread.
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+class ProgressReporter:
+    def __init__(self, callback: ProgressCallback | None) -> None:
+        self.callback = callback
+        self.cases_done = 0
+        self.cases_total = 0
+        self.bytes_downloaded = 0
+        self._start = time.monotonic()
+        # Counters and emission are serialised; cases may finish on worker threads.
+        self._lock = threading.RLock()
+
+    def run_started(self) -> None:
+        self._emit("run_started")
+
+    def county_indexed(self, county: str, case_count: int) -> None:
+        with self._lock:
+            self.cases_total += case_count
+            self._emit("county_indexed", county=county, message=f"{case_count} cases")
+
+    def case_started(self, county: str, case_number: str) -> None:
+        self._emit("case_started", county=county, case_number=case_number)
+
+    def stage_done(
+        self, county: str, case_number: str, stage: str, bytes_downloaded: int = 0
+    ) -> None:
+        logger.debug("%s %s: %s done", county, case_number, stage)
+        with self._lock:
+            self.bytes_downloaded += bytes_downloaded
+            self._emit(
+                "stage_done", county=county, case_number=case_number, stage=stage
+            )
+
+    def case_finished(self, result: CaseResult) -> None:
+        with self._lock:
+            self.cases_done += 1
+            self._emit(
+                "case_finished",
+                county=result.county,
+                case_number=result.case_ref.case_number,
+                result=result,
+            )
+
+    def run_finished(self, message: str = "") -> None:
+        self._emit("run_finished", message=message)
+
+    def _emit(self, kind: str, **fields: object) -> None:
+        if self.callback is None:
+            return
+        with self._lock:
+            elapsed = time.monotonic() - self._start
+            eta = None
+            if self.cases_done and self.cases_total >= self.cases_done:
+                eta = elapsed / self.cases_done * (self.cases_total - self.cases_done)
+            event = ProgressEvent(
+                kind=kind,
+                cases_done=self.cases_done,
+                cases_total=self.cases_total,
+                bytes_downloaded=self.bytes_downloaded,
+                elapsed_seconds=elapsed,
+                eta_seconds=eta,
+                **fields,  # type: ignore[arg-type]
+            )
+            try:
+                self.callback(event)
+            except Exception:
+                # A broken consumer must never fail the run.
+                logger.exception("Progress callback failed for %s", kind)
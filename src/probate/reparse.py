@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from probate.address import geocode_fields
+from probate.config import AppConfig
+from probate.corpus import load_text, parse_text, store_text, text_path
+from probate.index import ChecksumIndex
+from probate.models import CaseResult, ExtractedFields
+from probate.pdf.backends import DEFAULT_BACKENDS
+from probate.results_log import (
+    POLL_REPORT_TAG,
+    load_results,
+    results_log_path,
+    write_results,
+)
+from probate.storage import StoragePaths, build_paths
+
+logger = logging.getLogger("probate.reparse")
+
+REPORT_NAME = re.compile(r"^Daily_Probate_Leads_(\d{4}-\d{2}-\d{2})(?:_(.+))?\.xlsx$")
+# The normalized address and its coordinates follow from property_address,
+# so only the parsed fields are diffed.
+DIFF_FIELDS = tuple(
+    item.name
+    for item in fields(ExtractedFields)
+    if item.name not in ("notes", "normalized_address", "latitude", "longitude")
+)
+# Reports are loaded and rewritten in groups of about this many cases, so a
+# multi-year reparse holds one group in memory at a time.
+BATCH_CASES = 20_000
+# Below this many texts, starting a process pool costs more than it saves.
+POOL_MIN_TEXTS = 200
+MAX_CHUNK_TEXTS = 256
+
+# (corpus file, PDF to extract when the text is missing, county OCR policy,
+# county text backends)
+ParseItem = Tuple[str, str | None, str, Tuple[str, ...]]
+
+
+@dataclass
+class FieldChange:
+    report: Path
+    county: str
+    case_number: str
+    field: str
+    old: str | None
+    new: str | None
+
+
+@dataclass
+class ReparseReport:
+    reports: List[Path] = field(default_factory=list)
+    cases: int = 0
+    reparsed: int = 0
+    extracted: int = 0
+    missing_text: int = 0
+    changes: List[FieldChange] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def changed_cases(self) -> int:
+        return len({(c.report, c.county, c.case_number) for c in self.changes})
+
+    def field_counts(self) -> Dict[str, int]:
+        return dict(Counter(change.field for change in self.changes))
+
+
+@dataclass
+class _Source:
+    path: Path
+    target_date: date
+    tag: str | None
+    results: List[CaseResult] = field(default_factory=list)
+    from_log: bool = False
+
+
+def find_reports(
+    storage: StoragePaths, since: date | None = None, until: date | None = None
+) -> List[Tuple[Path, date, str | None]]:
+    found = []
+    if not storage.report_dir.exists():
+        return found
+    for path in sorted(storage.report_dir.iterdir()):
+        match = REPORT_NAME.match(path.name)
+        if not match:
+            continue
+        target_date = date.fromisoformat(match.group(1))
+        if (since and target_date < since) or (until and target_date > until):
+            continue
+        found.append((path, target_date, match.group(2)))
+    return found
+
+
+def reparse(
+    config: AppConfig,
+    since: date | None = None,
+    until: date | None = None,
+    workers: int | None = None,
+    extract_missing: bool = False,
+    write: bool = True,
+) -> ReparseReport:
+    # Runs the current parser over the stored text of every case in the
+    # matching reports, records field-level changes and (unless write=False)
+    # rewrites the reports. Nothing is fetched; with extract_missing, cases
+    # from before the text corpus existed are extracted from their stored PDF.
+    storage = build_paths(
+        config.output.pdf_dir, config.output.report_dir, config.output.logs_dir
+    )
+    ocr = {county.name: county.ocr for county in config.counties}
+    backends = {county.name: tuple(county.text_backends) for county in config.counties}
+    workers = workers or os.cpu_count() or 1
+    report = ReparseReport()
+    started = time.monotonic()
+    pool: Executor | None = None
+    try:
+        with ChecksumIndex(storage.index_path, root=storage.pdf_dir) as index:
+            for batch in _batches(storage, since, until):
+                digests = [
+                    [_digest(index, result) for result in source.results]
+                    for source in batch
+                ]
+                wanted: Dict[str, ParseItem] = {}
+                for source, source_digests in zip(batch, digests):
+                    for result, digest in zip(source.results, source_digests):
+                        if digest is None or digest in wanted:
+                            continue
+                        wanted[digest] = (
+                            str(text_path(storage, digest)),
+                            result.pdf_paths[0] if extract_missing else None,
+                            ocr.get(result.county, "auto"),
+                            backends.get(result.county, DEFAULT_BACKENDS),
+                        )
+                if pool is None and workers > 1 and len(wanted) >= POOL_MIN_TEXTS:
+                    pool = ProcessPoolExecutor(max_workers=workers)
+                outcomes = _parse_all(list(wanted.values()), pool, workers)
+                parsed = dict(zip(wanted, outcomes))
+                # A dry run only takes coordinates already in the cache.
+                geocode_fields(
+                    config,
+                    [outcome[0] for outcome in outcomes if outcome],
+                    resolve=write,
+                )
+                report.extracted += sum(
+                    1 for outcome in parsed.values() if outcome and outcome[1]
+                )
+                for source, source_digests in zip(batch, digests):
+                    _apply(source, source_digests, parsed, report)
+                    if write:
+                        _save(config, storage, source)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    report.elapsed_seconds = time.monotonic() - started
+    logger.info(
+        "Reparsed %s of %s cases in %s reports; %s changed",
+        report.reparsed,
+        report.cases,
+        len(report.reports),
+        report.changed_cases,
+    )
+    return report
+
+
+def _batches(
+    storage: StoragePaths, since: date | None, until: date | None
+) -> Iterator[List[_Source]]:
+    batch: List[_Source] = []
+    size = 0
+    for path, target_date, tag in find_reports(storage, since, until):
+        source = _Source(path, target_date, tag)
+        log_path = results_log_path(storage, target_date)
+        if tag == POLL_REPORT_TAG and log_path.exists():
+            # Polled days are rebuilt from their results log, so that is the
+            # copy to update.
+            source.results = load_results(log_path)
+            source.from_log = True
+        else:
+            from probate.output.excel import read_excel
+
+            source.results = read_excel(path)
+        batch.append(source)
+        size += len(source.results)
+        if size >= BATCH_CASES:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def _digest(index: ChecksumIndex, result: CaseResult) -> str | None:
+    if not result.pdf_paths:
+        return None
+    return index.lookup(Path(result.pdf_paths[0]))
+
+
+def _parse_all(
+    items: List[ParseItem], pool: Executor | None, workers: int
+) -> List[Tuple[ExtractedFields, bool] | None]:
+    if pool is None or len(items) < POOL_MIN_TEXTS:
+        return [_parse_one(item) for item in items]
+    chunksize = max(1, min(MAX_CHUNK_TEXTS, len(items) // (workers * 4)))
+    return list(pool.map(_parse_one, items, chunksize=chunksize))
+
+
+def _parse_one(item: ParseItem) -> Tuple[ExtractedFields, bool] | None:
+    # Runs in a pool process. Returns the new fields and whether the text had
+    # to be extracted, or None when there is no text to parse.
+    corpus_file, pdf_path, ocr, backends = item
+    stored = load_text(Path(corpus_file))
+    if stored is not None:
+        return parse_text(*stored), False
+    if pdf_path is None or not Path(pdf_path).exists():
+        return None
+    from probate.pdf.extract_text import extract_text
+
+    text, used_ocr = extract_text(Path(pdf_path), ocr=ocr, backends=backends)
+    if not text.strip():
+        return None
+    store_text(Path(corpus_file), text, used_ocr)
+    return parse_text(text, used_ocr), True
+
+
+def _apply(
+    source: _Source,
+    digests: List[str | None],
+    parsed: Dict[str, Tuple[ExtractedFields, bool] | None],
+    report: ReparseReport,
+) -> None:
+    report.reports.append(source.path)
+    for result, digest in zip(source.results, digests):
+        report.cases += 1
+        outcome = parsed.get(digest) if digest else None
+        if outcome is None:
+            report.missing_text += 1
+            continue
+        report.reparsed += 1
+        new = outcome[0]
+        old = result.extracted_fields
+        for name in DIFF_FIELDS:
+            before, after = getattr(old, name), getattr(new, name)
+            if (before or None) != (after or None):
+                report.changes.append(
+                    FieldChange(
+                        source.path,
+                        result.county,
+                        result.case_ref.case_number,
+                        name,
+                        before,
+                        after,
+                    )
+                )
+        result.extracted_fields = new
+
+
+def _save(config: AppConfig, storage: StoragePaths, source: _Source) -> None:
+    from probate.output.excel import write_excel
+
+    if source.from_log:
+        write_results(results_log_path(storage, source.target_date), source.results)
+    write_excel(
+        source.results,
+        source.path,
+        siblings=config.output.report_siblings,
+        per_county_sheets=config.output.per_county_sheets,
+    )
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from probate.models import CaseRef, CaseResult, ExtractedFields
+from probate.storage import StoragePaths
+
+# Report tag for days built by `probate poll`; the untagged report is the
+# nightly run's.
+POLL_REPORT_TAG = "intraday"
+
+
+def results_log_path(storage: StoragePaths, target_date: date) -> Path:
+    return storage.report_dir / f"Daily_Probate_Leads_{target_date.isoformat()}.jsonl"
+
+
+def result_to_dict(result: CaseResult) -> Dict[str, Any]:
+    data = asdict(result)
+    data["case_ref"]["filing_date"] = result.case_ref.filing_date.isoformat()
+    return data
+
+
+def result_from_dict(data: Dict[str, Any]) -> CaseResult:
+    case_ref = dict(data["case_ref"])
+    case_ref["filing_date"] = date.fromisoformat(case_ref["filing_date"])
+    return CaseResult(
+        county=data["county"],
+        case_ref=CaseRef(**case_ref),
+        pdf_paths=list(data.get("pdf_paths", [])),
+        extracted_fields=ExtractedFields(**data["extracted_fields"]),
+        errors=list(data.get("errors", [])),
+    )
+
+
+def append_results(path: Path, results: Iterable[CaseResult]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as handle:
+        for result in results:
+            handle.write(json.dumps(result_to_dict(result)) + "\n")
+
+
+def write_results(path: Path, results: Iterable[CaseResult]) -> None:
+    # Replaces the whole log, e.g. after `probate reparse` updated its fields.
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    append_results(tmp, results)
+    os.replace(tmp, path)
+
+
+def load_results(path: Path) -> List[CaseResult]:
+    # Later lines win, so a case reprocessed during the day replaces its older row.
+    latest: Dict[tuple[str, str], CaseResult] = {}
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            result = result_from_dict(json.loads(line))
+            latest[(result.county, result.case_ref.case_number)] = result
+    return list(latest.values())
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from probate.standin.portal import (
+    PortalMetrics,
+    PortalSettings,
+    SimulatedCase,
+    StandinPortal,
+    simulated_cases,
+    text_pdf_bytes,
+)
+
+__all__ = [
+    "PortalMetrics",
+    "PortalSettings",
+    "SimulatedCase",
+    "StandinPortal",
+    "simulated_cases",
+    "text_pdf_bytes",
+]
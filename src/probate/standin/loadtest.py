@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import yaml
+
+from probate.config import load_config
+from probate.connectors.base import BaseConnector
+from probate.progress import ProgressEvent
+from probate.standin.portal import PortalSettings, StandinPortal
+
+LOAD_TEST_DATE = date(2026, 1, 5)
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    # Nearest-rank percentile; 0.0 for no values.
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class LoadTestReport:
+    counties: int
+    cases_found: int = 0
+    cases_done: int = 0
+    case_errors: int = 0
+    seconds: float = 0.0
+    # Wall time of each finished case, detail fetch through extraction.
+    case_seconds: List[float] = field(default_factory=list)
+    # Each portal request the connectors made, retries included.
+    request_seconds: List[float] = field(default_factory=list)
+    retries: int = 0
+    client_statuses: Dict[int, int] = field(default_factory=dict)
+    portal_statuses: Dict[int, int] = field(default_factory=dict)
+    # Smallest gap between two requests of one county as the portal saw
+    # them; compare with the configured rate_limit_seconds.
+    min_request_gap: float | None = None
+
+    @property
+    def cases_per_second(self) -> float:
+        return self.cases_done / self.seconds if self.seconds else 0.0
+
+    @property
+    def cases_skipped(self) -> int:
+        # Deferred by a breaker or budget, or dropped with a failed index.
+        return self.cases_found - self.cases_done
+
+    def summary_lines(self) -> List[str]:
+        def tail(values: Sequence[float]) -> str:
+            return "  ".join(
+                f"p{pct} {percentile(values, pct) * 1000:7.1f} ms"
+                for pct in (50, 95, 99)
+            )
+
+        gap = "n/a" if self.min_request_gap is None else f"{self.min_request_gap:.3f}s"
+        return [
+            f"{self.counties} counties, {self.cases_done}/{self.cases_found} cases "
+            f"in {self.seconds:.1f}s ({self.cases_per_second:.1f} cases/s), "
+            f"{self.case_errors} with errors, {self.cases_skipped} skipped",
+            f"case     {tail(self.case_seconds)}",
+            f"request  {tail(self.request_seconds)}  "
+            f"({len(self.request_seconds)} sent)",
+            f"retries  {self.retries}  client statuses {self.client_statuses}",
+            f"portal statuses {self.portal_statuses}  min request gap {gap}",
+        ]
+
+
+def load_test_config(
+    workdir: Path,
+    portal: StandinPortal,
+    counties: Sequence[str],
+    concurrency: int = 2,
+    rate_limit_seconds: float = 0.0,
+) -> Path:
+    # A counties.yaml pointing every simulated county at the portal, written
+    # to workdir so the run goes through normal config validation.
+    auth = {"token": portal.settings.token} if portal.settings.token else None
+    data: Dict[str, Any] = {
+        "run": {"rate_limit_seconds": rate_limit_seconds},
+        "output": {
+            "pdf_dir": str(workdir / "pdfs"),
+            "report_dir": str(workdir / "reports"),
+            "logs_dir": str(workdir / "logs"),
+        },
+        "counties": [
+            {
+                "name": name,
+                "enabled": True,
+                "connector": "standin",
+                "portal_url": portal.county_url(name),
+                "auth": auth,
+                "concurrency": concurrency,
+                "text_backends": ["pdfium"],
+            }
+            for name in counties
+        ],
+    }
+    workdir.mkdir(parents=True, exist_ok=True)
+    path = workdir / "counties.yaml"
+    path.write_text(yaml.safe_dump(data, sort_keys=False), encoding="utf-8")
+    return path
+
+
+def run_load_test(
+    workdir: Path,
+    counties: int = 8,
+    settings: PortalSettings | None = None,
+    concurrency: int = 2,
+    rate_limit_seconds: float = 0.0,
+    target_date: date = LOAD_TEST_DATE,
+) -> LoadTestReport:
+    # Starts a stand-in portal, runs run_pipeline over `counties` simulated
+    # counties against it and reports throughput, tail latencies and retries.
+    # Reports are not written; PDFs and logs go under workdir.
+    from probate.pipeline import run_pipeline
+
+    names = [f"sim{number:02d}" for number in range(1, counties + 1)]
+    report = LoadTestReport(counties=counties)
+    started: Dict[Tuple[str | None, str | None], float] = {}
+
+    def progress(event: ProgressEvent) -> None:
+        # The reporter serialises callbacks, so no lock is needed here.
+        key = (event.county, event.case_number)
+        if event.kind == "county_indexed":
+            report.cases_found = event.cases_total
+        elif event.kind == "case_started":
+            started[key] = event.elapsed_seconds
+        elif event.kind == "case_finished" and key in started:
+            report.case_seconds.append(event.elapsed_seconds - started.pop(key))
+
+    with StandinPortal(settings) as portal:
+        config = load_config(
+            load_test_config(workdir, portal, names, concurrency, rate_limit_seconds)
+        )
+        connectors: Dict[str, BaseConnector] = {}
+        began = time.monotonic()
+        results = run_pipeline(
+            config,
+            target_date,
+            progress=progress,
+            connectors=connectors,
+            write_report=False,
+        )
+        report.seconds = time.monotonic() - began
+        metrics = portal.metrics
+
+    report.cases_done = len(results)
+    report.case_errors = sum(1 for result in results if result.errors)
+    statuses: Dict[int, int] = {}
+    for connector in connectors.values():
+        report.retries += getattr(connector, "retries", 0)
+        report.request_seconds.extend(getattr(connector, "latencies", []))
+        for status, count in getattr(connector, "statuses", {}).items():
+            statuses[status] = statuses.get(status, 0) + count
+    report.client_statuses = dict(sorted(statuses.items()))
+    report.portal_statuses = metrics.statuses()
+    gaps = [
+        later - earlier
+        for arrivals in metrics.arrivals.values()
+        for earlier, later in zip(sorted(arrivals), sorted(arrivals)[1:])
+    ]
+    report.min_request_gap = min(gaps) if gaps else None
+    return report
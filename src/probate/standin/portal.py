@@ -0,0 +1,412 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Sequence, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+logger = logging.getLogger("probate.standin")
+
+_FIRST = ("John", "Mary", "Robert", "Linda", "James", "Maria", "David", "Susan")
+_LAST = ("Garcia", "Smith", "Nguyen", "Johnson", "Lopez", "Brown", "Patel", "Moore")
+_STREETS = ("Main St", "Oak Ave", "Elm Dr", "Cedar Ln", "Pecan Blvd", "Mesquite Rd")
+_CITIES = (("Austin", "78701"), ("San Antonio", "78205"), ("Houston", "77002"))
+
+
+@dataclass
+class PortalSettings:
+    # How one simulated county portal behaves. Latency applies to every
+    # request; errors, auth and the rate limit only to the JSON endpoints,
+    # since document links are handed out pre-signed.
+    cases_per_day: int = 20
+    page_size: int = 10
+    documents_per_case: int = 1
+    latency_ms: float = 0.0
+    # Mean of an exponential tail added to latency_ms.
+    jitter_ms: float = 0.0
+    # Share of index/detail requests answered 503, and of documents answered 500.
+    error_rate: float = 0.0
+    document_error_rate: float = 0.0
+    # Token bucket per county; an empty bucket answers 429 with Retry-After.
+    rate_limit_per_second: float | None = None
+    burst: int = 5
+    # Bearer token the JSON endpoints require; None leaves them open.
+    token: str | None = None
+    seed: int = 0
+
+
+@dataclass
+class SimulatedCase:
+    case_number: str
+    filing_date: date
+    deceased_name: str
+    filer_name: str
+    property_address: str
+
+    def document_text(self, number: int) -> List[str]:
+        return [
+            f"Case Number: {self.case_number}",
+            f"Filing Date: {self.filing_date.isoformat()}",
+            f"Deceased: {self.deceased_name}",
+            f"Petitioner: {self.filer_name}",
+            f"Property Address: {self.property_address}",
+            f"Document {number}",
+        ]
+
+
+def simulated_cases(
+    county: str, target_date: date, settings: PortalSettings
+) -> List[SimulatedCase]:
+    # The same county, date and seed always give the same filings.
+    cases = []
+    for number in range(1, settings.cases_per_day + 1):
+        rng = random.Random(f"{settings.seed}:{county}:{target_date}:{number}")
+        city, zip_code = rng.choice(_CITIES)
+        cases.append(
+            SimulatedCase(
+                case_number=(
+                    f"{county.upper()}-{target_date:%Y%m%d}-{number:04d}"
+                ).replace("_", "-"),
+                filing_date=target_date,
+                deceased_name=f"{rng.choice(_FIRST)} {rng.choice(_LAST)}",
+                filer_name=f"{rng.choice(_FIRST)} {rng.choice(_LAST)}",
+                property_address=(
+                    f"{rng.randint(100, 9999)} {rng.choice(_STREETS)}, "
+                    f"{city}, TX {zip_code}"
+                ),
+            )
+        )
+    return cases
+
+
+def text_pdf_bytes(pages: Sequence[Sequence[Tuple[float, float, str]]]) -> bytes:
+    # Minimal PDF with a real text layer (Helvetica, 12pt, US Letter). Each page
+    # is a list of (x, y_from_top, text) in points.
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b""]
+    font = 3
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    kids = []
+    for lines in pages:
+        stream = "".join(
+            f"BT /F1 12 Tf {x} {792 - y} Td ({text}) Tj ET\n" for x, y, text in lines
+        ).encode("latin-1")
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"endstream"
+        )
+        content = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (font, content)
+        )
+        kids.append(len(objects))
+    refs = " ".join(f"{kid} 0 R" for kid in kids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (refs, len(kids))
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        # 0 when a token was taken, else seconds until the next one.
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class PortalMetrics:
+    # What the portal saw: responses by (endpoint, status) and the arrival
+    # time of every JSON request per county, for checking client spacing.
+    def __init__(self) -> None:
+        self.responses: Counter[Tuple[str, int]] = Counter()
+        self.arrivals: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, county: str, endpoint: str, status: int, at: float) -> None:
+        with self._lock:
+            self.responses[(endpoint, status)] += 1
+            if endpoint != "document":
+                self.arrivals.setdefault(county, []).append(at)
+
+    def statuses(self) -> Dict[int, int]:
+        totals: Counter[int] = Counter()
+        with self._lock:
+            for (_endpoint, status), count in self.responses.items():
+                totals[status] += count
+        return dict(sorted(totals.items()))
+
+
+class StandinPortal:
+    # Local HTTP server that answers for any number of simulated counties:
+    #   GET /<county>/cases?date=YYYY-MM-DD&page=N   one page of the index
+    #   GET /<county>/cases/<case number>            the case's document links
+    #   GET /<county>/documents/<case>/<n>.pdf?key=  a generated filing
+    # `overrides` gives individual counties their own settings.
+    def __init__(
+        self,
+        settings: PortalSettings | None = None,
+        overrides: Dict[str, PortalSettings] | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.settings = settings or PortalSettings()
+        self.overrides = dict(overrides or {})
+        self.metrics = PortalMetrics()
+        self._rng = random.Random(self.settings.seed)
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._server = _PortalServer((host, port), _PortalHandler)
+        self._server.portal = self  # type: ignore[attr-defined]
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def county_url(self, county: str) -> str:
+        return f"{self.url}/{quote(county)}"
+
+    def settings_for(self, county: str) -> PortalSettings:
+        return self.overrides.get(county, self.settings)
+
+    def start(self) -> "StandinPortal":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="probate-standin-portal",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StandinPortal":
+        return self.start()
+
+    def __exit__(self, *_exc: object) -> None:
+        self.stop()
+
+    def document_key(self, county: str, case_number: str) -> str:
+        token = self.settings_for(county).token or ""
+        return hashlib.sha256(f"{token}:{county}:{case_number}".encode()).hexdigest()[
+            :16
+        ]
+
+    def roll(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def delay(self, settings: PortalSettings) -> float:
+        seconds = settings.latency_ms / 1000
+        if settings.jitter_ms > 0:
+            with self._lock:
+                seconds += self._rng.expovariate(1000 / settings.jitter_ms)
+        return seconds
+
+    def rate_limited(self, county: str, settings: PortalSettings) -> float:
+        if not settings.rate_limit_per_second:
+            return 0.0
+        with self._lock:
+            bucket = self._buckets.get(county)
+            if bucket is None:
+                bucket = _TokenBucket(settings.rate_limit_per_second, settings.burst)
+                self._buckets[county] = bucket
+            return bucket.take()
+
+
+class _PortalServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _PortalHandler(BaseHTTPRequestHandler):
+    server_version = "probate-standin"
+
+    def do_GET(self) -> None:
+        portal: StandinPortal = self.server.portal  # type: ignore[attr-defined]
+        arrived = time.monotonic()
+        parsed = urlparse(self.path)
+        parts = [unquote(part) for part in parsed.path.strip("/").split("/")]
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        county = parts[0] if parts else ""
+        settings = portal.settings_for(county)
+        endpoint = (
+            "document"
+            if len(parts) > 1 and parts[1] == "documents"
+            else ("index" if len(parts) == 2 else "detail")
+        )
+        time.sleep(portal.delay(settings))
+        status = self._answer(portal, settings, county, endpoint, parts, query)
+        portal.metrics.record(county, endpoint, status, arrived)
+
+    def _answer(
+        self,
+        portal: StandinPortal,
+        settings: PortalSettings,
+        county: str,
+        endpoint: str,
+        parts: List[str],
+        query: Dict[str, str],
+    ) -> int:
+        if endpoint == "document":
+            return self._document(portal, settings, county, parts, query)
+        if settings.token is not None:
+            if self.headers.get("Authorization") != f"Bearer {settings.token}":
+                return self._json(HTTPStatus.UNAUTHORIZED, {"error": "unauthorized"})
+        wait = portal.rate_limited(county, settings)
+        if wait:
+            return self._json(
+                HTTPStatus.TOO_MANY_REQUESTS,
+                {"error": "rate limited"},
+                {"Retry-After": f"{wait:.3f}"},
+            )
+        if portal.roll() < settings.error_rate:
+            return self._json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": "try again"})
+        if len(parts) == 2 and parts[1] == "cases":
+            return self._index(portal, settings, county, query)
+        if len(parts) == 3 and parts[1] == "cases":
+            return self._detail(portal, settings, county, parts[2])
+        return self._json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    def _index(
+        self,
+        portal: StandinPortal,
+        settings: PortalSettings,
+        county: str,
+        query: Dict[str, str],
+    ) -> int:
+        try:
+            target_date = date.fromisoformat(query["date"])
+            page = int(query.get("page", "1"))
+        except (KeyError, ValueError):
+            return self._json(HTTPStatus.BAD_REQUEST, {"error": "date and page"})
+        cases = simulated_cases(county, target_date, settings)
+        size = max(1, settings.page_size)
+        chunk = cases[(page - 1) * size : page * size]
+        return self._json(
+            HTTPStatus.OK,
+            {
+                "cases": [
+                    {
+                        "case_number": case.case_number,
+                        "filing_date": case.filing_date.isoformat(),
+                        "detail_url": (
+                            f"{portal.county_url(county)}/cases/{case.case_number}"
+                        ),
+                    }
+                    for case in chunk
+                ],
+                "next_page": page + 1 if page * size < len(cases) else None,
+            },
+        )
+
+    def _detail(
+        self, portal: StandinPortal, settings: PortalSettings, county: str, number: str
+    ) -> int:
+        key = portal.document_key(county, number)
+        return self._json(
+            HTTPStatus.OK,
+            {
+                "case_number": number,
+                "documents": [
+                    {
+                        "url": (
+                            f"{portal.county_url(county)}/documents/{number}/"
+                            f"{index}.pdf?key={key}"
+                        ),
+                        "label": f"filing_{index}",
+                    }
+                    for index in range(1, settings.documents_per_case + 1)
+                ],
+            },
+        )
+
+    def _document(
+        self,
+        portal: StandinPortal,
+        settings: PortalSettings,
+        county: str,
+        parts: List[str],
+        query: Dict[str, str],
+    ) -> int:
+        if len(parts) != 4 or not parts[3].endswith(".pdf"):
+            return self._json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+        number = parts[2]
+        if query.get("key") != portal.document_key(county, number):
+            return self._json(HTTPStatus.FORBIDDEN, {"error": "bad document key"})
+        if portal.roll() < settings.document_error_rate:
+            return self._json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "failed"})
+        stamp = number.rsplit("-", 2)
+        try:
+            target_date = date(
+                int(stamp[-2][:4]), int(stamp[-2][4:6]), int(stamp[-2][6:])
+            )
+            case = simulated_cases(county, target_date, settings)[int(stamp[-1]) - 1]
+        except (IndexError, ValueError):
+            return self._json(HTTPStatus.NOT_FOUND, {"error": "no such case"})
+        lines = case.document_text(int(parts[3][: -len(".pdf")] or 1))
+        body = text_pdf_bytes(
+            [[(72, 72 + 18 * row, line) for row, line in enumerate(lines)]]
+        )
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return HTTPStatus.OK
+
+    def _json(
+        self,
+        status: HTTPStatus,
+        payload: Dict[str, Any],
+        headers: Dict[str, str] | None = None,
+    ) -> int:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        return int(status)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("standin %s - " + format, self.address_string(), *args)
@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+import os
+import shutil
+import uuid
 from dataclasses import dataclass
 from datetime import date
 from pathlib import Path
+from typing import Callable
+
+from probate.cancel import CancelToken
+from probate.index import ChecksumIndex
+from probate.models import CaseRef, PdfLink
+from probate.pdf.download import checksum_path, download_pdf_hashed, sha256_file
 
 
 @dataclass
@@ -11,6 +20,18 @@ class StoragePaths:
     report_dir: Path
     logs_dir: Path
 
+    @property
+    def blob_dir(self) -> Path:
+        return self.pdf_dir / "blobs"
+
+    @property
+    def index_path(self) -> Path:
+        return self.pdf_dir / "index.sqlite3"
+
+    @property
+    def text_dir(self) -> Path:
+        return self.pdf_dir / "text"
+
 
 def build_paths(base_pdf: str, base_report: str, base_logs: str) -> StoragePaths:
     return StoragePaths(
@@ -25,3 +46,137 @@ def case_pdf_dir(
 ) -> Path:
     safe_case = case_number.replace("/", "_")
     return storage.pdf_dir / county / target_date.isoformat() / safe_case
+
+
+def report_path(
+    storage: StoragePaths,
+    target_date: date,
+    tag: str | None = None,
+    partial: bool = False,
+) -> Path:
+    suffix = f"_{tag}" if tag else ""
+    suffix += "_partial" if partial else ""
+    return storage.report_dir / (
+        f"Daily_Probate_Leads_{target_date.isoformat()}{suffix}.xlsx"
+    )
+
+
+def blob_path(storage: StoragePaths, digest: str) -> Path:
+    # Two levels of two hex characters keep every directory to <= 256 entries.
+    return storage.blob_dir / digest[:2] / digest[2:4] / f"{digest}.pdf"
+
+
+def staging_path(storage: StoragePaths, name: str) -> Path:
+    # Staged downloads live under blob_dir so store_blob is a same-volume rename.
+    staging_dir = storage.blob_dir / "staging"
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    return staging_dir / f"{name}.{os.getpid()}.part"
+
+
+def store_blob(storage: StoragePaths, source: Path, digest: str) -> Path:
+    blob = blob_path(storage, digest)
+    if blob.exists():
+        source.unlink()
+        return blob
+    blob.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(source, blob)
+    return blob
+
+
+def link_case_file(blob: Path, dest: Path) -> Path:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if dest.exists() and os.path.samefile(blob, dest):
+        return dest
+    tmp = dest.with_name(dest.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(blob, tmp)
+    except OSError:
+        # Filesystems without hardlink support get a plain copy instead.
+        shutil.copyfile(blob, tmp)
+    os.replace(tmp, dest)
+    return dest
+
+
+def discard_corrupt(storage: StoragePaths, path: Path, digest: str) -> None:
+    blob = blob_path(storage, digest)
+    if blob.exists() and path.exists() and os.path.samefile(blob, path):
+        blob.unlink()
+    path.unlink(missing_ok=True)
+
+
+def store_case_pdf(
+    storage: StoragePaths,
+    index: ChecksumIndex,
+    link: PdfLink,
+    dest: Path,
+    cancel_token: CancelToken | None = None,
+    timeout: float = 30.0,
+    throttle: Callable[[], None] | None = None,
+    case_ref: CaseRef | None = None,
+) -> bool:
+    # `throttle` is the connector's rate limiter; it only runs when a remote
+    # download actually happens.
+    digest = index.trusted_digest(dest)
+    if digest:
+        if case_ref is not None and index.case_ref(dest) is None:
+            # Entries from before case refs were recorded.
+            index.record(dest, digest, case_ref)
+        return False
+    if dest.exists() and dest.stat().st_size > 0:
+        if adopt_existing(storage, index, dest, case_ref):
+            return False
+    if throttle is not None and not link.url.startswith("file://"):
+        throttle()
+    download_to_store(storage, index, link, dest, cancel_token, timeout, case_ref)
+    # A sidecar that disagreed with the old file is obsolete once it is replaced.
+    checksum_path(dest).unlink(missing_ok=True)
+    return True
+
+
+def adopt_existing(
+    storage: StoragePaths,
+    index: ChecksumIndex,
+    dest: Path,
+    case_ref: CaseRef | None = None,
+) -> bool:
+    # Files from the old per-case layout: move them into the blob store once and
+    # drop their .sha256 sidecar. A file that no longer matches its sidecar
+    # (truncated or corrupt) is not adopted; False tells the caller to download
+    # it again. Files without a sidecar are trusted, as they always were.
+    digest = sha256_file(dest)
+    sidecar = checksum_path(dest)
+    try:
+        expected = sidecar.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        expected = ""
+    if expected and expected != digest:
+        return False
+    blob = blob_path(storage, digest)
+    if not blob.exists():
+        staged = staging_path(storage, digest)
+        shutil.copyfile(dest, staged)
+        store_blob(storage, staged, digest)
+    link_case_file(blob, dest)
+    index.record(dest, digest, case_ref)
+    sidecar.unlink(missing_ok=True)
+    return True
+
+
+def download_to_store(
+    storage: StoragePaths,
+    index: ChecksumIndex,
+    link: PdfLink,
+    dest: Path,
+    cancel_token: CancelToken | None = None,
+    timeout: float = 30.0,
+    case_ref: CaseRef | None = None,
+) -> None:
+    staged = staging_path(storage, uuid.uuid4().hex)
+    try:
+        digest = download_pdf_hashed(link, staged, cancel_token, timeout)
+        blob = store_blob(storage, staged, digest)
+    finally:
+        staged.unlink(missing_ok=True)
+    link_case_file(blob, dest)
+    index.record(dest, digest, case_ref)
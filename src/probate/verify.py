@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from probate.config import AppConfig
+from probate.connectors import get_connector
+from probate.connectors.base import BaseConnector
+from probate.index import ChecksumIndex
+from probate.models import CaseRef
+from probate.pdf.download import sha256_mmap
+from probate.storage import (
+    StoragePaths,
+    build_paths,
+    discard_corrupt,
+    download_to_store,
+)
+
+logger = logging.getLogger("probate.verify")
+
+
+@dataclass
+class VerifyReport:
+    # Blobs and case files; a case file hardlinked to its blob is hashed once
+    # but counted as checked with it.
+    files_checked: int = 0
+    bytes_hashed: int = 0
+    elapsed_seconds: float = 0.0
+    corrupt: List[Path] = field(default_factory=list)
+    truncated: List[Path] = field(default_factory=list)
+    missing: List[Path] = field(default_factory=list)
+    untracked: List[Path] = field(default_factory=list)
+    orphaned_blobs: List[Path] = field(default_factory=list)
+    repaired: List[Path] = field(default_factory=list)
+    repair_failed: List[Path] = field(default_factory=list)
+
+    @property
+    def throughput_mb_s(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.bytes_hashed / self.elapsed_seconds / 1_000_000
+
+    @property
+    def ok(self) -> bool:
+        return not self.needs_refetch()
+
+    def needs_refetch(self) -> List[Path]:
+        return [*self.corrupt, *self.truncated, *self.missing]
+
+
+def verify_storage(
+    config: AppConfig,
+    workers: int | None = None,
+    repair: bool = False,
+    progress: Callable[[int, int, int, float], None] | None = None,
+) -> VerifyReport:
+    storage = build_paths(
+        config.output.pdf_dir, config.output.report_dir, config.output.logs_dir
+    )
+    report = VerifyReport()
+    start = time.monotonic()
+    with ChecksumIndex(storage.index_path, root=storage.pdf_dir) as index:
+        expected = {path: digest for path, digest in index.entries()}
+        case_files, blob_files = _walk_storage(storage)
+
+        # Case files are hardlinks to their blob, so hash each inode once.
+        by_inode: Dict[Tuple[int, int], List[Path]] = {}
+        sizes: Dict[Tuple[int, int], int] = {}
+        for path in [*blob_files, *case_files]:
+            stat = path.stat()
+            key = (stat.st_dev, stat.st_ino)
+            by_inode.setdefault(key, []).append(path)
+            sizes[key] = stat.st_size
+        inodes = list(by_inode)
+
+        actual: Dict[Path, str | None] = {}
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_lower_priority
+        ) as pool:
+            first_paths = [by_inode[key][0] for key in inodes]
+            digests = pool.map(_hash_file, first_paths, chunksize=16)
+            total_files = len(blob_files) + len(case_files)
+            for key, digest in zip(inodes, digests):
+                for path in by_inode[key]:
+                    actual[path] = digest
+                report.files_checked += len(by_inode[key])
+                report.bytes_hashed += sizes[key] if digest else 0
+                if progress:
+                    progress(
+                        report.files_checked,
+                        total_files,
+                        report.bytes_hashed,
+                        time.monotonic() - start,
+                    )
+
+        referenced = set(expected.values())
+        for blob in blob_files:
+            digest = blob.stem
+            if actual.get(blob) != digest:
+                report.corrupt.append(blob)
+            elif digest not in referenced:
+                report.orphaned_blobs.append(blob)
+        for path in case_files:
+            if path not in expected:
+                report.untracked.append(path)
+                continue
+            if actual.get(path) == expected[path]:
+                continue
+            if path.stat().st_size == 0 or actual.get(path) is None:
+                report.truncated.append(path)
+            else:
+                report.corrupt.append(path)
+        on_disk = set(case_files)
+        report.missing.extend(path for path in expected if path not in on_disk)
+
+        if repair:
+            _repair(config, storage, index, report, expected)
+    report.elapsed_seconds = time.monotonic() - start
+    return report
+
+
+def print_progress(done: int, total: int, bytes_hashed: int, elapsed: float) -> None:
+    if done != total and done % 100:
+        return
+    rate = bytes_hashed / elapsed / 1_000_000 if elapsed > 0 else 0.0
+    print(
+        f"\rverified {done}/{total} files, {bytes_hashed / 1_000_000:.1f} MB, "
+        f"{rate:.1f} MB/s",
+        end="\n" if done == total else "",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def _repair(
+    config: AppConfig,
+    storage: StoragePaths,
+    index: ChecksumIndex,
+    report: VerifyReport,
+    expected: Dict[Path, str],
+) -> None:
+    counties = {county.name: county for county in config.counties}
+    connectors: Dict[str, BaseConnector] = {}
+    # Drop corrupt blobs before refetching, so a fresh blob is never unlinked.
+    for path in sorted(report.needs_refetch(), key=lambda item: item in expected):
+        if path not in expected:
+            # Corrupt blobs are dropped; the case files pointing at them are
+            # refetched through their own entries.
+            path.unlink(missing_ok=True)
+            report.repaired.append(path)
+            continue
+        try:
+            county_name, run_date, case_number = path.relative_to(
+                storage.pdf_dir
+            ).parts[:3]
+            county = counties[county_name]
+            connector = connectors.get(county_name)
+            if connector is None:
+                connector = get_connector(county.connector, county)
+                connectors[county_name] = connector
+            case_ref = index.case_ref(path)
+            if case_ref is None:
+                # Recorded before the index kept case refs: rebuild what the
+                # path holds. Connectors that need detail_url can't repair these.
+                case_ref = CaseRef(
+                    case_number=case_number,
+                    filing_date=date.fromisoformat(run_date),
+                    detail_url="",
+                )
+            details = connector.fetch_case_details(case_ref)
+            link = next(
+                link for link in details.pdf_links if f"{link.label}.pdf" == path.name
+            )
+            discard_corrupt(storage, path, expected[path])
+            if not link.url.startswith("file://"):
+                connector.throttle()
+            download_to_store(storage, index, link, path, case_ref=case_ref)
+            report.repaired.append(path)
+        except Exception as exc:
+            logger.warning("Could not repair %s: %s", path, exc)
+            report.repair_failed.append(path)
+
+
+def _walk_storage(storage: StoragePaths) -> Tuple[List[Path], List[Path]]:
+    case_files: List[Path] = []
+    blob_files: List[Path] = []
+    staging_dir = storage.blob_dir / "staging"
+    for dirpath, dirnames, filenames in os.walk(storage.pdf_dir):
+        current = Path(dirpath)
+        if current == staging_dir:
+            dirnames[:] = []
+            continue
+        in_blobs = current == storage.blob_dir or storage.blob_dir in current.parents
+        for name in filenames:
+            if not name.endswith(".pdf"):
+                continue
+            (blob_files if in_blobs else case_files).append(current / name)
+    return case_files, blob_files
+
+
+def _hash_file(path: Path) -> str | None:
+    try:
+        return sha256_mmap(path)
+    except (OSError, ValueError):
+        return None
+
+
+def _lower_priority() -> None:
+    # Verification shares the machine with the nightly run; yield the CPU to it.
+    if hasattr(os, "nice"):
+        try:
+            os.nice(10)
+        except OSError:
+            pass
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from multiprocessing.connection import Connection, wait
+from typing import TYPE_CHECKING, Any, Callable, Iterator, List, Tuple
+
+from probate.cancel import CancelToken, Cancelled
+
+if TYPE_CHECKING:
+    from probate.config import CountyConfig
+
+logger = logging.getLogger("probate.watchdog")
+
+# How often a thread waiting on a worker process looks at its cancel token.
+POLL_SECONDS = 0.2
+
+
+class StageTimeout(Cancelled):
+    # Ends one case, not the run; process_case records it as a case error.
+    # It is a Cancelled so the broad `except Exception` fallbacks in
+    # extraction and OCR let it through.
+    pass
+
+
+class WorkerDied(RuntimeError):
+    pass
+
+
+class CaseToken(CancelToken):
+    # A case's view of the run's cancel token that also trips at the case's
+    # current deadline. Checkpoints in downloads and extraction see both; a
+    # cancelled run still raises plain Cancelled.
+    def __init__(self, parent: CancelToken | None = None) -> None:
+        super().__init__()
+        self.parent = parent
+        self.deadline: float | None = None
+        self.reason = ""
+
+    def arm(self, deadline: float | None, reason: str) -> None:
+        self.deadline = deadline
+        self.reason = reason
+
+    def now(self) -> float:
+        # The clock deadlines are set on: monotonic time that stands still
+        # while the run is paused, so a pause doesn't use up a case's time.
+        paused = self.parent.paused_seconds() if self.parent is not None else 0.0
+        return time.monotonic() - paused
+
+    def remaining(self) -> float | None:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - self.now())
+
+    @property
+    def cancelled(self) -> bool:
+        if self.parent is not None and self.parent.cancelled:
+            return True
+        return self.remaining() == 0.0
+
+    @property
+    def paused(self) -> bool:
+        return self.parent is not None and self.parent.paused
+
+    def checkpoint(self) -> None:
+        if self.parent is not None:
+            self.parent.checkpoint()
+        if self.remaining() == 0.0:
+            raise StageTimeout(self.reason)
+
+    def sleep(self, seconds: float) -> None:
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        if self.parent is not None:
+            self.parent.sleep(seconds)
+        else:
+            time.sleep(seconds)
+        self.checkpoint()
+
+
+class CaseWatch:
+    # Deadlines for one case: case_timeout_seconds from the start of the case
+    # and, per stage, its stage_timeouts entry, whichever comes first.
+    # Work inside a stage is stopped at the deadline through `token`
+    # checkpoints, or by killing its worker process (see call_isolated). A
+    # stage with no checkpoints (parse) still fails when it ends past its
+    # deadline.
+    def __init__(
+        self, county: CountyConfig, cancel_token: CancelToken | None = None
+    ) -> None:
+        self.county = county
+        self.token = CaseToken(cancel_token)
+        self.case_deadline: float | None = None
+        self._case_reason = ""
+        if county.case_timeout_seconds is not None:
+            self.case_deadline = self.token.now() + county.case_timeout_seconds
+            self._case_reason = f"case timed out after {county.case_timeout_seconds:g}s"
+        self.token.arm(self.case_deadline, self._case_reason)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        deadline, reason = self.case_deadline, f"{self._case_reason} in {name}"
+        limit = self.county.stage_timeouts.get(name)
+        if limit is not None:
+            stage_deadline = self.token.now() + limit
+            if deadline is None or stage_deadline < deadline:
+                deadline, reason = stage_deadline, f"{name} timed out after {limit:g}s"
+        self.token.arm(deadline, reason)
+        try:
+            self.token.checkpoint()
+            yield
+            self.token.checkpoint()
+        finally:
+            self.token.arm(self.case_deadline, self._case_reason)
+
+    def call_isolated(self, func: Callable[..., Any], *args: Any) -> Any:
+        return isolated_pool().call(func, args, self.token)
+
+
+class _Worker:
+    def __init__(self, context: Any) -> None:
+        self.conn, child = context.Pipe()
+        self.process = context.Process(
+            target=_serve, args=(child,), name="probate-isolated", daemon=True
+        )
+        self.process.start()
+        child.close()
+
+    def died(self) -> WorkerDied:
+        self.process.join(1)
+        return WorkerDied(f"worker process exited with code {self.process.exitcode}")
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(5)
+        self.conn.close()
+
+
+class IsolatedPool:
+    # Long-lived worker processes that run one call at a time. They are
+    # spawned, so they never inherit the pipeline's threads or held locks. A
+    # worker whose call times out, is cancelled or crashes is killed and a
+    # fresh one started for the next call. Healthy workers are reused, so
+    # importing pdfplumber and friends is paid once per worker, not per case.
+    def __init__(self) -> None:
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: List[_Worker] = []
+        self._lock = threading.Lock()
+
+    def call(
+        self,
+        func: Callable[..., Any],
+        args: Tuple[Any, ...] = (),
+        token: CaseToken | None = None,
+    ) -> Any:
+        # func and args must pickle: module-level functions and plain data.
+        with self._lock:
+            worker = self._idle.pop() if self._idle else None
+        if worker is None:
+            worker = _Worker(self._context)
+        healthy = False
+        try:
+            worker.conn.send((func, args))
+            self._wait(worker, token)
+            try:
+                ok, value = worker.conn.recv()
+            except EOFError:
+                raise worker.died() from None
+            healthy = True
+        finally:
+            if healthy:
+                with self._lock:
+                    self._idle.append(worker)
+            else:
+                logger.warning("Stopping worker process %s", worker.process.pid)
+                worker.kill()
+        if not ok:
+            raise value
+        return value
+
+    def _wait(self, worker: _Worker, token: CaseToken | None) -> None:
+        while True:
+            timeout = POLL_SECONDS
+            remaining = token.remaining() if token is not None else None
+            if remaining is not None:
+                timeout = min(timeout, remaining)
+            ready = wait([worker.conn, worker.process.sentinel], timeout)
+            if worker.conn in ready:
+                return
+            if ready:
+                raise worker.died()
+            if token is not None:
+                token.checkpoint()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
+
+
+@lru_cache(maxsize=1)
+def isolated_pool() -> IsolatedPool:
+    # One per process, shared by runs (and by `probate serve`).
+    return IsolatedPool()
+
+
+def _serve(conn: Connection) -> None:
+    # Worker process loop. Ctrl-C reaches the whole process group; the parent
+    # decides what happens to the call in flight.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            func, args = conn.recv()
+        except EOFError:
+            return
+        try:
+            reply: Tuple[bool, Any] = (True, func(*args))
+        except Exception as exc:
+            reply = (False, exc)
+        try:
+            conn.send(reply)
+        except Exception as exc:
+            # The result or exception would not pickle.
+            conn.send((False, RuntimeError(f"{type(exc).__name__}: {exc}")))
@@ -2,7 +2,58 @@ from __future__ import annotations
 
 import os
 
+import pytest
+import yaml
+
+from probate.standin import text_pdf_bytes
 
 os.environ.setdefault("COUNTY_USER", "test-user")
 os.environ.setdefault("COUNTY_PASS", "test-pass")
 os.environ.setdefault("COUNTY_API_KEY", "test-token")
+
+
+def write_text_pdf(path, pages):
+    # Each page is a list of (x, y_from_top, text) in points.
+    path.write_bytes(text_pdf_bytes(pages))
+    return path
+
+
+@pytest.fixture
+def text_pdf(tmp_path):
+    def make(name, pages):
+        return write_text_pdf(tmp_path / name, pages)
+
+    return make
+
+
+@pytest.fixture
+def write_config(tmp_path):
+    # Writes tmp_path/counties.yaml with output dirs under tmp_path. Each
+    # county dict is merged over an enabled demo_county county; with no
+    # counties, that county alone is configured.
+    def make(*counties, run=None, output=None):
+        data = {
+            "output": {
+                "pdf_dir": (tmp_path / "pdfs").as_posix(),
+                "report_dir": (tmp_path / "reports").as_posix(),
+                "logs_dir": (tmp_path / "logs").as_posix(),
+                **(output or {}),
+            },
+            "counties": [
+                {
+                    "name": "DemoCounty",
+                    "enabled": True,
+                    "connector": "demo_county",
+                    "portal_url": "https://example.com/probate",
+                    **county,
+                }
+                for county in counties or [{}]
+            ],
+        }
+        if run:
+            data["run"] = run
+        path = tmp_path / "counties.yaml"
+        path.write_text(yaml.safe_dump(data, sort_keys=False), encoding="utf-8")
+        return path
+
+    return make
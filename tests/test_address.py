@@ -0,0 +1,138 @@
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+import probate.address.geocode
+from probate.address import GeocodeCache, lookup, normalize_address
+from probate.address.offline import Backend as OfflineGeocoder
+from probate.config import ConfigError, load_config
+from probate.output.excel import read_excel
+from probate.pipeline import run_pipeline
+
+
+def test_normalize_address_uses_usps_abbreviations():
+    address = normalize_address(
+        "400 North Congress Avenue, Suite #200, Austin, Texas 78701-1234"
+    )
+    assert address.key == "400 N CONGRESS AVE STE 200, AUSTIN, TX 78701"
+    assert (address.number, address.predirection, address.street) == (
+        "400",
+        "N",
+        "CONGRESS",
+    )
+    assert address.zip4 == "1234"
+    assert address.zip_valid
+
+    # Spellings of the same place share one key, and keys are stable.
+    for raw in (
+        "400 N. Congress Ave. Ste 200, Austin, TX 78701",
+        "400 n congress avenue suite 200 austin tx 78701",
+    ):
+        assert normalize_address(raw).key == address.key
+    assert normalize_address(address.key).key == address.key
+
+
+def test_normalize_address_checks_zip_against_state():
+    assert normalize_address("12 W Elm St NE, Houston, TX 12345").problems == [
+        "ZIP 12345 is not in TX"
+    ]
+    assert normalize_address("9 Pine Rd, Austin TX").problems == ["no ZIP"]
+    assert not normalize_address("9 Pine Rd, Austin TX").zip_valid
+    assert normalize_address("see attached") is None
+    assert normalize_address("") is None
+
+
+def test_lookup_resolves_each_address_once(tmp_path: Path):
+    geocoder = OfflineGeocoder()
+    geocoder.max_batch = 2
+    addresses = [
+        normalize_address(raw)
+        for raw in (
+            "1 Elm St, Austin, TX 78701",
+            "1 Elm Street, Austin, Texas 78701",
+            "2 Oak Ave, Dallas, TX 75001",
+            "3 Pine Rd, Houston, TX 77002",
+        )
+    ]
+    with GeocodeCache(tmp_path / "geocode.sqlite3") as cache:
+        points = lookup(addresses, geocoder, cache)
+    assert len(points) == 3
+    assert [len(batch) for batch in geocoder.calls] == [2, 1]
+
+    with GeocodeCache(tmp_path / "geocode.sqlite3") as cache:
+        again = lookup(addresses, geocoder, cache)
+    assert again == points
+    assert len(geocoder.calls) == 2
+
+
+def test_unmatched_addresses_are_cached_and_failures_are_not(tmp_path: Path):
+    points_file = tmp_path / "points.json"
+    points_file.write_text('{"1 ELM ST, AUSTIN, TX 78701": [30.27, -97.74]}')
+    geocoder = OfflineGeocoder(str(points_file))
+    known = normalize_address("1 Elm St, Austin, TX 78701")
+    unknown = normalize_address("2 Oak Ave, Dallas, TX 75001")
+    with GeocodeCache(tmp_path / "geocode.sqlite3") as cache:
+        points = lookup([known, unknown], geocoder, cache)
+        assert points[known.key].latitude == 30.27
+        assert points[unknown.key] is None
+        lookup([known, unknown], geocoder, cache)
+        assert len(geocoder.calls) == 1
+
+        def broken(_addresses):
+            raise ConnectionError("geocoder down")
+
+        geocoder.geocode_batch = broken
+        fresh = normalize_address("3 Pine Rd, Houston, TX 77002")
+        assert fresh.key not in lookup([fresh], geocoder, cache)
+        assert cache.get_many("offline", [fresh.key]) == {}
+
+
+def _geocoding(tmp_path: Path, geocoder: str) -> dict:
+    return {
+        "geocoder": geocoder,
+        "geocode_cache": (tmp_path / "geocode.sqlite3").as_posix(),
+    }
+
+
+def test_pipeline_reports_normalized_and_geocoded_addresses(
+    tmp_path: Path, monkeypatch, write_config
+):
+    geocoder = OfflineGeocoder()
+    monkeypatch.setattr(probate.address.geocode, "get_geocoder", lambda url: geocoder)
+    config = load_config(write_config(run=_geocoding(tmp_path, "offline")))
+    run_date = date(2026, 1, 15)
+
+    [result] = run_pipeline(config, run_date)
+    fields = result.extracted_fields
+    assert fields.normalized_address == "123 MAIN ST, AUSTIN, TX 78701"
+    assert fields.latitude is not None and fields.longitude is not None
+
+    report = tmp_path / "reports" / "Daily_Probate_Leads_2026-01-15.xlsx"
+    [row] = read_excel(report)
+    assert row.extracted_fields == fields
+
+    run_pipeline(config, run_date)
+    assert len(geocoder.calls) == 1
+
+
+def test_geocoder_failure_costs_only_the_coordinates(
+    tmp_path: Path, monkeypatch, write_config
+):
+    def missing(url):
+        raise ImportError("No module named 'geocoder_sdk'")
+
+    monkeypatch.setattr(probate.address.geocode, "get_geocoder", missing)
+    config = load_config(write_config(run=_geocoding(tmp_path, "offline")))
+
+    [result] = run_pipeline(config, date(2026, 1, 15))
+    assert result.extracted_fields.normalized_address is not None
+    assert result.extracted_fields.latitude is None
+    report = tmp_path / "reports" / "Daily_Probate_Leads_2026-01-15.xlsx"
+    assert read_excel(report) == [result]
+
+
+def test_unknown_geocoder_is_rejected(tmp_path: Path, write_config):
+    with pytest.raises(ConfigError) as excinfo:
+        load_config(write_config(run=_geocoding(tmp_path, "mapquest://key")))
+    assert "run.geocoder: no geocoder named 'mapquest'" in excinfo.value.problems
@@ -0,0 +1,131 @@
+from pathlib import Path
+
+import pytest
+
+from probate.config import ConfigError, load_config
+from probate.pdf.backends import PdfiumBackend, PlumberBackend, benchmark
+from probate.pdf.extract_text import extract_text
+from probate.pdf.parse_fields import parse_fields
+
+FILING = [
+    (72, 72, "Case Number: PR-2026-0042"),
+    (72, 100, "Filing Date: 2026-01-15"),
+    (72, 130, "Deceased: Ann Lee"),
+    (72, 160, "Petitioner: Bo Ray"),
+    (72, 190, "Property Address: 1 Elm St, Austin TX"),
+]
+
+
+def _count_calls(monkeypatch, backend) -> list:
+    calls = []
+    original = backend.page_texts
+
+    def page_texts(self, pdf_path, *args, **kwargs):
+        calls.append(pdf_path)
+        return original(self, pdf_path, *args, **kwargs)
+
+    monkeypatch.setattr(backend, "page_texts", page_texts)
+    return calls
+
+
+def test_fast_backend_skips_layout_pass_when_fields_parse(text_pdf, monkeypatch):
+    pdf = text_pdf("filing.pdf", [FILING])
+    plumber_calls = _count_calls(monkeypatch, PlumberBackend)
+    text, used_ocr = extract_text(pdf, ocr="never")
+    assert not used_ocr
+    assert plumber_calls == []
+    fields = parse_fields(text)
+    assert fields.case_number == "PR-2026-0042"
+    assert fields.property_address == "1 Elm St, Austin TX"
+
+
+def test_layout_backend_runs_when_fast_text_misses_fields(text_pdf, monkeypatch):
+    pdf = text_pdf("filing.pdf", [FILING])
+    # Stand-in for a text layer drawn out of order: the fast read loses labels.
+    monkeypatch.setattr(
+        PdfiumBackend, "page_texts", lambda self, *a, **k: iter(["Ann Lee Bo Ray"])
+    )
+    plumber_calls = _count_calls(monkeypatch, PlumberBackend)
+    text, _ = extract_text(pdf, ocr="never")
+    assert plumber_calls == [pdf]
+    assert parse_fields(text).filer_name == "Bo Ray"
+
+
+def test_missing_field_without_a_label_keeps_the_fast_text(text_pdf, monkeypatch):
+    # No petitioner on this filing: nothing for the layout pass to recover.
+    pdf = text_pdf(
+        "filing.pdf", [[line for line in FILING if "Petitioner" not in line[2]]]
+    )
+    plumber_calls = _count_calls(monkeypatch, PlumberBackend)
+    text, _ = extract_text(pdf, ocr="never")
+    assert plumber_calls == []
+    assert parse_fields(text).filer_name is None
+
+
+def test_label_without_a_parsed_value_runs_the_layout_backend(text_pdf, monkeypatch):
+    pdf = text_pdf("filing.pdf", [FILING])
+    # The fast read put the date somewhere other than after its label.
+    monkeypatch.setattr(
+        PdfiumBackend,
+        "page_texts",
+        lambda self, *a, **k: iter(["Case Number: PR-2026-0042\nFiling Date:\n"]),
+    )
+    plumber_calls = _count_calls(monkeypatch, PlumberBackend)
+    text, _ = extract_text(pdf, ocr="never")
+    assert plumber_calls == [pdf]
+    assert parse_fields(text).filing_date == "2026-01-15"
+
+
+def test_failing_backend_falls_through_to_the_next(text_pdf, monkeypatch):
+    pdf = text_pdf("filing.pdf", [FILING])
+
+    def broken(self, *args, **kwargs):
+        raise RuntimeError("bad xref")
+
+    monkeypatch.setattr(PdfiumBackend, "page_texts", broken)
+    text, _ = extract_text(pdf, ocr="never")
+    assert parse_fields(text).deceased_name == "Ann Lee"
+
+
+def test_backends_respect_page_limit(text_pdf):
+    pdf = text_pdf("long.pdf", [[(72, 72, f"page {n}")] for n in range(1, 6)])
+    for backend in (PdfiumBackend(), PlumberBackend()):
+        texts = list(backend.page_texts(pdf, max_pages=2))
+        assert [text.strip() for text in texts] == ["page 1", "page 2"]
+
+
+def test_benchmark_reports_speed_and_recall(text_pdf, tmp_path: Path):
+    pdfs = [
+        text_pdf("filing.pdf", [FILING]),
+        text_pdf("notice.pdf", [[(72, 72, "Notice to creditors")]]),
+    ]
+    rows = {row.name: row for row in benchmark(pdfs)}
+    assert set(rows) == {"pdfium", "pdfplumber", "pdfium>pdfplumber"}
+    for row in rows.values():
+        assert row.documents == 2
+        assert row.fields_found == 5
+        assert row.recall == 0.5
+        assert row.per_field["case_number"] == 1
+
+
+def test_unknown_text_backend_is_rejected(tmp_path: Path):
+    config_path = tmp_path / "counties.yaml"
+    config_path.write_text(
+        "\n".join(
+            [
+                "counties:",
+                '  - name: "DemoCounty"',
+                '    connector: "demo_county"',
+                '    portal_url: "https://example.com/probate"',
+                "    enabled: true",
+                "    text_backends: [pdfium, pdfminer]",
+            ]
+        ),
+        encoding="utf-8",
+    )
+    with pytest.raises(ConfigError) as excinfo:
+        load_config(config_path)
+    assert (
+        "counties[DemoCounty].text_backends: expected one of pdfium, pypdf, "
+        "pdfplumber, got 'pdfminer'"
+    ) in excinfo.value.problems
@@ -0,0 +1,71 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from probate.cancel import CancelToken, Cancelled
+from probate.index import ChecksumIndex
+from probate.models import PdfLink
+from probate.storage import build_paths, download_to_store
+
+
+def test_checkpoint_blocks_while_paused_and_raises_after_cancel():
+    token = CancelToken()
+    token.pause()
+    passed = threading.Event()
+
+    def worker():
+        token.checkpoint()
+        passed.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    time.sleep(0.05)
+    assert not passed.is_set()
+    token.resume()
+    thread.join(timeout=1)
+    assert passed.is_set()
+
+    token.cancel("stop requested")
+    with pytest.raises(Cancelled, match="stop requested"):
+        token.checkpoint()
+
+
+def test_cancel_wakes_paused_checkpoint():
+    token = CancelToken()
+    token.pause()
+    outcome = []
+
+    def worker():
+        try:
+            token.checkpoint()
+        except Cancelled:
+            outcome.append("cancelled")
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    token.cancel()
+    thread.join(timeout=1)
+    assert outcome == ["cancelled"]
+
+
+def test_cancelled_download_leaves_no_partial_files(tmp_path: Path):
+    source = tmp_path / "source.pdf"
+    source.write_bytes(b"%PDF" * 1024)
+    storage = build_paths(
+        str(tmp_path / "pdfs"), str(tmp_path / "reports"), str(tmp_path / "logs")
+    )
+    dest = storage.pdf_dir / "County" / "2026-01-15" / "CASE-1" / "doc.pdf"
+    token = CancelToken()
+    token.cancel()
+
+    with ChecksumIndex(storage.index_path, root=storage.pdf_dir) as index:
+        with pytest.raises(Cancelled):
+            download_to_store(
+                storage, index, PdfLink(url=source.as_uri(), label="doc"), dest, token
+            )
+        assert index.lookup(dest) is None
+
+    assert not dest.exists()
+    assert not list((storage.blob_dir / "staging").iterdir())
@@ -0,0 +1,142 @@
+import os
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+import probate.config
+from probate.cli import main
+from probate.config import ConfigError, ConfigWatcher, load_config
+from probate.pipeline import run_pipeline
+
+
+def _write(path: Path, lines: list[str]) -> Path:
+    path.write_text("\n".join(lines), encoding="utf-8")
+    return path
+
+
+def _county(name: str = "DemoCounty", connector: str = "demo_county") -> list[str]:
+    return [
+        f'  - name: "{name}"',
+        "    enabled: true",
+        f'    connector: "{connector}"',
+        '    portal_url: "https://example.com/probate"',
+    ]
+
+
+def test_schema_errors_are_reported_together(tmp_path: Path):
+    config_path = _write(
+        tmp_path / "counties.yaml",
+        [
+            "run:",
+            "  rate_limit_secs: 2",
+            '  run_at: "9pm"',
+            "output:",
+            "  report_siblings: [csv, xls]",
+            "counties:",
+            *_county(connector="no_such_connector"),
+            "    concurrency: many",
+        ],
+    )
+    with pytest.raises(ConfigError) as excinfo:
+        load_config(config_path)
+    problems = excinfo.value.problems
+    assert "run.rate_limit_secs: unknown key (did you mean 'rate_limit_seconds'?)" in (
+        problems
+    )
+    assert any(
+        p.startswith("counties[DemoCounty].concurrency: expected int") for p in problems
+    )
+    assert "output.report_siblings: expected csv or parquet, got 'xls'" in problems
+
+
+def test_yaml_syntax_errors_are_config_errors(tmp_path: Path, capsys):
+    config_path = _write(tmp_path / "counties.yaml", ["counties:", *_county(), "  - ["])
+    with pytest.raises(SystemExit) as excinfo:
+        main(["--config", str(config_path), "--date", "2026-01-15"])
+    assert excinfo.value.code == 2
+    error = capsys.readouterr().err
+    assert error.startswith(f"Invalid config {config_path}:")
+    assert "YAML syntax: " in error and "line 6" in error
+
+
+def test_county_knobs_inherit_run_defaults(tmp_path: Path):
+    config_path = _write(
+        tmp_path / "counties.yaml",
+        [
+            "run:",
+            "  rate_limit_seconds: 2.5",
+            "counties:",
+            *_county(),
+            "    ocr: never",
+        ],
+    )
+    county = load_config(config_path).counties[0]
+    assert county.rate_limit_seconds == 2.5
+    assert county.ocr == "never"
+    assert county.concurrency == 1
+
+
+def test_cache_returns_private_copies_and_sees_edits(tmp_path: Path):
+    config_path = _write(tmp_path / "counties.yaml", ["counties:", *_county()])
+    first = load_config(config_path)
+    first.counties[0].enabled = False
+    assert load_config(config_path).counties[0].enabled is True
+
+    _write(config_path, ["counties:", *_county("Renamed")])
+    os.utime(config_path, ns=(0, 10**9))
+    assert load_config(config_path).counties[0].name == "Renamed"
+
+
+def test_watcher_keeps_last_good_config(tmp_path: Path):
+    config_path = _write(tmp_path / "counties.yaml", ["counties:", *_county()])
+    watcher = ConfigWatcher(config_path)
+
+    _write(config_path, ["counties:", *_county(), "    ocr: sometimes"])
+    os.utime(config_path, ns=(0, 10**9))
+    assert not watcher.poll()
+    assert watcher.config.counties[0].ocr == "auto"
+
+    _write(config_path, ["counties:", *_county(), "    concurrency: 4"])
+    os.utime(config_path, ns=(0, 2 * 10**9))
+    assert watcher.poll()
+    assert watcher.config.counties[0].concurrency == 4
+
+
+def test_watcher_survives_a_file_vanishing_mid_reload(tmp_path: Path, monkeypatch):
+    config_path = _write(tmp_path / "counties.yaml", ["counties:", *_county()])
+    watcher = ConfigWatcher(config_path)
+    os.utime(config_path, ns=(0, 10**9))
+
+    def vanished(path):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(probate.config, "load_config", vanished)
+    assert not watcher.poll()
+    assert watcher.config.counties[0].name == "DemoCounty"
+
+    monkeypatch.undo()
+    assert watcher.poll()
+
+
+def test_concurrent_cases_keep_plan_order(tmp_path: Path):
+    config_path = _write(
+        tmp_path / "counties.yaml",
+        [
+            "run:",
+            "  prioritize: false",
+            "output:",
+            f'  pdf_dir: "{(tmp_path / "pdfs").as_posix()}"',
+            f'  report_dir: "{(tmp_path / "reports").as_posix()}"',
+            f'  logs_dir: "{(tmp_path / "logs").as_posix()}"',
+            "counties:",
+            *_county("DemoCounty2", "democounty2"),
+            "    concurrency: 4",
+        ],
+    )
+    results = run_pipeline(
+        load_config(config_path), date(2026, 1, 15), write_report=False
+    )
+    numbers = [result.case_ref.case_number for result in results]
+    assert numbers == [f"DEMO2-2026-{i:04d}" for i in range(1, 11)]
+    assert all(not result.errors for result in results)
@@ -0,0 +1,75 @@
+import json
+import threading
+from datetime import date, datetime
+from http.client import HTTPConnection
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from probate.daemon import ProbateDaemon, _next_occurrence, make_server
+
+
+def _request(port: int, method: str, path: str, body: dict | None = None):
+    connection = HTTPConnection("127.0.0.1", port, timeout=5)
+    connection.request(method, path, body=json.dumps(body) if body else None)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_next_occurrence_rolls_to_tomorrow():
+    tz = ZoneInfo("America/Chicago")
+    before = datetime(2026, 1, 15, 20, 0, tzinfo=tz)
+    after = datetime(2026, 1, 15, 21, 0, tzinfo=tz)
+    assert _next_occurrence("21:00", before) == datetime(2026, 1, 15, 21, 0, tzinfo=tz)
+    assert _next_occurrence("21:00", after) == datetime(2026, 1, 16, 21, 0, tzinfo=tz)
+
+
+def test_api_queues_runs_and_reports_status(write_config):
+    # The runner thread is not started, so triggered runs stay queued.
+    app = ProbateDaemon(str(write_config(run={"run_at": "21:00"})))
+    server = make_server(app, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_address[1]
+    try:
+        status, payload = _request(
+            port, "POST", "/runs", {"county": "DemoCounty", "date": "2026-01-15"}
+        )
+        assert status == 202
+        run = payload["runs"][0]
+        assert run["state"] == "queued"
+        assert run["target_date"] == "2026-01-15"
+
+        status, payload = _request(port, "GET", f"/runs/{run['run_id']}")
+        assert status == 200 and payload["county"] == "DemoCounty"
+
+        status, payload = _request(port, "POST", "/runs", {"county": "Nowhere"})
+        assert status == 404
+
+        status, payload = _request(port, "GET", "/status")
+        assert status == 200 and payload["queued"] == 1
+
+        status, payload = _request(port, "GET", "/reports/2026-01-15")
+        assert status == 200 and payload["reports"] == []
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_poll_run_records_the_report_it_wrote(write_config):
+    app = ProbateDaemon(str(write_config()))
+
+    def poll():
+        [record] = app.trigger("DemoCounty", date(2026, 1, 15), kind="poll")
+        app._execute(app._runs.get())
+        assert record.state == "done"
+        return record
+
+    first = poll()
+    assert first.cases == 1
+    assert first.report_path.endswith("_intraday.xlsx")
+    assert Path(first.report_path).exists()
+
+    # Nothing new on the second poll, so there is no report to point at.
+    second = poll()
+    assert second.cases == 0
+    assert second.report_path is None
@@ -0,0 +1,141 @@
+import threading
+from datetime import date
+from pathlib import Path
+from typing import List
+
+import pytest
+
+import probate.pdf.extract_text
+import probate.pipeline
+from probate.cancel import CancelToken
+from probate.config import load_config
+from probate.connectors.base import BaseConnector
+from probate.corpus import SingleFlight
+from probate.models import CaseDetails, CaseRef, PdfLink
+from probate.pipeline import run_pipeline
+
+FIXTURE = Path(probate.pipeline.__file__).parent / "fixtures" / "demo_case.pdf"
+
+
+class SameFormPortal(BaseConnector):
+    # Every case attaches the same standard form.
+    def fetch_case_index(self, target_date: date) -> List[CaseRef]:
+        return [
+            CaseRef(f"PR-{n}", target_date, f"https://example.com/PR-{n}")
+            for n in range(1, 7)
+        ]
+
+    def fetch_case_details(self, case_ref: CaseRef) -> CaseDetails:
+        return CaseDetails(case_ref, [PdfLink(FIXTURE.as_uri(), "form")])
+
+
+FORMS = {
+    "name": "Forms",
+    "concurrency": 3,
+    "isolate_extraction": False,
+}
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    calls = []
+    real = probate.pipeline.extract_document
+
+    def counting(request, *args, **kwargs):
+        calls.append(request.pdf_path)
+        return real(request, *args, **kwargs)
+
+    monkeypatch.setattr(probate.pipeline, "extract_document", counting)
+    return calls
+
+
+def _run(config, day: int):
+    portal = SameFormPortal(config.counties[0])
+    return run_pipeline(
+        config, date(2026, 1, day), connectors={"Forms": portal}, write_report=False
+    )
+
+
+def test_identical_pdfs_are_extracted_once_per_settings(write_config, extractions):
+    config = load_config(write_config(FORMS))
+    results = _run(config, 15)
+
+    assert len(extractions) == 1
+    assert len(results) == 6
+    assert {r.extracted_fields.case_number for r in results} == {"DEMO-2026-0001"}
+
+    # A later run finds the text in the corpus.
+    _run(config, 16)
+    assert len(extractions) == 1
+
+    # Different extraction settings may give different text, so they don't share.
+    _run(load_config(write_config({**FORMS, "text_backends": ["pdfplumber"]})), 17)
+    assert len(extractions) == 2
+
+
+def test_new_extractor_version_extracts_again(write_config, extractions, monkeypatch):
+    config = load_config(write_config(FORMS))
+    _run(config, 15)
+    assert len(extractions) == 1
+
+    monkeypatch.setattr(
+        probate.pdf.extract_text,
+        "EXTRACTOR_VERSION",
+        probate.pdf.extract_text.EXTRACTOR_VERSION + 1,
+    )
+    _run(config, 16)
+    assert len(extractions) == 2
+
+
+class WaitingToken(CancelToken):
+    # A follower checks its token while it waits on the leader's flight.
+    def __init__(self) -> None:
+        super().__init__()
+        self.waiting = threading.Event()
+
+    def checkpoint(self) -> None:
+        self.waiting.set()
+        super().checkpoint()
+
+
+def test_single_flight_shares_one_computation():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "text"
+
+    leader = []
+    thread = threading.Thread(target=lambda: leader.append(flights.run("k", compute)))
+    thread.start()
+    assert started.wait(5)
+    follower = []
+    token = WaitingToken()
+    waiter = threading.Thread(
+        target=lambda: follower.append(flights.run("k", compute, token))
+    )
+    waiter.start()
+    # Only let the leader finish once the follower is known to be waiting.
+    assert token.waiting.wait(5)
+    release.set()
+    thread.join(5)
+    waiter.join(5)
+
+    assert calls == [1]
+    assert leader == [("text", False)]
+    assert follower == [("text", True)]
+
+
+def test_single_flight_shares_failures_but_not_past_them():
+    flights = SingleFlight()
+
+    def broken():
+        raise ValueError("bad PDF")
+
+    with pytest.raises(ValueError):
+        flights.run("k", broken)
+    assert flights.run("k", lambda: "retried") == ("retried", False)
@@ -0,0 +1,51 @@
+import hashlib
+import os
+from pathlib import Path
+
+from probate.models import PdfLink
+from probate.pdf import download
+from probate.pdf.download import copy_local_file, download_pdf_hashed
+
+
+def _payload(size: int) -> bytes:
+    return bytes(range(256)) * (size // 256) + b"tail"
+
+
+def test_file_link_copies_and_hashes_in_one_pass(tmp_path: Path):
+    source = tmp_path / "drop" / "estate inventory.pdf"
+    source.parent.mkdir()
+    payload = _payload(3 * 1024 * 1024)
+    source.write_bytes(payload)
+    dest = tmp_path / "store" / "copy.pdf"
+
+    digest = download_pdf_hashed(PdfLink(url=source.as_uri(), label="x"), dest)
+
+    assert dest.read_bytes() == payload
+    assert digest == hashlib.sha256(payload).hexdigest()
+
+
+def test_copy_falls_back_to_buffered_copy(tmp_path: Path, monkeypatch):
+    source = tmp_path / "source.pdf"
+    payload = _payload(20 * 1024 * 1024)
+    source.write_bytes(payload)
+    dest = tmp_path / "dest.pdf"
+
+    def failing_copy(*_args):
+        raise OSError("cross-device")
+
+    monkeypatch.setattr(download, "_reflink", lambda *_args: False)
+    monkeypatch.setattr(download, "_kernel_copy_function", lambda: failing_copy)
+
+    digest = copy_local_file(source, dest)
+
+    assert os.path.getsize(dest) == len(payload)
+    assert dest.read_bytes() == payload
+    assert digest == hashlib.sha256(payload).hexdigest()
+
+
+def test_copy_empty_file(tmp_path: Path):
+    source = tmp_path / "empty.pdf"
+    source.write_bytes(b"")
+    dest = tmp_path / "dest.pdf"
+    assert copy_local_file(source, dest) == hashlib.sha256(b"").hexdigest()
+    assert dest.read_bytes() == b""
@@ -0,0 +1,65 @@
+import csv
+from datetime import date
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+
+from probate.models import CaseRef, CaseResult, ExtractedFields
+from probate.output.excel import HEADERS, write_excel
+
+
+def _result(county: str, number: int) -> CaseResult:
+    return CaseResult(
+        county=county,
+        case_ref=CaseRef(
+            f"PR-{number}", date(2026, 1, 15), f"https://example.com/PR-{number}"
+        ),
+        pdf_paths=[f"/data/PR-{number}/Application.pdf"],
+        extracted_fields=ExtractedFields(
+            "Jane Doe", "John Doe", "1 Main St", f"PR-{number}", "2026-01-15", ""
+        ),
+        errors=[],
+    )
+
+
+def test_write_excel_streams_all_and_county_sheets(tmp_path: Path):
+    results = (_result(["Alpha", "Beta"][n % 2], n) for n in range(5))
+    report = write_excel(
+        results, tmp_path / "leads.xlsx", siblings=("csv",), per_county_sheets=True
+    )
+
+    workbook = load_workbook(report, read_only=True)
+    assert workbook.sheetnames == ["All Leads", "Alpha", "Beta"]
+    rows = list(workbook["All Leads"].values)
+    assert list(rows[0]) == HEADERS
+    assert [row[1] for row in rows[1:]] == [f"PR-{n}" for n in range(5)]
+    assert len(list(workbook["Beta"].values)) == 3
+    workbook.close()
+
+    with open(tmp_path / "leads.csv", encoding="utf-8-sig", newline="") as handle:
+        csv_rows = list(csv.reader(handle))
+    assert csv_rows[0] == HEADERS
+    assert len(csv_rows) == 6
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["leads.csv", "leads.xlsx"]
+
+
+def test_county_sheets_are_off_by_default(tmp_path: Path):
+    results = [_result("Alpha", 1), _result("Beta", 2)]
+    report = write_excel(results, tmp_path / "leads.xlsx")
+    assert load_workbook(report, read_only=True).sheetnames == ["All Leads"]
+
+
+def test_failed_write_keeps_previous_report(tmp_path: Path):
+    report = tmp_path / "leads.xlsx"
+    write_excel([_result("Alpha", 1)], report)
+    before = report.read_bytes()
+
+    def broken():
+        yield _result("Alpha", 2)
+        raise RuntimeError("source failed")
+
+    with pytest.raises(RuntimeError):
+        write_excel(broken(), report, siblings=("csv",))
+    assert report.read_bytes() == before
+    assert [p.name for p in tmp_path.iterdir()] == ["leads.xlsx"]
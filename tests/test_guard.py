@@ -0,0 +1,107 @@
+import json
+from datetime import date
+from pathlib import Path
+from typing import List
+
+import probate.pipeline
+from probate.config import load_config
+from probate.connectors.base import BaseConnector
+from probate.guard import CircuitBreaker
+from probate.models import CaseDetails, CaseRef
+from probate.pipeline import run_pipeline
+from probate.standin import PortalSettings, StandinPortal
+from probate.standin.loadtest import load_test_config
+
+RUN_DATE = date(2026, 1, 15)
+
+
+class DownPortal(BaseConnector):
+    def __init__(self, config) -> None:
+        super().__init__(config)
+        self.detail_calls = 0
+
+    def fetch_case_index(self, target_date: date) -> List[CaseRef]:
+        return [
+            CaseRef(f"PR-{n}", target_date, f"https://example.com/PR-{n}")
+            for n in range(1, 11)
+        ]
+
+    def fetch_case_details(self, case_ref: CaseRef) -> CaseDetails:
+        self.detail_calls += 1
+        raise ConnectionError("portal unavailable")
+
+
+def test_breaker_opens_on_consecutive_failures_only():
+    breaker = CircuitBreaker(failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success(0.1)
+    breaker.record_failure()
+    assert not breaker.is_open
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.reason == "3 consecutive failures"
+
+
+def test_breaker_opens_on_sustained_latency():
+    breaker = CircuitBreaker(latency_threshold=2.0, latency_window=3)
+    for latency in (5.0, 5.0):
+        breaker.record_success(latency)
+    assert not breaker.is_open
+    breaker.record_success(0.5)
+    assert breaker.is_open
+
+
+def test_open_breaker_defers_rest_of_county(tmp_path: Path, write_config):
+    # Detail prefetch trips the breaker, so the remaining cases are never
+    # requested and the whole county lands in the deferred list.
+    config = load_config(
+        write_config(
+            {"name": "Broken", "breaker_failures": 3}, run={"prioritize": True}
+        )
+    )
+    portal = DownPortal(config.counties[0])
+
+    results = run_pipeline(
+        config, RUN_DATE, connectors={"Broken": portal}, write_report=False
+    )
+
+    assert results == []
+    assert portal.detail_calls == 3
+    deferred_file = (
+        tmp_path / "reports" / "Daily_Probate_Leads_2026-01-15_deferred.json"
+    )
+    deferred = json.loads(deferred_file.read_text(encoding="utf-8"))
+    assert len(deferred["cases"]) == 10
+    assert deferred["reason"] == "circuit open: 3 consecutive failures"
+
+
+def test_parse_errors_do_not_open_the_breaker(write_config, monkeypatch):
+    def broken_parser(text, used_ocr):
+        raise ValueError("parser bug")
+
+    monkeypatch.setattr(probate.pipeline, "parse_text", broken_parser)
+    config = load_config(
+        write_config(
+            {"name": "DemoCounty2", "connector": "democounty2", "breaker_failures": 2}
+        )
+    )
+
+    results = run_pipeline(config, RUN_DATE, write_report=False)
+
+    assert len(results) == 10
+    assert all(result.errors == ["parser bug"] for result in results)
+
+
+def test_request_budget_counts_index_and_detail_requests(tmp_path: Path):
+    settings = PortalSettings(cases_per_day=5, page_size=5)
+    with StandinPortal(settings) as portal:
+        config = load_config(load_test_config(tmp_path, portal, ["alpha"]))
+        config.counties[0].concurrency = 1
+        config.counties[0].max_requests = 3
+        results = run_pipeline(config, RUN_DATE, write_report=False)
+        requests = sum(portal.metrics.statuses().values())
+
+    # Index page, then one case's detail page and PDF; the rest are deferred.
+    assert len(results) == 1
+    assert requests == 3
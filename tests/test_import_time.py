@@ -0,0 +1,48 @@
+import subprocess
+import sys
+
+# Heavy third-party packages that must only load inside the stage that uses them.
+HEAVY_MODULES = {"pdfplumber", "pdfminer", "pandas", "openpyxl", "requests", "tenacity"}
+
+# Cumulative `-X importtime` budget (microseconds) for the CLI entry point.
+CLI_IMPORT_BUDGET_US = 150_000
+
+
+def _import_times(statement: str) -> dict[str, int]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative_us)
+    return times
+
+
+def test_cli_import_skips_heavy_modules():
+    times = _import_times("import probate.cli")
+    loaded = {name.split(".")[0] for name in times}
+    assert not loaded & HEAVY_MODULES
+    assert times["probate.cli"] < CLI_IMPORT_BUDGET_US
+
+
+def test_pipeline_import_defers_stage_dependencies():
+    times = _import_times("import probate.pipeline")
+    loaded = {name.split(".")[0] for name in times}
+    assert not loaded & HEAVY_MODULES
+
+
+def test_cli_help_exits_cleanly():
+    completed = subprocess.run(
+        [sys.executable, "-m", "probate", "--help"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert completed.returncode == 0
+    assert "--yesterday" in completed.stdout
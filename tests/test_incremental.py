@@ -0,0 +1,85 @@
+from datetime import date
+from pathlib import Path
+
+from probate.config import AppConfig, CountyConfig, OutputConfig, RunConfig
+from probate.incremental import WatermarkStore, case_sort_key, poll_once
+from probate.models import CaseRef, CaseResult
+from probate.pdf.parse_fields import parse_fields
+from probate.results_log import append_results, load_results
+
+RUN_DATE = date(2026, 1, 15)
+
+
+def _ref(case_number: str) -> CaseRef:
+    return CaseRef(case_number, RUN_DATE, f"https://example.com/{case_number}")
+
+
+def _result(case_number: str, errors: list[str] | None = None) -> CaseResult:
+    return CaseResult(
+        county="DemoCounty",
+        case_ref=_ref(case_number),
+        pdf_paths=[],
+        extracted_fields=parse_fields(f"Case Number: {case_number}\n"),
+        errors=errors or [],
+    )
+
+
+def test_case_sort_key_is_numeric_aware():
+    assert case_sort_key("PR-9") < case_sort_key("PR-10")
+
+
+def test_watermark_selects_only_new_and_retried_cases(tmp_path: Path):
+    marks = WatermarkStore(tmp_path / "watermarks.json")
+    first = [_ref("PR-1"), _ref("PR-2"), _ref("PR-3")]
+    assert marks.new_cases("DemoCounty", RUN_DATE, first) == first
+
+    # PR-2 failed and PR-1 was never reached (e.g. the run was cancelled).
+    marks.advance(
+        "DemoCounty", RUN_DATE, first, [_result("PR-3"), _result("PR-2", ["boom"])]
+    )
+
+    reloaded = WatermarkStore(tmp_path / "watermarks.json")
+    later = [*first, _ref("PR-4")]
+    selected = reloaded.new_cases("DemoCounty", RUN_DATE, later)
+    assert [ref.case_number for ref in selected] == ["PR-1", "PR-2", "PR-4"]
+
+    # A new day starts from an empty mark.
+    next_day = [CaseRef("PR-1", date(2026, 1, 16), "")]
+    assert reloaded.new_cases("DemoCounty", date(2026, 1, 16), next_day) == next_day
+
+
+def test_results_log_round_trips_and_keeps_latest_row(tmp_path: Path):
+    log_path = tmp_path / "Daily_Probate_Leads_2026-01-15.jsonl"
+    append_results(log_path, [_result("PR-1", ["timeout"]), _result("PR-2")])
+    append_results(log_path, [_result("PR-1")])
+
+    rows = {row.case_ref.case_number: row for row in load_results(log_path)}
+    assert set(rows) == {"PR-1", "PR-2"}
+    assert rows["PR-1"].errors == []
+    assert rows["PR-2"].case_ref.filing_date == RUN_DATE
+    assert rows["PR-2"].extracted_fields.case_number == "PR-2"
+
+
+def test_poll_writes_its_own_report(tmp_path: Path):
+    reports = tmp_path / "reports"
+    config = AppConfig(
+        run=RunConfig(),
+        output=OutputConfig(
+            pdf_dir=str(tmp_path / "pdfs"),
+            report_dir=str(reports),
+            logs_dir=str(tmp_path / "logs"),
+        ),
+        counties=[
+            CountyConfig(
+                name="DemoCounty",
+                enabled=True,
+                connector="demo_county",
+                portal_url="https://example.com/probate",
+            )
+        ],
+    )
+    assert len(poll_once(config, RUN_DATE)) == 1
+    # The nightly report's name is left for the nightly run.
+    assert sorted(path.name for path in reports.glob("*.xlsx")) == [
+        "Daily_Probate_Leads_2026-01-15_intraday.xlsx"
+    ]
@@ -0,0 +1,37 @@
+import os
+from pathlib import Path
+
+from probate.index import ChecksumIndex
+from probate.pdf.download import sha256_file
+
+
+def test_trusted_digest_requires_matching_stat(tmp_path: Path):
+    pdf = tmp_path / "case" / "doc.pdf"
+    pdf.parent.mkdir()
+    pdf.write_bytes(b"%PDF-1.4 original")
+    with ChecksumIndex(tmp_path / "index.sqlite3", root=tmp_path) as index:
+        index.record(pdf, sha256_file(pdf))
+        assert index.trusted_digest(pdf) == sha256_file(pdf)
+
+        pdf.write_bytes(b"%PDF-1.4 changed!!")
+        assert index.trusted_digest(pdf) is None
+        assert index.lookup(pdf) is not None
+
+
+def test_rehash_reports_and_forgets_mismatches(tmp_path: Path):
+    good = tmp_path / "good.pdf"
+    bad = tmp_path / "bad.pdf"
+    good.write_bytes(b"good")
+    bad.write_bytes(b"bad1")
+    with ChecksumIndex(tmp_path / "index.sqlite3", root=tmp_path) as index:
+        index.record(good, sha256_file(good))
+        expected = sha256_file(bad)
+        index.record(bad, expected)
+        stat = bad.stat()
+        bad.write_bytes(b"bad2")
+        os.utime(bad, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert index.trusted_digest(bad) == expected
+
+        assert index.rehash(workers=2) == [(bad, expected)]
+        assert index.lookup(bad) is None
+        assert index.trusted_digest(good) == sha256_file(good)
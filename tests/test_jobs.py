@@ -0,0 +1,119 @@
+import subprocess
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import probate.jobs.coordinator
+from probate.config import load_config
+from probate.connectors import get_connector
+from probate.jobs import get_queue
+from probate.jobs.coordinator import collect_results, enqueue_date, wait_for_run
+from probate.jobs.sqlite import SqliteJobQueue
+
+RUN_DATE = date(2026, 1, 15)
+
+
+def test_lease_hides_job_until_visibility_timeout(tmp_path: Path):
+    queue = SqliteJobQueue(tmp_path / "jobs.sqlite3")
+    queue.enqueue("run-1", [{"case": 1}], max_attempts=2)
+
+    first = queue.lease("worker-a", visibility_timeout=0.2)
+    assert first is not None and first.attempts == 1
+    assert queue.lease("worker-b", visibility_timeout=0.2) is None
+
+    time.sleep(0.3)
+    second = queue.lease("worker-b", visibility_timeout=5)
+    assert second is not None and second.attempts == 2
+    # The original holder lost its lease and cannot complete the job.
+    assert not queue.complete(first, {"ok": False})
+    assert queue.complete(second, {"ok": True})
+    assert queue.counts("run-1") == {"done": 1}
+    assert queue.outcomes("run-1")[0].result == {"ok": True}
+
+
+def test_failed_job_retries_then_dies(tmp_path: Path):
+    queue = get_queue(f"sqlite://{(tmp_path / 'jobs.sqlite3').as_posix()}")
+    queue.enqueue("run-1", [{"case": 1}], max_attempts=2)
+
+    job = queue.lease("worker-a", visibility_timeout=5)
+    queue.fail(job, "portal timeout", retry_delay=0.2)
+    assert queue.lease("worker-a", visibility_timeout=5) is None
+
+    time.sleep(0.3)
+    job = queue.lease("worker-a", visibility_timeout=5)
+    queue.fail(job, "portal timeout")
+    assert queue.counts("run-1") == {"dead": 1}
+    assert queue.outcomes("run-1")[0].error == "portal timeout"
+
+
+def test_released_job_keeps_its_attempts(tmp_path: Path):
+    queue = SqliteJobQueue(tmp_path / "jobs.sqlite3")
+    queue.enqueue("run-1", [{"case": 1}], max_attempts=1)
+
+    # A worker stopped mid-case hands its only attempt back.
+    queue.release(queue.lease("worker-a", visibility_timeout=5))
+    job = queue.lease("worker-b", visibility_timeout=5)
+    assert job is not None and job.attempts == 1
+    assert queue.complete(job, {"ok": True})
+    assert queue.counts("run-1") == {"done": 1}
+
+
+def test_failing_county_index_skips_only_that_county(
+    tmp_path: Path, monkeypatch, write_config
+):
+    class DownPortal:
+        def fetch_case_index(self, target_date):
+            raise ConnectionError("portal down")
+
+    def connector(name, county, cancel_token=None):
+        if county.name == "Broken":
+            return DownPortal()
+        return get_connector(name, county, cancel_token)
+
+    monkeypatch.setattr(probate.jobs.coordinator, "get_connector", connector)
+    config = load_config(write_config({"name": "Broken"}, {"name": "Working"}))
+    queue = SqliteJobQueue(tmp_path / "jobs.sqlite3")
+
+    run_id = enqueue_date(config, queue, RUN_DATE)
+
+    assert queue.counts(run_id) == {"queued": 1}
+
+
+def test_local_workers_drain_a_run(tmp_path: Path, write_config):
+    config_path = write_config()
+    config = load_config(config_path)
+    queue_path = tmp_path / "jobs.sqlite3"
+    queue = SqliteJobQueue(queue_path)
+    run_id = enqueue_date(config, queue, RUN_DATE)
+    enqueued = queue.counts(run_id)["queued"]
+
+    workers = [
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "probate",
+                "--config",
+                str(config_path),
+                "worker",
+                "--queue",
+                str(queue_path),
+                "--worker-id",
+                f"worker-{n}",
+                "--idle-exit",
+                "1",
+            ]
+        )
+        for n in range(3)
+    ]
+    try:
+        counts = wait_for_run(queue, run_id, poll_seconds=0.2, timeout=60)
+    finally:
+        for worker in workers:
+            worker.wait(timeout=30)
+
+    assert counts == {"done": enqueued}
+    results = collect_results(queue, run_id)
+    assert len({result.case_ref.case_number for result in results}) == enqueued
+    assert all(not result.errors for result in results)
@@ -0,0 +1,96 @@
+import json
+import logging
+import threading
+from datetime import date
+from pathlib import Path
+
+from probate.logging import (
+    DebugSampler,
+    flush_logging,
+    log_context,
+    log_path,
+    setup_logging,
+)
+
+
+def _lines(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_records_are_json_with_context_fields(tmp_path: Path):
+    logger = setup_logging(tmp_path, target_date=date(2026, 1, 15))
+    with log_context(run_id="run-1", county="DemoCounty", case="PR-1"):
+        try:
+            raise ValueError("bad page")
+        except ValueError:
+            logger.exception("Failed case %s", "PR-1")
+    logger.info("outside", extra={"cases": 3})
+    flush_logging()
+
+    failed, outside = _lines(tmp_path / "2026-01-15.jsonl")[-2:]
+    assert failed["msg"] == "Failed case PR-1"
+    assert failed["level"] == "ERROR"
+    assert (failed["run_id"], failed["county"], failed["case"]) == (
+        "run-1",
+        "DemoCounty",
+        "PR-1",
+    )
+    assert "ValueError: bad page" in failed["exc"]
+    assert "run_id" not in outside
+    assert outside["cases"] == 3
+
+
+def test_each_run_date_gets_its_own_file(tmp_path: Path):
+    # The handler used to be attached once, so later dates kept writing to the
+    # first date's file in long-lived processes.
+    first = setup_logging(tmp_path, target_date=date(2026, 1, 15))
+    first.info("first day")
+    second = setup_logging(tmp_path, target_date=date(2026, 1, 16))
+    second.info("second day")
+    flush_logging()
+
+    first_msgs = [line["msg"] for line in _lines(tmp_path / "2026-01-15.jsonl")]
+    second_msgs = [line["msg"] for line in _lines(tmp_path / "2026-01-16.jsonl")]
+    assert "first day" in first_msgs and "second day" not in first_msgs
+    assert second_msgs == ["second day"]
+    assert len(logging.getLogger("probate").handlers) == 1
+
+
+def test_concurrent_runs_keep_their_own_files(tmp_path: Path):
+    # Two runs for different dates in one process, logging interleaved.
+    logger = setup_logging(tmp_path)
+    barrier = threading.Barrier(2)
+
+    def run(day: date) -> None:
+        with log_context(run_id=day.isoformat(), log_file=str(log_path(tmp_path, day))):
+            for step in range(50):
+                logger.info("step %s", step)
+                if step == 10:
+                    barrier.wait()
+            setup_logging(tmp_path, target_date=day)
+
+    threads = [
+        threading.Thread(target=run, args=(date(2026, 1, day),)) for day in (15, 16)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    flush_logging()
+
+    for day in ("2026-01-15", "2026-01-16"):
+        lines = _lines(tmp_path / f"{day}.jsonl")
+        assert len(lines) == 50
+        assert {line["run_id"] for line in lines} == {day}
+        assert "log_file" not in lines[0]
+
+
+def test_debug_sampler_keeps_one_in_n_per_call_site():
+    sampler = DebugSampler(every=3)
+    record = logging.makeLogRecord(
+        {"levelno": logging.DEBUG, "pathname": "x.py", "lineno": 1}
+    )
+    kept = [sampler.filter(record) for _ in range(9)]
+    assert kept.count(True) == 3
+    warning = logging.makeLogRecord({"levelno": logging.WARNING})
+    assert sampler.filter(warning)
@@ -0,0 +1,42 @@
+from PIL import Image, ImageDraw, ImageFont
+
+from probate.pdf.page_filter import PageFilter, classify, page_signals
+
+
+class FakePage:
+    def __init__(self, lines: list[str], left: int = 200) -> None:
+        self.image = Image.new("RGB", (1700, 2200), "white")
+        draw = ImageDraw.Draw(self.image)
+        font = ImageFont.load_default(size=40)
+        for row, line in enumerate(lines):
+            draw.text((left, 200 + row * 60), line, fill="black", font=font)
+
+    def to_image(self, resolution: int):
+        scale = resolution / 200
+        size = (int(1700 * scale), int(2200 * scale))
+        return type("Rendered", (), {"original": self.image.resize(size)})
+
+
+STAMP = ["CLERK OF COURT", "FILED", "This page intentionally left blank"]
+
+
+def test_blank_and_text_pages():
+    blank = page_signals(FakePage([]).to_image(36).original)
+    assert classify(blank) == "blank"
+    assert classify(blank, skip_blank=False) is None
+
+    one_line = page_signals(FakePage(["PR-1"]).to_image(36).original)
+    assert classify(one_line) is None
+
+
+def test_boilerplate_hash_matches_shifted_rescan_only():
+    known = page_signals(FakePage(STAMP).to_image(36).original).dhash
+    skipped: list[str] = []
+    page_filter = PageFilter([known], record=skipped.append)
+
+    assert not page_filter.worth_ocr(FakePage(STAMP, left=260))
+    assert not page_filter.worth_ocr(FakePage([]))
+    assert page_filter.worth_ocr(
+        FakePage(["Case Number: PR-2026-0001", "Decedent: John Doe"])
+    )
+    assert skipped == ["boilerplate", "blank"]
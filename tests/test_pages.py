@@ -0,0 +1,61 @@
+from pathlib import Path
+
+from probate.pdf.extract_text import extract_text
+from probate.pdf.pages import DocumentLimits, TextBuffer
+
+
+def test_text_buffer_keeps_head_in_memory_and_spills_the_rest(tmp_path: Path):
+    spill = tmp_path / "inventory.txt"
+    with TextBuffer(limit=12, spill_path=spill) as buffer:
+        for number in range(5):
+            buffer.add(f"page {number}\n")
+    assert buffer.text == "page 0\npage "
+    assert buffer.spilled
+    assert spill.read_text(encoding="utf-8") == "".join(
+        f"page {number}\n" for number in range(5)
+    )
+    assert not spill.with_name("inventory.txt.tmp").exists()
+
+
+def test_failed_extraction_leaves_no_spill_file(tmp_path: Path):
+    spill = tmp_path / "inventory.txt"
+    try:
+        with TextBuffer(limit=4, spill_path=spill) as buffer:
+            buffer.add("too long for memory")
+            raise RuntimeError("page failed")
+    except RuntimeError:
+        pass
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_extract_text_reads_pages_within_limits(text_pdf, tmp_path: Path):
+    pdf = text_pdf(
+        "inventory.pdf",
+        [[(72, 72, f"Inventory item {number}")] for number in range(1, 31)],
+    )
+    text, used_ocr = extract_text(pdf, ocr="never")
+    assert not used_ocr
+    assert text.splitlines()[:2] == ["Inventory item 1", "Inventory item 2"]
+    assert "Inventory item 30" in text
+
+    limited, _ = extract_text(pdf, ocr="never", limits=DocumentLimits(max_pages=3))
+    assert limited.splitlines() == [f"Inventory item {n}" for n in (1, 2, 3)]
+
+    spill = tmp_path / "inventory.txt"
+    head, _ = extract_text(
+        pdf,
+        ocr="never",
+        limits=DocumentLimits(max_text_bytes=40),
+        spill_path=spill,
+    )
+    assert len(head.encode("utf-8")) == 40
+    assert "Inventory item 30" in spill.read_text(encoding="utf-8")
+
+
+def test_unreadable_pdf_gives_no_text(tmp_path: Path):
+    ascii_pdf = tmp_path / "broken.pdf"
+    ascii_pdf.write_bytes(b"%PDF-1.4\n1 0 obj << /Type /Catalog >> garbage")
+    binary_pdf = tmp_path / "binary.pdf"
+    binary_pdf.write_bytes(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n\x89\xff\x00stream")
+    for pdf in (ascii_pdf, binary_pdf):
+        assert extract_text(pdf, ocr="never") == ("", False)
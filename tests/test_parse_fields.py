@@ -211,3 +211,56 @@ def test_parse_fields_fixture_text():
     assert fields.deceased_name == "Maria D. Example"
     assert fields.filer_name == "Luis Executor"
     assert fields.property_address == "987 Elm St, Houston, TX 77002"
+
+
+def test_parse_fields_ocr_noisy_labels():
+    text = (
+        "Case N0 ABC-123\n"
+        "Fi1ed; 2025-12-01\n"
+        "Dec3dent ; Alice Example\n"
+        "Petiti0ner: Bob Example\n"
+        "Pr0perty Addre5s: 55 Pine Rd, Dallas, TX 75001\n"
+    )
+    fields = parse_fields(text)
+    assert fields.case_number == "ABC-123"
+    assert fields.filing_date == "2025-12-01"
+    assert fields.deceased_name == "Alice Example"
+    assert fields.filer_name == "Bob Example"
+    assert fields.property_address == "55 Pine Rd, Dallas, TX 75001"
+    assert "deceased_name: fuzzy matched 'Dec3dent'" in fields.notes
+    assert "deceased_name: no match" not in fields.notes
+
+    exact = parse_fields(text, fuzzy=False)
+    assert exact.deceased_name is None
+    assert exact.case_number is None
+
+
+def test_parse_fields_fuzzy_ignores_prose_and_distant_words():
+    text = (
+        "The petition was filed by the executor on behalf of the estate.\n"
+        "Released: John Smith\n"
+        "Case notes 2026-01-15\n"
+        "Addresses: see attached\n"
+    )
+    fields = parse_fields(text)
+    assert fields.filing_date is None
+    assert fields.deceased_name is None
+    assert fields.filer_name is None
+    assert fields.case_number is None
+    assert fields.property_address is None
+
+
+def test_fuzzy_matching_raises_recall_on_noisy_copies():
+    from probate.pdf.fuzzy_labels import benchmark_parse
+
+    texts = [
+        (Path(__file__).parent / "fixtures" / "sample_case_text.txt").read_text(
+            encoding="utf-8"
+        ),
+        "Case No. ABC-123\nFiled: 2025-12-01\nDecedent: Alice Example\n"
+        "Executor: Bob Example\nAddress: 55 Pine Rd, Dallas, TX 75001\n",
+    ]
+    regex, fuzzy = benchmark_parse(texts, parse_fields, noise=0.1, rounds=30)
+    assert regex.name == "regex" and fuzzy.name == "regex+fuzzy"
+    assert fuzzy.recall > regex.recall + 0.3
+    assert fuzzy.precision == 1.0
@@ -38,5 +38,6 @@ def test_pipeline_smoke(tmp_path: Path):
     pdf_dir = tmp_path / "pdfs" / "DemoCounty" / "2026-01-15"
     assert pdf_dir.exists()
 
-    checksum_files = list(pdf_dir.rglob("*.sha256"))
-    assert checksum_files
+    assert not list(pdf_dir.rglob("*.sha256"))
+    assert list((tmp_path / "pdfs" / "blobs").rglob("*.pdf"))
+    assert (tmp_path / "pdfs" / "index.sqlite3").exists()
@@ -0,0 +1,70 @@
+import json
+from datetime import date
+from pathlib import Path
+
+from probate.config import CountyConfig, load_config
+from probate.connectors.democounty2 import DemoCounty2Connector
+from probate.models import CaseDetails, CaseRef, PdfLink
+from probate.pipeline import run_pipeline
+from probate.priority import PlannedCase, RunBudget, prioritize, score_case
+
+RUN_DATE = date(2026, 1, 15)
+COUNTY = CountyConfig("DemoCounty", True, "demo_county", "https://example.com")
+
+
+class CountingPortal(DemoCounty2Connector):
+    detail_calls = 0
+
+    def fetch_case_details(self, case_ref: CaseRef) -> CaseDetails:
+        self.detail_calls += 1
+        return super().fetch_case_details(case_ref)
+
+
+def _planned(case_number: str, label: str, tmp_path: Path) -> PlannedCase:
+    ref = CaseRef(case_number, RUN_DATE, "")
+    details = CaseDetails(ref, [PdfLink(f"https://example.com/{label}", label)])
+    item = PlannedCase(COUNTY, None, ref, details)  # type: ignore[arg-type]
+    score_case(item, tmp_path)
+    return item
+
+
+def test_property_filings_outrank_guardianships(tmp_path: Path):
+    planned = [
+        _planned("GD-1", "Application for Guardianship", tmp_path),
+        _planned("PR-2", "Order", tmp_path),
+        _planned("PR-3", "Inventory and Appraisement", tmp_path),
+    ]
+    ordered = [item.case_ref.case_number for item in prioritize(planned)]
+    assert ordered == ["PR-3", "PR-2", "GD-1"]
+
+
+def test_budget_reports_which_limit_ran_out():
+    assert RunBudget().exhausted() is None
+    assert RunBudget(wall_minutes=1e-9).exhausted() == "time budget"
+
+
+def test_exhausted_budget_defers_remaining_cases(
+    tmp_path: Path, monkeypatch, write_config
+):
+    # The budget runs out as soon as the run starts, however fast it is.
+    monkeypatch.setattr(RunBudget, "exhausted", lambda self: "time budget")
+    config = load_config(
+        write_config(
+            {"name": "DemoCounty2", "connector": "democounty2"},
+            run={"time_budget_minutes": 1, "prioritize": True},
+        )
+    )
+    portal = CountingPortal(config.counties[0])
+    results = run_pipeline(
+        config, RUN_DATE, connectors={"DemoCounty2": portal}, write_report=False
+    )
+
+    assert results == []
+    # Planning is charged to the budget too, so no detail page was fetched.
+    assert portal.detail_calls == 0
+    deferred_file = (
+        tmp_path / "reports" / "Daily_Probate_Leads_2026-01-15_deferred.json"
+    )
+    deferred = json.loads(deferred_file.read_text(encoding="utf-8"))
+    assert deferred["reason"] == "time budget"
+    assert len(deferred["cases"]) == 10
@@ -0,0 +1,49 @@
+from datetime import date
+
+from probate.models import CaseRef, CaseResult
+from probate.pdf.parse_fields import parse_fields
+from probate.progress import ProgressReporter
+
+
+def _result(case_number: str) -> CaseResult:
+    return CaseResult(
+        county="DemoCounty",
+        case_ref=CaseRef(case_number, date(2026, 1, 15), ""),
+        pdf_paths=[],
+        extracted_fields=parse_fields(""),
+        errors=[],
+    )
+
+
+def test_reporter_tracks_totals_bytes_and_eta():
+    events = []
+    reporter = ProgressReporter(events.append)
+    reporter.run_started()
+    reporter.county_indexed("DemoCounty", 4)
+    reporter.case_started("DemoCounty", "A")
+    reporter.stage_done("DemoCounty", "A", "download", bytes_downloaded=2048)
+    reporter.case_finished(_result("A"))
+
+    finished = events[-1]
+    assert [event.kind for event in events] == [
+        "run_started",
+        "county_indexed",
+        "case_started",
+        "stage_done",
+        "case_finished",
+    ]
+    assert finished.cases_done == 1
+    assert finished.cases_total == 4
+    assert finished.bytes_downloaded == 2048
+    assert finished.eta_seconds is not None
+    assert finished.result.case_ref.case_number == "A"
+
+
+def test_reporter_survives_failing_callback():
+    def broken(_event):
+        raise RuntimeError("consumer went away")
+
+    reporter = ProgressReporter(broken)
+    reporter.county_indexed("DemoCounty", 1)
+    reporter.case_finished(_result("A"))
+    assert reporter.cases_done == 1
@@ -0,0 +1,54 @@
+import shutil
+from datetime import date
+from pathlib import Path
+
+import probate.corpus
+from probate.config import load_config
+from probate.output.excel import read_excel
+from probate.pdf.parse_fields import parse_fields
+from probate.pipeline import run_pipeline
+from probate.reparse import reparse
+
+RUN_DATE = date(2026, 1, 15)
+
+
+def test_reparse_applies_new_parser_to_stored_text(
+    tmp_path: Path, monkeypatch, write_config
+):
+    config = load_config(write_config())
+    before = run_pipeline(config, RUN_DATE)[0].extracted_fields
+    assert list((tmp_path / "pdfs" / "text").rglob("*.json"))
+
+    def upgraded(text: str):
+        fields = parse_fields(text)
+        fields.property_address = "42 New Pattern Rd"
+        return fields
+
+    monkeypatch.setattr(probate.corpus, "parse_fields", upgraded)
+    report_file = tmp_path / "reports" / "Daily_Probate_Leads_2026-01-15.xlsx"
+
+    preview = reparse(config, write=False)
+    assert (preview.cases, preview.reparsed, preview.changed_cases) == (1, 1, 1)
+    [change] = preview.changes
+    assert change.field == "property_address"
+    assert change.old == before.property_address
+    assert change.new == "42 New Pattern Rd"
+    assert read_excel(report_file)[0].extracted_fields == before
+
+    reparse(config, since=RUN_DATE, until=RUN_DATE)
+    rewritten = read_excel(report_file)[0]
+    assert rewritten.extracted_fields.property_address == "42 New Pattern Rd"
+    assert rewritten.extracted_fields.deceased_name == before.deceased_name
+
+    assert reparse(config, since=date(2026, 2, 1)).cases == 0
+
+
+def test_reparse_backfills_corpus_from_stored_pdfs(tmp_path: Path, write_config):
+    config = load_config(write_config())
+    run_pipeline(config, RUN_DATE)
+    shutil.rmtree(tmp_path / "pdfs" / "text")
+
+    assert reparse(config, write=False).missing_text == 1
+    backfill = reparse(config, extract_missing=True)
+    assert (backfill.extracted, backfill.missing_text, backfill.changes) == (1, 0, [])
+    assert list((tmp_path / "pdfs" / "text").rglob("*.json"))
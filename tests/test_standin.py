@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+import requests
+
+from probate.config import CountyConfig, load_config
+from probate.connectors.standin import StandinConnector
+from probate.pipeline import run_pipeline
+from probate.standin import PortalSettings, StandinPortal, simulated_cases
+from probate.standin.loadtest import load_test_config, percentile, run_load_test
+
+DAY = date(2026, 1, 5)
+
+
+def _county(portal, name="alpha", **overrides):
+    values = {
+        "name": name,
+        "enabled": True,
+        "connector": "standin",
+        "portal_url": portal.county_url(name),
+        "rate_limit_seconds": 0.0,
+    }
+    values.update(overrides)
+    return CountyConfig(**values)
+
+
+def test_portal_pages_index_and_requires_token():
+    settings = PortalSettings(cases_per_day=5, page_size=2, token="secret")
+    with StandinPortal(settings) as portal:
+        url = f"{portal.county_url('alpha')}/cases"
+        denied = requests.get(url, params={"date": DAY.isoformat()}, timeout=5)
+        assert denied.status_code == 401
+
+        pages, page = [], 1
+        while page is not None:
+            data = requests.get(
+                url,
+                params={"date": DAY.isoformat(), "page": page},
+                headers={"Authorization": "Bearer secret"},
+                timeout=5,
+            ).json()
+            pages.append(len(data["cases"]))
+            page = data["next_page"]
+    assert pages == [2, 2, 1]
+
+
+def test_connector_follows_pages_and_retries_errors():
+    settings = PortalSettings(
+        cases_per_day=7, page_size=3, error_rate=0.3, token="secret", seed=3
+    )
+    with StandinPortal(settings) as portal:
+        connector = StandinConnector(_county(portal, auth={"token": "secret"}))
+        refs = connector.fetch_case_index(DAY)
+        details = connector.fetch_case_details(refs[0])
+        pdf = requests.get(details.pdf_links[0].url, timeout=5)
+
+    assert [ref.case_number for ref in refs] == [
+        case.case_number for case in simulated_cases("alpha", DAY, settings)
+    ]
+    assert connector.statuses[503] == connector.retries > 0
+    assert pdf.content.startswith(b"%PDF")
+
+
+def test_connector_honours_retry_after_and_gives_up():
+    settings = PortalSettings(cases_per_day=1, rate_limit_per_second=2, burst=1)
+    with StandinPortal(settings) as portal:
+        connector = StandinConnector(_county(portal))
+        connector.fetch_case_index(DAY)
+        # The bucket is empty; Retry-After (~0.5s) is waited out, not hammered.
+        connector.fetch_case_index(DAY)
+        assert connector.retries == 1
+        assert portal.metrics.statuses() == {200: 2, 429: 1}
+
+    with StandinPortal(PortalSettings(error_rate=1.0)) as portal:
+        connector = StandinConnector(_county(portal))
+        connector.sleep = lambda _seconds: None
+        with pytest.raises(requests.HTTPError):
+            connector.fetch_case_index(DAY)
+        assert connector.statuses[503] == 4
+
+
+def test_throttle_spacing_is_visible_at_the_portal():
+    with StandinPortal(PortalSettings(cases_per_day=6, page_size=1)) as portal:
+        connector = StandinConnector(_county(portal, rate_limit_seconds=0.05))
+        refs = connector.fetch_case_index(DAY)
+        for ref in refs[:2]:
+            connector.fetch_case_details(ref)
+        arrivals = portal.metrics.arrivals["alpha"]
+    # Index pages and detail pages alike.
+    assert len(arrivals) == 8 == connector.requests_made
+    assert min(b - a for a, b in zip(arrivals, arrivals[1:])) >= 0.04
+
+
+def test_pipeline_extracts_simulated_filings(tmp_path):
+    settings = PortalSettings(cases_per_day=3, page_size=2, token="secret")
+    with StandinPortal(settings) as portal:
+        config = load_config(
+            load_test_config(tmp_path, portal, ["alpha", "beta"], concurrency=2)
+        )
+        results = run_pipeline(config, DAY, write_report=False)
+
+    assert len(results) == 6
+    expected = {
+        case.case_number: case
+        for county in ("alpha", "beta")
+        for case in simulated_cases(county, DAY, settings)
+    }
+    for result in results:
+        case = expected[result.case_ref.case_number]
+        assert result.errors == []
+        assert result.extracted_fields.case_number == case.case_number
+        assert result.extracted_fields.deceased_name == case.deceased_name
+        assert result.extracted_fields.property_address == case.property_address
+
+
+def test_load_test_reports_throughput_and_retries(tmp_path):
+    settings = PortalSettings(
+        cases_per_day=4,
+        page_size=2,
+        latency_ms=2,
+        jitter_ms=2,
+        error_rate=0.1,
+        rate_limit_per_second=50,
+        burst=2,
+        seed=1,
+    )
+    report = run_load_test(tmp_path, counties=4, settings=settings, concurrency=2)
+
+    assert report.cases_found == report.cases_done == 16
+    assert report.case_errors == 0
+    assert len(report.case_seconds) == 16
+    # Every retry follows a 429/503; requests out of attempts are not retried.
+    refused = sum(
+        count for status, count in report.client_statuses.items() if status != 200
+    )
+    assert 0 < report.retries <= refused
+    assert report.cases_per_second > 0
+    assert len(report.summary_lines()) == 5
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(n) for n in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 50) == 0.0
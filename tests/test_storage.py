@@ -0,0 +1,81 @@
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+
+from probate.index import ChecksumIndex
+from probate.models import PdfLink
+from probate.pdf.download import checksum_path
+from probate.storage import blob_path, build_paths, store_case_pdf
+
+PAYLOAD = b"%PDF-1.4 estate inventory"
+DIGEST = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+@pytest.fixture
+def storage(tmp_path: Path):
+    return build_paths(
+        str(tmp_path / "pdfs"), str(tmp_path / "reports"), str(tmp_path / "logs")
+    )
+
+
+@pytest.fixture
+def index(storage):
+    with ChecksumIndex(storage.index_path, root=storage.pdf_dir) as index:
+        yield index
+
+
+@pytest.fixture
+def link(tmp_path: Path) -> PdfLink:
+    source = tmp_path / "portal" / "inventory.pdf"
+    source.parent.mkdir()
+    source.write_bytes(PAYLOAD)
+    return PdfLink(url=source.as_uri(), label="inventory")
+
+
+def _case_file(storage, case: str) -> Path:
+    return storage.pdf_dir / "Demo" / "2026-01-15" / case / "inventory.pdf"
+
+
+def test_identical_downloads_share_one_blob(storage, index, link):
+    first, second = _case_file(storage, "PR-1"), _case_file(storage, "PR-2")
+
+    assert store_case_pdf(storage, index, link, first)
+    assert store_case_pdf(storage, index, link, second)
+
+    blob = blob_path(storage, DIGEST)
+    blobs = list(storage.blob_dir.rglob("*.pdf"))
+    assert blobs == [blob]
+    assert os.path.samefile(first, blob) and os.path.samefile(second, blob)
+    assert index.lookup(first) == index.lookup(second) == DIGEST
+    # Rerun: the indexed case file is trusted and nothing is fetched.
+    assert not store_case_pdf(storage, index, link, first)
+
+
+def test_legacy_file_matching_its_sidecar_is_adopted(storage, index, link):
+    legacy = _case_file(storage, "PR-1")
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(PAYLOAD)
+    checksum_path(legacy).write_text(DIGEST, encoding="utf-8")
+
+    assert not store_case_pdf(storage, index, link, legacy)
+
+    assert os.path.samefile(legacy, blob_path(storage, DIGEST))
+    assert not checksum_path(legacy).exists()
+    assert index.trusted_digest(legacy) == DIGEST
+
+
+def test_legacy_file_disagreeing_with_its_sidecar_is_fetched_again(
+    storage, index, link
+):
+    legacy = _case_file(storage, "PR-1")
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(PAYLOAD[:10])
+    checksum_path(legacy).write_text(DIGEST, encoding="utf-8")
+
+    assert store_case_pdf(storage, index, link, legacy)
+
+    assert legacy.read_bytes() == PAYLOAD
+    assert not checksum_path(legacy).exists()
+    assert list(storage.blob_dir.rglob("*.pdf")) == [blob_path(storage, DIGEST)]
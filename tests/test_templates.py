@@ -0,0 +1,140 @@
+from pathlib import Path
+
+import pytest
+
+from probate.config import ConfigError, load_config
+from probate.pdf.extract_text import extract_text
+from probate.pdf.parse_fields import parse_fields
+from probate.pdf.templates import Template, learn_template
+
+
+def _form(case: str, filed: str, decedent: str, address: str) -> list:
+    return [
+        [
+            (200, 60, "PROBATE COURT NO. 1"),
+            (72, 100, f"Case No. {case}"),
+            (340, 100, f"Filed: {filed}"),
+            (72, 140, f"Decedent: {decedent}"),
+            (72, 180, f"Property Address: {address}"),
+            (72, 220, "Petitioner: Dee Lee"),
+            (72, 260, "Notice to creditors: Address: see attached"),
+        ]
+    ]
+
+
+def _learned(text_pdf) -> Template:
+    samples = [
+        text_pdf("a.pdf", _form("PR-1", "2026-01-02", "Ann Lee", "1 Elm St")),
+        text_pdf("b.pdf", _form("PR-22", "2026-01-09", "Bo Ray", "22 Oak Ave")),
+    ]
+    return learn_template("court-1", samples)
+
+
+def test_learned_template_reads_only_field_regions(text_pdf):
+    template = _learned(text_pdf)
+    assert set(template.fields) == {
+        "case_number",
+        "filing_date",
+        "deceased_name",
+        "filer_name",
+        "property_address",
+    }
+    # The case number box stops where the "Filed:" label starts.
+    assert template.fields["case_number"][2] < template.fields["filing_date"][0]
+
+    new = text_pdf(
+        "c.pdf", _form("PR-333", "2026-01-15", "Cy Young", "9 Pine Rd, Austin TX")
+    )
+    text, used_ocr = extract_text(
+        new, templates=[Template.from_config(template.to_config())]
+    )
+    assert not used_ocr
+    assert "Notice to creditors" not in text
+    fields = parse_fields(text)
+    assert fields.case_number == "PR-333"
+    assert fields.filing_date == "2026-01-15"
+    assert fields.deceased_name == "Cy Young"
+    assert fields.property_address == "9 Pine Rd, Austin TX"
+    assert fields.filer_name == "Dee Lee"
+
+
+def test_fields_outside_the_template_come_from_the_whole_document(text_pdf):
+    template = _learned(text_pdf)
+    for name in ("filer_name", "property_address"):
+        del template.fields[name]
+
+    new = text_pdf("c.pdf", _form("PR-333", "2026-01-15", "Cy Young", "9 Pine Rd"))
+    fields = parse_fields(extract_text(new, templates=[template])[0])
+    assert fields.case_number == "PR-333"
+    assert fields.filer_name == "Dee Lee"
+    assert fields.property_address == "9 Pine Rd"
+
+
+def test_ocr_always_reads_the_regions_by_ocr(text_pdf, monkeypatch):
+    import pytesseract
+
+    template = _learned(text_pdf)
+    ocr_values = {
+        "case_number": "PR-OCR",
+        "filing_date": "2026-01-20",
+        "deceased_name": "Ann Ocr",
+        "filer_name": "Bo Ocr",
+        "property_address": "1 Ocr St",
+    }
+    # Crops are read in the template's field order.
+    answers = iter([ocr_values[name] for name in template.fields])
+    monkeypatch.setattr(
+        pytesseract, "image_to_string", lambda image, config="": next(answers)
+    )
+    new = text_pdf("c.pdf", _form("PR-333", "2026-01-15", "Cy Young", "9 Pine Rd"))
+
+    text, used_ocr = extract_text(new, ocr="always", templates=[template])
+    assert used_ocr
+    assert parse_fields(text).case_number == "PR-OCR"
+    assert next(answers, None) is None
+
+
+def test_unmatched_layout_falls_back_to_whole_document(text_pdf):
+    other = text_pdf("other.pdf", [[(72, 600, "Case Number: PR-9 Decedent: Al")]])
+    template = Template(
+        "court-1",
+        {"deceased_name": (0.2, 0.15, 0.9, 0.2), "case_number": (0.2, 0.1, 0.5, 0.14)},
+    )
+    text, _used_ocr = extract_text(other, templates=[template])
+    assert parse_fields(text).case_number == "PR-9"
+
+
+def test_template_without_layout_hash_matches_nothing(text_pdf):
+    template = _learned(text_pdf)
+    template.page_hash = None
+    new = text_pdf("c.pdf", _form("PR-333", "2026-01-15", "Cy Young", "9 Pine Rd"))
+
+    text, _used_ocr = extract_text(new, templates=[template])
+    assert "Notice to creditors" in text
+
+
+def test_template_config_is_validated(tmp_path: Path):
+    config_path = tmp_path / "counties.yaml"
+    config_path.write_text(
+        "\n".join(
+            [
+                "counties:",
+                '  - name: "DemoCounty"',
+                "    enabled: true",
+                '    connector: "demo_county"',
+                '    portal_url: "https://example.com/probate"',
+                "    templates:",
+                "      - name: court-1",
+                "        fields:",
+                "          decedent: [0.1, 0.1, 0.5, 0.2]",
+                "          case_number: [0.5, 0.1, 0.2, 0.2]",
+            ]
+        ),
+        encoding="utf-8",
+    )
+    with pytest.raises(ConfigError) as excinfo:
+        load_config(config_path)
+    problems = excinfo.value.problems
+    assert any("fields.decedent: unknown key" in problem for problem in problems)
+    assert any("fields.case_number: expected [x0" in problem for problem in problems)
+    assert any("page_hash: required" in problem for problem in problems)
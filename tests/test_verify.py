@@ -0,0 +1,100 @@
+from datetime import date
+from pathlib import Path
+
+import probate.verify
+from probate.config import AppConfig, CountyConfig, OutputConfig, RunConfig
+from probate.connectors import get_connector
+from probate.connectors.democounty2 import DemoCounty2Connector
+from probate.index import ChecksumIndex
+from probate.models import CaseDetails, CaseRef
+from probate.storage import build_paths, case_pdf_dir, store_case_pdf
+from probate.verify import verify_storage
+
+
+def _populate(tmp_path: Path) -> tuple[AppConfig, list[Path]]:
+    county = CountyConfig(
+        name="DemoCounty2",
+        enabled=True,
+        connector="democounty2",
+        portal_url="https://example.com/probate",
+    )
+    config = AppConfig(
+        run=RunConfig(),
+        output=OutputConfig(
+            pdf_dir=str(tmp_path / "pdfs"),
+            report_dir=str(tmp_path / "reports"),
+            logs_dir=str(tmp_path / "logs"),
+        ),
+        counties=[county],
+    )
+    storage = build_paths(
+        config.output.pdf_dir, config.output.report_dir, config.output.logs_dir
+    )
+    connector = get_connector(county.connector, county)
+    run_date = date(2026, 1, 15)
+    paths = []
+    with ChecksumIndex(storage.index_path, root=storage.pdf_dir) as index:
+        for case_ref in connector.fetch_case_index(run_date)[:3]:
+            case_dir = case_pdf_dir(
+                storage, county.name, run_date, case_ref.case_number
+            )
+            for link in connector.fetch_case_details(case_ref).pdf_links:
+                dest = case_dir / f"{link.label}.pdf"
+                store_case_pdf(storage, index, link, dest, case_ref=case_ref)
+                paths.append(dest)
+    return config, paths
+
+
+def test_verify_clean_store(tmp_path: Path):
+    config, _paths = _populate(tmp_path)
+    report = verify_storage(config, workers=2)
+    assert report.ok
+    # Three case files and the three blobs they link to.
+    assert report.files_checked == 6
+    assert not report.untracked and not report.orphaned_blobs
+
+
+def test_verify_detects_and_repairs_damage(tmp_path: Path):
+    config, paths = _populate(tmp_path)
+    corrupt, truncated, missing = paths
+    corrupt.write_text("not the original", encoding="utf-8")
+    truncated.write_bytes(b"")
+    missing.unlink()
+
+    report = verify_storage(config, workers=2)
+    assert corrupt in report.corrupt
+    assert truncated in report.truncated
+    assert missing in report.missing
+
+    repaired = verify_storage(config, workers=2, repair=True)
+    assert not repaired.repair_failed
+    assert verify_storage(config, workers=2).ok
+    assert missing.read_text(encoding="utf-8").startswith("Case Number:")
+
+
+def test_repair_asks_for_the_recorded_case(tmp_path: Path, monkeypatch):
+    config, paths = _populate(tmp_path)
+    requested = []
+
+    class DetailPortal(DemoCounty2Connector):
+        # Detail pages are only reachable through the URL from the index.
+        def fetch_case_details(self, case_ref: CaseRef) -> CaseDetails:
+            requested.append(case_ref)
+            assert case_ref.detail_url.endswith(case_ref.case_number)
+            return super().fetch_case_details(case_ref)
+
+    monkeypatch.setattr(
+        probate.verify, "get_connector", lambda _name, county: DetailPortal(county)
+    )
+    paths[0].unlink()
+
+    report = verify_storage(config, workers=2, repair=True)
+
+    assert report.repaired == [paths[0]] and not report.repair_failed
+    assert requested == [
+        CaseRef(
+            "DEMO2-2026-0001",
+            date(2026, 1, 15),
+            "https://example.com/case/DEMO2-2026-0001",
+        )
+    ]
@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+import probate.pdf.extract_text
+from probate.cancel import CancelToken, Cancelled, checkpoint
+from probate.config import ConfigError, CountyConfig, load_config
+from probate.connectors.demo_county import DemoCountyConnector
+from probate.pipeline import run_pipeline
+from probate.watchdog import CaseWatch, StageTimeout, WorkerDied, isolated_pool
+
+RUN_DATE = date(2026, 1, 15)
+
+
+def _county(**overrides) -> CountyConfig:
+    return CountyConfig(
+        name="DemoCounty",
+        enabled=True,
+        connector="demo_county",
+        portal_url="https://example.com/probate",
+        **overrides,
+    )
+
+
+def test_isolated_call_returns_results_and_errors():
+    pool = isolated_pool()
+    assert pool.call(divmod, (17, 5)) == (3, 2)
+    with pytest.raises(ZeroDivisionError):
+        pool.call(divmod, (1, 0))
+
+
+def test_hung_isolated_stage_is_killed_at_its_deadline():
+    watch = CaseWatch(_county(stage_timeouts={"extract": 0.5}))
+    started = time.monotonic()
+    with pytest.raises(StageTimeout, match="extract timed out after 0.5s"):
+        with watch.stage("extract"):
+            watch.call_isolated(time.sleep, 60)
+    assert time.monotonic() - started < 10
+    # The killed worker is replaced; the pool keeps working.
+    assert isolated_pool().call(divmod, (9, 4)) == (2, 1)
+
+
+def test_crashed_worker_is_reported_and_replaced():
+    with pytest.raises(WorkerDied, match="exited with code 3"):
+        isolated_pool().call(os._exit, (3,))
+    assert isolated_pool().call(divmod, (4, 2)) == (2, 0)
+
+
+def test_cancelled_run_stops_isolated_stage_as_cancelled():
+    token = CancelToken()
+    watch = CaseWatch(_county(), token)
+    threading.Timer(0.3, token.cancel, args=("stop",)).start()
+    with pytest.raises(Cancelled) as excinfo:
+        with watch.stage("extract"):
+            watch.call_isolated(time.sleep, 60)
+    assert not isinstance(excinfo.value, StageTimeout)
+
+
+def test_case_deadline_covers_every_stage():
+    watch = CaseWatch(_county(case_timeout_seconds=0.2, stage_timeouts={}))
+    with pytest.raises(StageTimeout, match="case timed out after 0.2s in download"):
+        with watch.stage("download"):
+            time.sleep(0.3)
+    with pytest.raises(StageTimeout, match="case timed out after 0.2s in parse"):
+        with watch.stage("parse"):
+            pass
+
+
+def test_paused_time_does_not_count_toward_deadlines():
+    token = CancelToken()
+    watch = CaseWatch(
+        _county(case_timeout_seconds=0.5, stage_timeouts={"extract": 0.5}), token
+    )
+    with watch.stage("extract"):
+        # Paused for twice the deadlines while the case is in its stage.
+        token.pause()
+        threading.Timer(1.0, token.resume).start()
+        assert watch.call_isolated(time.sleep, 0.3) is None
+        watch.token.checkpoint()
+    with watch.stage("parse"):
+        pass
+    assert watch.token.remaining() > 0
+
+
+def test_stage_that_ends_past_its_deadline_times_out():
+    # Parsing has no checkpoints; the overrun is caught as the stage ends.
+    watch = CaseWatch(_county(stage_timeouts={"parse": 0.1}))
+    with pytest.raises(StageTimeout, match="parse timed out after 0.1s"):
+        with watch.stage("parse"):
+            time.sleep(0.2)
+
+
+class HungPortal(DemoCountyConnector):
+    def fetch_case_details(self, case_ref):
+        # Stands in for a portal that keeps answering "try again".
+        while True:
+            self.checkpoint()
+            self.sleep(0.01)
+
+
+def test_hung_portal_times_out_its_details_stage(write_config):
+    config = load_config(
+        write_config(
+            {"name": "Hung", "stage_timeouts": {"details": 0.3}}, {"name": "Fast"}
+        )
+    )
+    portal = HungPortal(config.counties[0])
+
+    results = run_pipeline(config, RUN_DATE, connectors={"Hung": portal})
+
+    by_county = {result.county: result for result in results}
+    assert by_county["Hung"].errors == ["details timed out after 0.3s"]
+    assert by_county["Fast"].errors == []
+    assert by_county["Fast"].extracted_fields.case_number == "DEMO-2026-0001"
+
+
+def test_timed_out_case_is_an_error_and_the_run_goes_on(
+    tmp_path: Path, monkeypatch, write_config
+):
+    real_extract = probate.pdf.extract_text.extract_text
+
+    def hang_on_slow(pdf_path, cancel_token=None, *args, **kwargs):
+        # Stands in for a parser stuck on a malformed PDF.
+        if "Slow" not in str(pdf_path):
+            return real_extract(pdf_path, cancel_token, *args, **kwargs)
+        while True:
+            checkpoint(cancel_token)
+            time.sleep(0.01)
+
+    monkeypatch.setattr(probate.pdf.extract_text, "extract_text", hang_on_slow)
+    config_path = write_config(
+        {
+            "name": "Slow",
+            "isolate_extraction": False,
+            "stage_timeouts": {"extract": 0.3},
+        },
+        {"name": "Fast"},
+    )
+
+    results = run_pipeline(load_config(config_path), RUN_DATE)
+
+    by_county = {result.county: result for result in results}
+    assert by_county["Slow"].errors == ["extract timed out after 0.3s"]
+    assert by_county["Fast"].errors == []
+    assert by_county["Fast"].extracted_fields.case_number == "DEMO-2026-0001"
+    assert (tmp_path / "reports" / "Daily_Probate_Leads_2026-01-15.xlsx").exists()
+
+
+def test_stage_timeouts_are_validated(write_config):
+    config_path = write_config(
+        {"stage_timeouts": {"ocr": 30, "extract": 0}, "case_timeout_seconds": -1}
+    )
+    with pytest.raises(ConfigError) as excinfo:
+        load_config(config_path)
+    message = str(excinfo.value)
+    assert "stage_timeouts: expected stages among" in message
+    assert "stage_timeouts.extract: must be positive" in message
+    assert "case_timeout_seconds: must be positive" in message
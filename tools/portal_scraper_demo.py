@@ -2,21 +2,34 @@ from __future__ import annotations
 
 import json
 import os
+import queue
 import subprocess
 import sys
 import threading
 import time
 import tkinter as tk
+import tkinter.font
 from tkinter import ttk
 import webbrowser
 from datetime import date, datetime, timedelta
 from pathlib import Path
 from tkinter import messagebox
+from typing import Callable, Union
 from urllib.parse import urlparse, urlunparse
 
+from probate.cancel import CancelToken
 from probate.config import load_config
 from probate.pipeline import run_pipeline
+from probate.progress import ProgressEvent
 
+# Progress events are drained on a Tk timer in batches; these bound the work
+# done per tick and the size of the status log so the UI never stalls.
+EVENT_POLL_MS = 100
+MAX_EVENTS_PER_TICK = 500
+MAX_LOG_LINES = 2000
+
+# What the pipeline thread sends the UI: progress, then one finish callback.
+RunMessage = Union[ProgressEvent, Callable[[], None]]
 
 
 def _is_valid_url(value: str) -> bool:
@@ -38,6 +51,84 @@ def _mask_url(value: str) -> str:
         return value
 
 
+class VirtualList:
+    """Listbox that only materializes the visible window of a large row list."""
+
+    def __init__(self, parent: tk.Widget, height: int, **listbox_options) -> None:
+        self.frame = tk.Frame(parent, bg=listbox_options.get("bg"))
+        self.listbox = tk.Listbox(self.frame, height=height, **listbox_options)
+        self.scrollbar = tk.Scrollbar(
+            self.frame, orient="vertical", command=self._on_scroll
+        )
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.rows: list[tuple[str, str]] = []
+        self.offset = 0
+        self.listbox.bind("<Configure>", lambda _event: self._redraw())
+        self.listbox.bind("<MouseWheel>", self._on_wheel)
+        self.listbox.bind("<Button-4>", lambda _event: self._scroll_units(-3))
+        self.listbox.bind("<Button-5>", lambda _event: self._scroll_units(3))
+
+    def extend(self, rows: list[tuple[str, str]]) -> None:
+        if not rows:
+            return
+        at_end = self.offset + self._visible_count() >= len(self.rows)
+        self.rows.extend(rows)
+        if at_end:
+            self.offset = max(0, len(self.rows) - self._visible_count())
+        self._redraw()
+
+    def clear(self) -> None:
+        self.rows = []
+        self.offset = 0
+        self._redraw()
+
+    def selected_target(self) -> str | None:
+        selection = self.listbox.curselection()
+        if not selection:
+            return None
+        index = self.offset + selection[0]
+        if index >= len(self.rows):
+            return None
+        return self.rows[index][1]
+
+    def _visible_count(self) -> int:
+        line_height = max(1, tk.font.nametofont("TkDefaultFont").metrics("linespace"))
+        height = self.listbox.winfo_height()
+        if height <= 1:
+            return int(self.listbox.cget("height"))
+        return max(1, height // (line_height + 1))
+
+    def _on_scroll(self, action: str, amount: str, unit: str | None = None) -> None:
+        if action == "moveto":
+            self.offset = int(float(amount) * len(self.rows))
+            self._redraw()
+        elif action == "scroll":
+            step = self._visible_count() if unit == "pages" else 1
+            self._scroll_units(int(amount) * step)
+
+    def _on_wheel(self, event: tk.Event) -> None:
+        self._scroll_units(-3 if event.delta > 0 else 3)
+
+    def _scroll_units(self, delta: int) -> None:
+        self.offset += delta
+        self._redraw()
+
+    def _redraw(self) -> None:
+        visible = self._visible_count()
+        self.offset = max(0, min(self.offset, len(self.rows) - visible))
+        window = self.rows[self.offset : self.offset + visible]
+        self.listbox.delete(0, tk.END)
+        if window:
+            self.listbox.insert(tk.END, *(label for label, _target in window))
+        if self.rows:
+            first = self.offset / len(self.rows)
+            last = min(1.0, (self.offset + visible) / len(self.rows))
+            self.scrollbar.set(first, last)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+
 class PortalTesterApp:
     def __init__(self) -> None:
         self.root = tk.Tk()
@@ -180,6 +271,32 @@ class PortalTesterApp:
         )
         self.test_button.pack(side="left")
 
+        self.pause_button = tk.Button(
+            action_row,
+            text="Pause",
+            command=self.on_pause,
+            state="disabled",
+            bg=self._colors["card_light"],
+            fg=self._colors["text"],
+            relief="flat",
+            padx=12,
+            pady=6,
+        )
+        self.pause_button.pack(side="left", padx=(8, 0))
+
+        self.cancel_button = tk.Button(
+            action_row,
+            text="Cancel",
+            command=self.on_cancel,
+            state="disabled",
+            bg=self._colors["card_light"],
+            fg=self._colors["text"],
+            relief="flat",
+            padx=12,
+            pady=6,
+        )
+        self.cancel_button.pack(side="left", padx=(8, 0))
+
         self.open_output_button = tk.Button(
             action_row,
             text="Open Output Folder",
@@ -227,6 +344,15 @@ class PortalTesterApp:
             font=("Segoe UI", 11, "bold"),
         ).pack(anchor="w", padx=12, pady=(12, 4))
 
+        self.progress_var = tk.StringVar(value="Idle")
+        tk.Label(
+            results_card,
+            textvariable=self.progress_var,
+            fg=self._colors["muted"],
+            bg=self._colors["card"],
+            font=("Segoe UI", 9),
+        ).pack(anchor="w", padx=12, pady=(0, 4))
+
         self.status_text = tk.Text(
             results_card,
             height=9,
@@ -247,7 +373,7 @@ class PortalTesterApp:
             font=("Segoe UI", 9),
         ).pack(anchor="w", padx=12, pady=(0, 4))
 
-        self.link_list = tk.Listbox(
+        self.link_list = VirtualList(
             results_card,
             height=5,
             bg=self._colors["card_light"],
@@ -255,8 +381,8 @@ class PortalTesterApp:
             selectbackground=self._colors["accent_dark"],
             relief="flat",
         )
-        self.link_list.pack(fill="both", expand=True, padx=12, pady=(0, 12))
-        self.link_list.bind("<Double-Button-1>", self.on_open_link)
+        self.link_list.frame.pack(fill="both", expand=True, padx=12, pady=(0, 12))
+        self.link_list.listbox.bind("<Double-Button-1>", self.on_open_link)
 
         tk.Label(
             results_card,
@@ -275,13 +401,22 @@ class PortalTesterApp:
         )
         self.checklist.pack(fill="x", padx=12, pady=(0, 12))
 
-        self._link_targets: list[str] = []
+        self._events: queue.Queue[RunMessage] = queue.Queue()
+        self._cancel_token: CancelToken | None = None
 
         self.url_entry.focus_set()
 
     def log(self, message: str) -> None:
+        self._log_lines([message])
+
+    def _log_lines(self, messages: list[str]) -> None:
+        if not messages:
+            return
         self.status_text.configure(state="normal")
-        self.status_text.insert(tk.END, message + "\n")
+        self.status_text.insert(tk.END, "\n".join(messages) + "\n")
+        line_count = int(self.status_text.index("end-1c").split(".")[0])
+        if line_count > MAX_LOG_LINES:
+            self.status_text.delete("1.0", f"{line_count - MAX_LOG_LINES}.0")
         self.status_text.configure(state="disabled")
         self.status_text.see(tk.END)
 
@@ -299,18 +434,37 @@ class PortalTesterApp:
 
         self._clear_links()
         self._clear_checklist()
-        self.test_button.configure(state="disabled")
         self.log(f"Running pipeline for {run_date.isoformat()}...")
         if url:
             self.log(f"Portal URL: {_mask_url(url)}")
+        self._events = queue.Queue()
+        self._cancel_token = CancelToken()
+        self._set_run_controls(running=True)
         thread = threading.Thread(
             target=self._run_pipeline,
-            args=(run_date, self.county_var.get().strip(), url),
+            args=(
+                run_date,
+                self.county_var.get().strip(),
+                url,
+                self._events,
+                self._cancel_token,
+            ),
             daemon=True,
         )
         thread.start()
+        self.root.after(EVENT_POLL_MS, self._drain_events, self._events)
 
-    def _run_pipeline(self, run_date: date, county_name: str, portal_url: str) -> None:
+    def _run_pipeline(
+        self,
+        run_date: date,
+        county_name: str,
+        portal_url: str,
+        events: queue.Queue[RunMessage],
+        cancel_token: CancelToken,
+    ) -> None:
+        # Progress events and, last of all, the finish callback share one queue,
+        # so the summary is shown after every case line and draining stops
+        # even when the run fails before run_finished.
         start = time.time()
         try:
             config = load_config("config/counties.yaml")
@@ -320,40 +474,96 @@ class PortalTesterApp:
                 if portal_url:
                     county.portal_url = portal_url
 
-            results = run_pipeline(config, run_date)
+            results = run_pipeline(
+                config, run_date, progress=events.put, cancel_token=cancel_token
+            )
             elapsed = time.time() - start
-            self._finish_pipeline(run_date, results, elapsed)
+            events.put(lambda: self._ui_finish_pipeline(run_date, results, elapsed))
         except Exception as exc:
-            self._finish_error(str(run_date), exc)
+            error = exc
+            events.put(lambda: self._ui_finish_error(str(run_date), error))
 
-    def _finish_pipeline(
-        self, run_date: date, results: list, elapsed: float
-    ) -> None:
-        self.root.after(
-            0,
-            lambda: self._ui_finish_pipeline(run_date, results, elapsed),
+    def on_pause(self) -> None:
+        token = self._cancel_token
+        if token is None or token.cancelled:
+            return
+        if token.paused:
+            token.resume()
+            self.pause_button.configure(text="Pause")
+            self.log("Resumed.")
+        else:
+            token.pause()
+            self.pause_button.configure(text="Resume")
+            self.log("Pausing after the current step...")
+
+    def on_cancel(self) -> None:
+        token = self._cancel_token
+        if token is None or token.cancelled:
+            return
+        token.cancel("cancelled from UI")
+        self.cancel_button.configure(state="disabled")
+        self.pause_button.configure(state="disabled")
+        self.log("Cancelling; completed cases will be written to a partial report...")
+
+    def _set_run_controls(self, running: bool) -> None:
+        self.test_button.configure(state="disabled" if running else "normal")
+        self.pause_button.configure(
+            text="Pause", state="normal" if running else "disabled"
         )
+        self.cancel_button.configure(state="normal" if running else "disabled")
+
+    def _drain_events(self, events: queue.Queue[RunMessage]) -> None:
+        lines: list[str] = []
+        rows: list[tuple[str, str]] = []
+        latest: ProgressEvent | None = None
+        finish: Callable[[], None] | None = None
+        for _ in range(MAX_EVENTS_PER_TICK):
+            try:
+                event = events.get_nowait()
+            except queue.Empty:
+                break
+            if not isinstance(event, ProgressEvent):
+                finish = event
+                break
+            latest = event
+            if event.kind == "county_indexed":
+                lines.append(f"{event.county}: {event.message}")
+            elif event.kind == "case_finished" and event.result is not None:
+                result = event.result
+                fields = result.extracted_fields
+                lines.append(
+                    f"- {fields.case_number or result.case_ref.case_number} | "
+                    f"{fields.deceased_name} | {fields.filer_name} | "
+                    f"{fields.property_address}"
+                )
+                for error in result.errors:
+                    lines.append(f"  error: {error}")
+                for pdf_path in result.pdf_paths:
+                    rows.append((f"Open PDF — {pdf_path}", pdf_path))
+        self._log_lines(lines)
+        self.link_list.extend(rows)
+        if latest is not None:
+            self.progress_var.set(_format_progress(latest))
+        if finish is not None:
+            finish()
+        elif events is self._events:
+            self.root.after(EVENT_POLL_MS, self._drain_events, events)
 
     def _ui_finish_pipeline(
         self, run_date: date, results: list, elapsed: float
     ) -> None:
         self.log(f"Elapsed: {elapsed:.2f}s")
         self.log(f"Cases captured: {len(results)}")
-        for result in results:
-            fields = result.extracted_fields
-            self.log(
-                f"- {fields.case_number or result.case_ref.case_number} | "
-                f"{fields.deceased_name} | {fields.filer_name} | "
-                f"{fields.property_address}"
-            )
 
-        report_path = (
-            self.output_dir / "reports" / f"Daily_Probate_Leads_{run_date.isoformat()}.xlsx"
+        cancelled = self._cancel_token is not None and self._cancel_token.cancelled
+        suffix = "_partial" if cancelled else ""
+        report_path = self.output_dir / "reports" / (
+            f"Daily_Probate_Leads_{run_date.isoformat()}{suffix}.xlsx"
         )
-        log_path = self.logs_dir / f"{run_date.isoformat()}.log"
+        log_path = self.logs_dir / f"{run_date.isoformat()}.jsonl"
 
         self._checklist_item("Config loaded", True)
-        self._checklist_item("Pipeline executed", True)
+        self._checklist_item("Pipeline executed", not cancelled)
         self._checklist_item("Cases found", len(results) > 0)
         self._checklist_item("Report generated", report_path.exists())
         self._checklist_item("Logs written", log_path.exists())
@@ -364,21 +574,14 @@ class PortalTesterApp:
             self._register_path_link("Open output folder", self.output_dir)
         if self.logs_dir.exists():
             self._register_path_link("Open logs folder", self.logs_dir)
-
-        for result in results:
-            for pdf_path in result.pdf_paths:
-                self._register_path_link("Open PDF", Path(pdf_path))
         self.log("-" * 60)
-        self.test_button.configure(state="normal")
-
+        self._set_run_controls(running=False)
 
-    def _finish_error(self, url: str, exc: Exception) -> None:
-        self.root.after(0, lambda: self._ui_finish_error(url, exc))
 
     def _ui_finish_error(self, url: str, exc: Exception) -> None:
         self.log(f"Error: {exc}")
         self.log("-" * 60)
-        self.test_button.configure(state="normal")
+        self._set_run_controls(running=False)
 
     def run(self) -> None:
         self.root.mainloop()
@@ -801,8 +1004,7 @@ class PortalTesterApp:
             subprocess.run(["xdg-open", str(path)], check=False)
 
     def _register_link(self, label: str, target: str) -> None:
-        self._link_targets.append(target)
-        self.link_list.insert(tk.END, f"{label} — {target}")
+        self.link_list.extend([(f"{label} — {target}", target)])
 
     def _register_path_link(self, label: str, path: Path) -> None:
         if path.exists():
@@ -811,18 +1013,16 @@ class PortalTesterApp:
             self._register_link(f"{label} (missing)", str(path))
 
     def on_open_link(self, _event: tk.Event) -> None:
-        selection = self.link_list.curselection()
-        if not selection:
+        target = self.link_list.selected_target()
+        if target is None:
             return
-        target = self._link_targets[selection[0]]
         if target.startswith("http"):
             webbrowser.open(target)
         else:
             self._open_path(Path(target))
 
     def _clear_links(self) -> None:
-        self._link_targets = []
-        self.link_list.delete(0, tk.END)
+        self.link_list.clear()
 
     def _clear_checklist(self) -> None:
         self.checklist.delete(0, tk.END)
@@ -832,6 +1032,17 @@ class PortalTesterApp:
         self.checklist.insert(tk.END, f"{status} {label}")
 
 
+def _format_progress(event: ProgressEvent) -> str:
+    parts = [f"{event.cases_done}/{event.cases_total} cases"]
+    if event.case_number and event.kind != "run_finished":
+        parts.append(f"{event.case_number} {event.stage or event.kind}")
+    parts.append(f"{event.bytes_downloaded / 1_000_000:.1f} MB")
+    if event.eta_seconds is not None and event.kind != "run_finished":
+        minutes, seconds = divmod(int(event.eta_seconds), 60)
+        parts.append(f"ETA {minutes}m{seconds:02d}s")
+    return " · ".join(parts)
+
+
 def _is_valid_time(value: str) -> bool:
     try:
         datetime.strptime(value, "%H:%M")